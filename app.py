@@ -1,9 +1,15 @@
+import copy
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
 from scanner import Scanner
-from data_manager import DataManager
+from strategy_engine import StrategyEngine
 from backtester import Backtester
+from optimizer import ParameterOptimizer
+from walk_forward import WalkForward
+from portfolio import PortfolioSimulator
+from robustness import RobustnessAnalyzer
+from snapshots import SnapshotStore, age_seconds
+import timeframes
 
 # Page Config
 st.set_page_config(page_title="BIST Alpha Filter", layout="wide")
@@ -15,12 +21,17 @@ st.markdown("⚠️ **Bu uygulama yatırım tavsiyesi değildir.** Sadece teknik
 # Sidebar - Settings
 st.sidebar.header("⚙️ Strateji Ayarları")
 # Timeframe Selection
-interval_option = st.sidebar.selectbox("Periyot", ["Günlük (1d)", "Haftalık (1wk)"])
-interval_map = {"Günlük (1d)": "1d", "Haftalık (1wk)": "1wk"}
+interval_map = {"Günlük (1d)": "1d", "Haftalık (1wk)": "1wk", "Saatlik (1h)": "1h", "15 Dakika (15m)": "15m"}
+interval_option = st.sidebar.selectbox("Periyot", list(interval_map))
 selected_interval = interval_map[interval_option]
 
 # Index Selection
-index_option = st.sidebar.selectbox("Hisse Grubu", ["BIST 30", "BIST 100"])
+index_option = st.sidebar.selectbox("Hisse Grubu", ["BIST 30", "BIST 100", "Özel Liste"])
+# Any list, e.g. the full BIST equity universe (large lists are scanned in chunks)
+custom_text = st.sidebar.text_area("Hisseler (virgül veya satır ile)", value="THYAO, ASELS, GARAN") \
+    if index_option == "Özel Liste" else ""
+custom_tickers = list(dict.fromkeys(
+    t.strip().upper().removesuffix(".IS") for t in custom_text.replace(",", "\n").splitlines() if t.strip()))
 
 ema_len = st.sidebar.number_input("Kısa Vade EMA", min_value=1, value=9)
 wma_len = st.sidebar.number_input("Uzun Vade WMA", min_value=1, value=30)
@@ -34,16 +45,102 @@ st.sidebar.header("🔍 Tarama")
 def get_scanner():
     return Scanner()
 
-scanner = get_scanner()
+def session_scanner():
+    """
+    This session's scanner: the store, index regime and result cache are the
+    shared ones (cache keys include the strategy params), while the strategy
+    engine and run settings belong to the session, so one user's sidebar never
+    changes another user's scan.
+    """
+    if 'scanner' not in st.session_state:
+        scanner = copy.copy(get_scanner())
+        scanner.strategy_engine = StrategyEngine()
+        st.session_state['scanner'] = scanner
+    return st.session_state['scanner']
+
+scanner = session_scanner()
+universe = custom_tickers if index_option == "Özel Liste" else scanner.get_bist_tickers(index_option)
+# Sidebar parameters apply to the scan, detail view and backtest alike (and are part of the result cache keys)
+scanner.strategy_engine.ema_len = ema_len
+scanner.strategy_engine.wma_len = wma_len
+scanner.strategy_engine.index_sma_len = index_sma_len
+
+def session_backtester(scanner):
+    """Backtester on the session scanner's data, caches and strategy engine."""
+    if 'backtester' not in st.session_state:
+        backtester = Backtester(scanner.data_manager, scanner.market_regime, scanner.result_cache)
+        backtester.strategy_engine = scanner.strategy_engine
+        st.session_state['backtester'] = backtester
+    return st.session_state['backtester']
+
+# Results published by scan_daemon.py. Loaded once per version and shared by every session.
+snapshot_store = SnapshotStore()
+
+@st.cache_data(show_spinner=False)
+def load_snapshot(kind, interval, universe, params, version):
+    return snapshot_store.load(kind, interval, universe, params, version=version)
+
+def use_snapshot(kind, state_key):
+    """
+    Puts the newest daemon snapshot for the current settings into session_state,
+    unless the user ran this themselves. Returns the snapshot meta or None.
+    """
+    params = scanner.strategy_engine.params
+    meta = snapshot_store.latest(kind, selected_interval, index_option, params)
+    if meta is None:
+        return None
+    source = (kind, selected_interval, index_option, params, meta['version'])
+    current = st.session_state.get(f'{state_key}_source')
+    # Own results stay until the settings change, snapshots are replaced by newer ones
+    manual = current == "manual" and st.session_state.get(f'{state_key}_settings') == source[:4]
+    if not manual and current != source:
+        snapshot = load_snapshot(*source)
+        if snapshot is None:
+            return None
+        st.session_state[state_key] = snapshot['results']
+        st.session_state[f'{state_key}_source'] = source
+    if st.session_state.get(f'{state_key}_source') == source:
+        minutes = age_seconds(meta) / 60
+        st.caption(f"🕒 Arka plan sonucu: {meta['created'][:16].replace('T', ' ')} ({minutes:.0f} dk önce, "
+                   f"{meta.get('elapsed', 0):.1f} sn'de hesaplandı)")
+    return meta
+
+# Optional hot path profiling of scans/backtests (cProfile is in the standard library)
+profile_runs = st.sidebar.checkbox("Profil Çıkar (cProfile)", value=False)
+scanner.profiler = "cprofile" if profile_runs else None
+
+def show_profile(profile, key):
+    """Stage breakdown of the last scan/backtest run."""
+    if profile is None:
+        return
+    with st.expander(f"⏱️ Performans Dökümü ({profile.elapsed:.2f} sn)"):
+        stages = profile.stage_frame()
+        st.dataframe(
+            stages.rename(columns={"stage": "Aşama", "seconds": "Süre (sn)", "calls": "Çağrı", "rows": "Satır",
+                                   "bytes": "Bayt", "failures": "Hata", "share": "Pay"})
+            .style.format({"Süre (sn)": "{:.3f}", "Pay": "{:.0%}"}),
+            use_container_width=True
+        )
+        per_ticker = profile.ticker_frame()
+        if not per_ticker.empty:
+            st.markdown("**En yavaş hisseler**")
+            st.dataframe(per_ticker.head(10).style.format("{:.3f}"), use_container_width=True)
+        if profile.failures:
+            st.markdown("**Hatalar**")
+            st.json(profile.failures)
+        if profile.profiler_report:
+            st.code(profile.profiler_report)
+        st.download_button("JSON indir", profile.to_json(), file_name=f"{profile.name}_profile.json",
+                           mime="application/json", key=f"profile_{key}")
 
 # Display BIST Status (Based on selected interval)
-# If weekly, use longer period for index data
-idx_period = "2y" if selected_interval == "1wk" else "6mo"
-index_data = scanner.data_manager.fetch_ohlcv("XU100.IS", period=idx_period, interval=selected_interval)
-if not index_data.empty:
-    current_idx_val = index_data['close'].iloc[-1]
-    last_sma50 = index_data['close'].rolling(index_sma_len).mean().iloc[-1]
-    is_positive = current_idx_val > last_sma50
+# Index history per interval comes from timeframes. The regime caches the index, so reruns don't refetch it.
+idx_period = timeframes.index_period(selected_interval)
+index_status = scanner.market_regime.status(period=idx_period, interval=selected_interval, sma_len=index_sma_len)
+if index_status:
+    current_idx_val = index_status['close']
+    last_sma50 = index_status['sma']
+    is_positive = index_status['market_positive']
     status_color = "green" if is_positive else "red"
     status_text = "POZİTİF" if is_positive else "NEGATİF"
     
@@ -52,28 +149,46 @@ if not index_data.empty:
 else:
     st.sidebar.warning("BIST verisi alınamadı.")
 
+# Universes larger than this are scanned in chunks of this many tickers
+STREAM_CHUNK = 150
+
 # Tabs
-tab1, tab2 = st.tabs(["🔍 Tarama (Scanner)", "🔙 Geçmiş Test (Backtest)"])
+tab1, tab2, tab3 = st.tabs(["🔍 Tarama (Scanner)", "🔙 Geçmiş Test (Backtest)", "🧪 Optimizasyon"])
 
 with tab1:
     # Run Scan Logic
     if st.button("Taramayı Başlat", key="btn_scan"):
         with st.spinner("Piyasa taranıyor... Veriler indiriliyor..."):
-            # Update Strategy Params
-            scanner.strategy_engine.ema_len = ema_len
-            scanner.strategy_engine.wma_len = wma_len
-            scanner.strategy_engine.index_sma_len = index_sma_len
-            
             # Scan
-            target_tickers = scanner.get_bist_tickers(index_option)
-            results = scanner.scan_market(tickers=target_tickers, interval=selected_interval) 
+            target_tickers = universe
+            if len(target_tickers) > STREAM_CHUNK:
+                # Large universes: chunked scan with bounded memory, partial results shown as they arrive
+                parts = []
+                progress = st.progress(0.0)
+                partial = st.empty()
+                for i, part in enumerate(scanner.scan_market_iter(target_tickers, interval=selected_interval,
+                                                                  chunk_size=STREAM_CHUNK)):
+                    parts.append(part)
+                    progress.progress(min((i + 1) * STREAM_CHUNK / len(target_tickers), 1.0))
+                    partial.dataframe(pd.concat(parts, ignore_index=True), use_container_width=True)
+                progress.empty()
+                partial.empty()
+                results = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame()
+            else:
+                results = scanner.scan_market(tickers=target_tickers, interval=selected_interval)
             
             if not results.empty:
                 st.session_state['scan_results'] = results
+                st.session_state['scan_results_source'] = "manual"
+                st.session_state['scan_results_settings'] = (
+                    "scan", selected_interval, index_option, scanner.strategy_engine.params)
                 st.success(f"{len(results)} hisse tarandı.")
             else:
                 st.warning("Sonuç bulunamadı veya veri hatası.")
 
+    show_profile(scanner.last_profile, "scan")
+    use_snapshot("scan", 'scan_results')
+
     # Display Results Logic
     if 'scan_results' in st.session_state:
         df = st.session_state['scan_results']
@@ -86,21 +201,57 @@ with tab1:
         show_only_buy = st.checkbox("Sadece AL Sinyallerini Göster", value=True)
         
         display_df = buy_signals if show_only_buy else df
+
+        # Ranking vs XU100 (relative strength, beta, correlation come with the scan)
+        sort_options = {"Hisse": "Ticker", "RSI": "RSI", "Göreceli Güç (RS)": "RS", "Beta": "Beta", "Korelasyon": "Corr"}
+        sort_label = st.selectbox("Sırala", [label for label, col in sort_options.items() if col in display_df.columns])
+        sort_col = sort_options[sort_label]
+        display_df = display_df.sort_values(sort_col, ascending=sort_col == "Ticker", na_position="last")
         
         # Format for display
         # Rename columns for TR
         display_df_tr = display_df.rename(columns={
             "Ticker": "Hisse", "Price": "Fiyat", "Trend Up": "Trend Yukarı", 
-            "Market Pos": "Piyasa Pozitif", "Buy Signal": "AL Sinyali", "Exit Signal": "Çıkış Sinyali"
+            "Market Pos": "Piyasa Pozitif", "Buy Signal": "AL Sinyali", "Exit Signal": "Çıkış Sinyali",
+            "Corr": "Korelasyon"
         })
         
         st.dataframe(
             display_df_tr.style.background_gradient(subset=['Fiyat'], cmap="Blues")
             .background_gradient(subset=['RSI'], cmap="Reds", vmin=30, vmax=70)
-            .format({"Fiyat": "{:.2f}", "RSI": "{:.2f}", "EMA9": "{:.2f}", "WMA30": "{:.2f}"}),
+            .format({"Fiyat": "{:.2f}", "RSI": "{:.2f}", "EMA9": "{:.2f}", "WMA30": "{:.2f}",
+                     "RS": "{:+.1%}", "Beta": "{:.2f}", "Korelasyon": "{:.2f}"}),
             use_container_width=True
         )
-        
+
+        # Custom screens over the scan's indicator panel (no refetch)
+        with st.expander("🧮 Özel Filtre"):
+            st.caption("Örnek: `rsi > 60 and abs(close / wma_30 - 1) < 0.02`, `pullback and volume > 2 * sma(volume, 20)`. "
+                       "Fonksiyonlar: abs, min, max, prev, change, sma, ema, wma, rsi, highest, lowest")
+            f1, f2, f3 = st.columns([3, 2, 1])
+            screen_where = f1.text_input("Filtre", value="rsi > 60 and trend_up")
+            screen_rank = f2.text_input("Sıralama", value="rsi")
+            screen_on_date = f3.checkbox("Geçmiş tarih")
+            screen_date = f3.date_input("Tarih", label_visibility="collapsed") if screen_on_date else None
+            if len(universe) > STREAM_CHUNK:
+                # Streamed scans keep no panel, screening would scan the whole list at once
+                st.info(f"Özel filtre en fazla {STREAM_CHUNK} hisselik listelerde çalışır, daha küçük bir liste seçin.")
+            elif st.button("Filtrele", key="btn_screen"):
+                with st.spinner("Filtreleniyor..."):
+                    screener = scanner.screener(selected_interval, universe)
+                try:
+                    if screener is None:
+                        st.warning("Tarama verisi bulunamadı.")
+                    else:
+                        st.session_state['screen_results'] = screener.screen(
+                            screen_where or None, rank=screen_rank or None, date=screen_date)
+                except ValueError as e:
+                    st.error(f"Geçersiz ifade: {e}")
+            if 'screen_results' in st.session_state:
+                screen_df = st.session_state['screen_results']
+                st.metric("Eşleşen Hisseler", len(screen_df))
+                st.dataframe(screen_df.style.format(precision=2), use_container_width=True)
+
         # Detail View
         st.markdown("### 📊 Detaylı Analiz")
         selected_ticker = st.selectbox("İncelenecek Hisse Seçin:", display_df['Ticker'].unique())
@@ -108,39 +259,44 @@ with tab1:
         if selected_ticker:
             st.subheader(f"{selected_ticker} Teknik Görünüm")
             
-            # Fetch data again for plotting full history
-            dman = DataManager()
-            stock_df = dman.fetch_ohlcv(selected_ticker, period="6mo")
-            stock_df = scanner.strategy_engine.calculate_indicators(stock_df, index_data)
+            # Indicator frame from the scan (cached), no download when switching tickers
+            stock_df = scanner.indicator_frame(selected_ticker, selected_interval)
             
-            # Create Plotly Chart
-            fig = go.Figure()
+            if stock_df.empty:
+                st.warning("Grafik verisi alınamadı.")
+            else:
+                # Create Plotly Chart (plotly is only imported once a chart is drawn)
+                import plotly.graph_objects as go
+                fig = go.Figure()
             
-            # Candlestick
-            fig.add_trace(go.Candlestick(x=stock_df.index,
-                            open=stock_df['open'], high=stock_df['high'],
-                            low=stock_df['low'], close=stock_df['close'], name='Fiyat'))
+                # Candlestick
+                fig.add_trace(go.Candlestick(x=stock_df.index,
+                                open=stock_df['open'], high=stock_df['high'],
+                                low=stock_df['low'], close=stock_df['close'], name='Fiyat'))
             
-            # Indicators
-            fig.add_trace(go.Scatter(x=stock_df.index, y=stock_df['ema_9'], line=dict(color='blue', width=1), name=f'EMA {ema_len}'))
-            fig.add_trace(go.Scatter(x=stock_df.index, y=stock_df['wma_30'], line=dict(color='red', width=2), name=f'WMA {wma_len}'))
+                # Indicators
+                fig.add_trace(go.Scatter(x=stock_df.index, y=stock_df['ema_9'], line=dict(color='blue', width=1), name=f'EMA {ema_len}'))
+                fig.add_trace(go.Scatter(x=stock_df.index, y=stock_df['wma_30'], line=dict(color='red', width=2), name=f'WMA {wma_len}'))
             
-            # Layout
-            fig.update_layout(title=f"{selected_ticker} - EMA/WMA Stratejisi", xaxis_title="Tarih", yaxis_title="Fiyat", template="plotly_dark")
+                # Layout
+                fig.update_layout(title=f"{selected_ticker} - EMA/WMA Stratejisi", xaxis_title="Tarih", yaxis_title="Fiyat", template="plotly_dark")
             
-            st.plotly_chart(fig, use_container_width=True)
+                st.plotly_chart(fig, use_container_width=True)
             
         # AI Assistant Section (Placeholder)
         with st.expander("🤖 Yapay Zeka Asistanı Görüşü"):
-            # Safe logic for 'status condition' text
-            is_buy = not buy_signals[buy_signals['Ticker'] == selected_ticker].empty if selected_ticker else False
-            st.write(f"**{selected_ticker if selected_ticker else 'Seçili Hisse'}** için analiz: Stratejiye göre şu an {'AL konumunda' if is_buy else 'İzleme konumunda'}. Piyasa genel trendi {status_text}.")
+            # Safe logic for 'status condition' text, read from the same cached indicator frame as the chart
+            last_bar = stock_df.iloc[-1] if selected_ticker and not stock_df.empty else None
+            is_buy = bool(last_bar['buy_signal']) if last_bar is not None else False
+            rsi_text = f" RSI {last_bar['rsi']:.1f}." if last_bar is not None else ""
+            st.write(f"**{selected_ticker if selected_ticker else 'Seçili Hisse'}** için analiz: Stratejiye göre şu an {'AL konumunda' if is_buy else 'İzleme konumunda'}.{rsi_text} Piyasa genel trendi {status_text}.")
 
 with tab2:
     st.header("🔙 Geçmiş Performans Testi (Backtest)")
     st.info("Bu modül, stratejiyi geçmiş verilere (son 1 yıl) uygulayarak, 'Eğer bu stratejiyi uygulasaydım ne kazanırdım?' sorusuna cevap arar.")
     
-    backtester = Backtester()
+    backtester = session_backtester(scanner)
+    backtester.profiler = scanner.profiler
     
     col_bt1, col_bt2 = st.columns([1,3])
     with col_bt1:
@@ -148,16 +304,23 @@ with tab2:
             with col_bt2:
                 with st.spinner("Zaman makinesi çalışıyor... ⏳ (BIST 100 testi 1-2 dk sürebilir)"):
                      # Get tickers based on selection in sidebar
-                    bt_tickers = scanner.get_bist_tickers(index_option)
+                    bt_tickers = universe
                     
-                    bt_results = backtester.backtest_tickers(bt_tickers, period="1y", interval=selected_interval)
+                    bt_results = backtester.backtest_tickers(bt_tickers, period=timeframes.backtest_period(selected_interval), interval=selected_interval)
                     
+                    st.session_state['bt_profile'] = backtester.last_profile
                     if not bt_results.empty:
                         st.session_state['bt_results'] = bt_results
+                        st.session_state['bt_results_source'] = "manual"
+                        st.session_state['bt_results_settings'] = (
+                            "backtest", selected_interval, index_option, scanner.strategy_engine.params)
                         st.balloons()
                     else:
                         st.error("Test sonucu alınamadı.")
 
+    show_profile(st.session_state.get('bt_profile'), "backtest")
+    use_snapshot("backtest", 'bt_results')
+
     if 'bt_results' in st.session_state:
         bt_results = st.session_state['bt_results']
         
@@ -186,3 +349,131 @@ with tab2:
             .background_gradient(subset=['Total Return'], cmap="RdYlGn"),
             use_container_width=True
         )
+
+        # Bootstrap / permutation robustness of the trade lists above
+        st.markdown("### 🎲 Sağlamlık Analizi")
+        if 'Trades' not in bt_results.columns:
+            st.caption("İşlem listesi için testi bu oturumda çalıştırın.")
+        else:
+            r1, r2 = st.columns([1, 3])
+            n_resamples = r1.number_input("Örnekleme Sayısı", min_value=100, max_value=100_000, value=10_000, step=1000)
+            if r1.button("Analiz Et", key="btn_robustness"):
+                with st.spinner("Bootstrap ve permütasyon testleri çalışıyor..."):
+                    st.session_state['robustness'] = backtester.robustness(
+                        bt_results, interval=selected_interval, analyzer=RobustnessAnalyzer(int(n_resamples)))
+            robust = st.session_state.get('robustness')
+            if robust and robust['aggregate']:
+                agg = robust['aggregate']
+                a1, a2, a3 = st.columns(3)
+                a1.metric("Ortalama Getiri (%95 GA)", f"%{agg['Avg Total Return']*100:.1f}",
+                          f"%{agg['Return CI Low']*100:.1f} / %{agg['Return CI High']*100:.1f}", delta_color="off")
+                a2.metric("Kazanma Oranı (%95 GA)", f"%{agg['Avg Win Rate']*100:.1f}",
+                          f"%{agg['Win Rate CI Low']*100:.1f} / %{agg['Win Rate CI High']*100:.1f}", delta_color="off")
+                a3.metric("p-değeri (rastgele girişe karşı)", f"{agg['p-value']:.3f}")
+                st.dataframe(
+                    robust['tickers'].style.format({
+                        'Total Return': "{:.1%}", 'Return CI Low': "{:.1%}", 'Return CI High': "{:.1%}",
+                        'Win Rate': "{:.0%}", 'Win Rate CI Low': "{:.0%}", 'Win Rate CI High': "{:.0%}",
+                        'P(Loss)': "{:.0%}", 'p-value': "{:.3f}"}),
+                    use_container_width=True
+                )
+
+    st.markdown("---")
+    st.subheader("💼 Portföy Simülasyonu")
+    st.info("Tüm hisseler tek bir sermaye havuzunu paylaşır: aynı anda en fazla N pozisyon, komisyon ve kayma dahil. Boş yerden fazla sinyal varsa RSI'ı yüksek olan alınır.")
+    col_p1, col_p2, col_p3, col_p4 = st.columns(4)
+    capital = col_p1.number_input("Başlangıç Sermayesi (TL)", min_value=1000, value=100000, step=10000)
+    max_positions = col_p2.number_input("Maks. Pozisyon", min_value=1, value=10)
+    commission_bps = col_p3.number_input("Komisyon (baz puan)", min_value=0.0, value=20.0)
+    slippage_bps = col_p4.number_input("Kayma (baz puan)", min_value=0.0, value=10.0)
+
+    if st.button("💼 Simülasyonu Başlat", key="btn_portfolio"):
+        with st.spinner("Portföy simüle ediliyor..."):
+            simulator = PortfolioSimulator(initial_capital=float(capital), max_positions=int(max_positions),
+                                           commission=commission_bps / 10000, slippage=slippage_bps / 10000,
+                                           interval=selected_interval)
+            pf_results = backtester.backtest_portfolio(universe,
+                                                       interval=selected_interval, simulator=simulator)
+            if pf_results:
+                st.session_state['pf_results'] = pf_results
+            else:
+                st.error("Simülasyon için veri alınamadı.")
+
+    if 'pf_results' in st.session_state:
+        pf_results = st.session_state['pf_results']
+        metrics = pf_results['metrics']
+        p1, p2, p3, p4, p5 = st.columns(5)
+        p1.metric("Toplam Getiri", f"%{metrics['Total Return'] * 100:.1f}")
+        p2.metric("Maks. Düşüş", f"%{metrics['Max Drawdown'] * 100:.1f}")
+        p3.metric("Sharpe", f"{metrics['Sharpe']:.2f}")
+        p4.metric("Ort. Doluluk", f"%{metrics['Avg Exposure'] * 100:.0f}")
+        p5.metric("İşlem", f"{metrics['Trades']}")
+        st.line_chart(pf_results['curve'][['equity']].rename(columns={"equity": "Sermaye"}))
+        st.area_chart(pf_results['curve'][['drawdown']].rename(columns={"drawdown": "Düşüş"}))
+
+with tab3:
+    st.header("🧪 Parametre Optimizasyonu")
+    st.info("Parametre kombinasyonlarını (EMA, WMA, Endeks SMA) son 1 yıl üzerinde test eder. Veriler bir kez indirilir, her gösterge değeri bir kez hesaplanır.")
+
+    def parse_lengths(text):
+        return sorted({int(v) for v in text.replace(" ", "").split(",") if v.isdigit() and int(v) > 0})
+
+    col_o1, col_o2, col_o3 = st.columns(3)
+    ema_grid = parse_lengths(col_o1.text_input("EMA değerleri", "5, 9, 13, 21"))
+    wma_grid = parse_lengths(col_o2.text_input("WMA değerleri", "20, 30, 50"))
+    sma_grid = parse_lengths(col_o3.text_input("Endeks SMA değerleri", "20, 50, 100"))
+
+    n_combos = len(ema_grid) * len(wma_grid) * len(sma_grid)
+    if st.button(f"🧪 Optimizasyonu Başlat ({n_combos} kombinasyon)", key="btn_optimize", disabled=n_combos == 0):
+        with st.spinner("Kombinasyonlar test ediliyor..."):
+            optimizer = ParameterOptimizer(scanner.data_manager, scanner.market_regime)
+            opt_results = optimizer.optimize(
+                universe, ema_grid, wma_grid, sma_grid,
+                period=timeframes.backtest_period(selected_interval), interval=selected_interval
+            )
+            if not opt_results.empty:
+                st.session_state['opt_results'] = opt_results
+            else:
+                st.error("Optimizasyon sonucu alınamadı.")
+
+    if 'opt_results' in st.session_state:
+        opt_results = st.session_state['opt_results']
+        best = opt_results.iloc[0]
+        st.markdown(f"**En İyi Kombinasyon:** EMA {best['ema_len']} / WMA {best['wma_len']} / SMA {best['index_sma_len']}")
+
+        st.dataframe(
+            opt_results.rename(columns={"ema_len": "EMA", "wma_len": "WMA", "index_sma_len": "Endeks SMA"})
+            .style.format({'Win Rate': "{:.0%}", 'Total Return': "{:.1%}"})
+            .background_gradient(subset=['Total Return'], cmap="RdYlGn"),
+            use_container_width=True
+        )
+
+    st.markdown("---")
+    st.subheader("🚶 Walk-Forward Testi")
+    st.info("Her eğitim penceresinde en iyi kombinasyon seçilir, sonraki test penceresinde (örneklem dışı) uygulanır. Göstergeler tüm geçmiş için bir kez hesaplanır.")
+    col_w1, col_w2, col_w3 = st.columns(3)
+    wf_period = col_w1.selectbox("Geçmiş", ["3y", "5y", "10y"], index=1)
+    train_bars = col_w2.number_input("Eğitim (bar)", min_value=50, value=252)
+    test_bars = col_w3.number_input("Test (bar)", min_value=10, value=63)
+
+    if st.button("🚶 Walk-Forward Başlat", key="btn_walk_forward", disabled=n_combos == 0):
+        with st.spinner("Pencereler test ediliyor..."):
+            wf_results = WalkForward(scanner.data_manager, scanner.market_regime).run(
+                universe, ema_grid, wma_grid, sma_grid,
+                period=wf_period, interval=selected_interval, train_bars=int(train_bars), test_bars=int(test_bars)
+            )
+            if not wf_results['windows'].empty:
+                st.session_state['wf_results'] = wf_results
+            else:
+                st.error("Walk-forward için yeterli veri yok.")
+
+    if 'wf_results' in st.session_state:
+        wf_results = st.session_state['wf_results']
+        equity = wf_results['equity']
+        st.metric("Örneklem Dışı Getiri", f"%{(equity.iloc[-1] - 1) * 100:.1f}")
+        st.line_chart(equity.rename("Örneklem Dışı Sermaye"))
+        st.dataframe(
+            wf_results['windows'].rename(columns={"ema_len": "EMA", "wma_len": "WMA", "index_sma_len": "Endeks SMA"})
+            .style.format({'Train Return': "{:.1%}", 'Train Win Rate': "{:.0%}", 'Win Rate': "{:.0%}", 'Total Return': "{:.1%}"}),
+            use_container_width=True
+        )
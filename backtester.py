@@ -1,17 +1,104 @@
+import numpy as np
 import pandas as pd
 from strategy_engine import StrategyEngine
 from data_manager import DataManager
-import time
+from market_regime import MarketRegime
+from instrumentation import RunProfile
+from result_cache import ResultCache
+from portfolio import PortfolioSimulator
+from robustness import RobustnessAnalyzer
+import timeframes
+
+
+def position_events(buy, exit_):
+    """
+    Derives entry and exit bars from signal arrays (time on axis 0, optional ticker axis 1).
+    Same rules as the bar-by-bar loop: an exit is checked first and closes an open
+    position, then a buy opens one if flat (so exit + buy on one bar re-enters).
+    Returns (opens, closes) boolean arrays.
+    """
+    buy = np.asarray(buy, dtype=bool)
+    exit_ = np.asarray(exit_, dtype=bool)
+    n = buy.shape[0]
+
+    # Position latch: buy sets it, exit (without buy) resets it, otherwise carry forward
+    event = buy | exit_
+    rows = np.arange(n).reshape((n,) + (1,) * (buy.ndim - 1))
+    last_event = np.maximum.accumulate(np.where(event, rows, -1), axis=0)
+    in_position = np.take_along_axis(buy, np.maximum(last_event, 0), axis=0) & (last_event >= 0)
+
+    was_in_position = np.zeros_like(in_position)
+    was_in_position[1:] = in_position[:-1]
+
+    closes = was_in_position & exit_
+    opens = buy & (~was_in_position | exit_)
+    return opens, closes
+
+
+def trade_indices(buy, exit_):
+    """
+    Entry and exit bar positions for a single ticker. The last entry has no
+    matching exit when the position is still open at the end.
+    """
+    opens, closes = position_events(buy, exit_)
+    return np.flatnonzero(opens), np.flatnonzero(closes)
 
 class Backtester:
-    def __init__(self):
+    def __init__(self, data_manager: DataManager = None, market_regime: MarketRegime = None,
+                 result_cache: ResultCache = None):
         self.strategy_engine = StrategyEngine()
-        self.data_manager = DataManager()
-        
-    def run_backtest(self, df: pd.DataFrame) -> dict:
+        self.data_manager = data_manager or DataManager()
+        # Share the regime with the scanner to avoid fetching the index twice
+        self.market_regime = market_regime or MarketRegime(self.data_manager)
+        # {ticker: error} from the last backtest_tickers run
+        self.last_failures = {}
+        # Per stage / per ticker timings of the last backtest_tickers run
+        self.last_profile = None
+        self.profiler = None
+        # Optional cache of indicator frames (shared with the scanner), reruns skip fetch + recompute
+        self.result_cache = result_cache
+
+    def run_backtest(self, df: pd.DataFrame) -> list:
         """
         Runs backtest on a single dataframe with signals already calculated.
         Assumes df has 'buy_signal' and 'exit_signal'.
+        Array based, produces the same trades as run_backtest_loop.
+        """
+        if df.empty:
+            return []
+
+        close = df['close'].to_numpy(dtype=float)
+        entries, exits = trade_indices(df['buy_signal'].to_numpy(dtype=bool), df['exit_signal'].to_numpy(dtype=bool))
+        if len(entries) == 0:
+            return []
+
+        # An entry without an exit is closed at the last bar (mark as unrealized/final close)
+        is_open = len(exits) < len(entries)
+        exit_idx = np.append(exits, len(df) - 1) if is_open else exits
+
+        entry_prices = close[entries]
+        exit_prices = close[exit_idx]
+        returns = (exit_prices - entry_prices) / entry_prices
+
+        trades = [
+            {
+                "entry_date": entry_date,
+                "exit_date": exit_date,
+                "entry_price": entry_price,
+                "exit_price": exit_price,
+                "return": pnl
+            }
+            for entry_date, exit_date, entry_price, exit_price, pnl in zip(
+                df.index[entries], df.index[exit_idx], entry_prices.tolist(), exit_prices.tolist(), returns.tolist()
+            )
+        ]
+        if is_open:
+            trades[-1]["status"] = "open"
+        return trades
+
+    def run_backtest_loop(self, df: pd.DataFrame) -> list:
+        """
+        Reference bar-by-bar implementation, kept for parity checks against run_backtest.
         """
         trades = []
         position = None # {'entry_price': float, 'entry_date': date}
@@ -54,39 +141,69 @@ class Backtester:
             
         return trades
 
-    def backtest_tickers(self, tickers: list, period="1y", interval="1d"):
+    def backtest_tickers(self, tickers: list, period=None, interval="1d"):
         """
         Runs backtest for a list of tickers.
+        period defaults to the interval's backtest history (timeframes.BACKTEST_PERIODS).
+        Stage timings of the run are kept in self.last_profile.
         """
+        period = period or timeframes.backtest_period(interval)
+        with RunProfile("backtest_tickers", profiler=self.profiler) as profile:
+            self.last_profile = profile
+            results = self._backtest_tickers(tickers, period, interval, profile)
+        print(profile.summary())
+        return results
+
+    def _backtest_tickers(self, tickers: list, period: str, interval: str, profile: RunProfile):
         results = []
         
         # Fetch Index Data
-        idx_period = "2y" if interval == "1wk" else "1y" # Match period roughly
+        idx_period = timeframes.index_period(interval)
         print(f"Fetching Index for Backtest ({idx_period})...")
-        index_df = self.data_manager.fetch_ohlcv("XU100.IS", period=idx_period, interval=interval)
-        
-        # Reusing Scanner logic for bulk fetch could be better but let's stick to safe iteration for backtest validity or use small bulk chunks.
-        # Let's use loop for precision now.
-        
+        with profile.stage("index"):
+            self.market_regime.index_data(period=idx_period, interval=interval)
+
+        cached = {}
+        if self.result_cache is not None:
+            for ticker in tickers:
+                df = self.result_cache.get((ticker, interval, period, self.strategy_engine.params))
+                if df is not None:
+                    cached[ticker] = df
+
+        # Fetch all tickers concurrently (rate limited, retried), failures are reported per ticker
+        pending = [ticker for ticker in tickers if ticker not in cached]
+        with profile.stage("fetch"):
+            report = self.data_manager.fetch_many(pending, period=period, interval=interval, profile=profile)
+        self.last_failures = dict(report.failures)
+        print(f"Backtest data: {report.summary()}, {len(cached)} cached")
+
         for ticker in tickers:
+            df = cached.get(ticker, report.results.get(ticker))
+            if df is None or len(df) < 50:
+                continue
             try:
-                df = self.data_manager.fetch_ohlcv(ticker, period=period, interval=interval)
-                if df.empty or len(df) < 50:
-                    continue
-                
                 # Calculate Signals
-                df = self.strategy_engine.calculate_indicators(df, index_df)
-                
+                if ticker not in cached:
+                    with profile.stage("signals", ticker=ticker) as record:
+                        market_positive = self.market_regime.aligned(
+                            df.index, period=idx_period, interval=interval, sma_len=self.strategy_engine.index_sma_len
+                        )
+                        df = self.strategy_engine.calculate_indicators(df, market_positive=market_positive)
+                        record["rows"] = len(df)
+                    if self.result_cache is not None:
+                        self.result_cache.put((ticker, interval, period, self.strategy_engine.params), df)
+
                 # Run Simulation
-                trades = self.run_backtest(df)
-                
+                with profile.stage("backtest", ticker=ticker):
+                    trades = self.run_backtest(df)
+
                 if trades:
                     # Calc metrics
                     total_trades = len(trades)
                     winning_trades = len([t for t in trades if t['return'] > 0])
                     win_rate = winning_trades / total_trades if total_trades > 0 else 0
                     total_return = sum([t['return'] for t in trades])
-                    
+
                     results.append({
                         "Ticker": ticker,
                         "Total Trades": total_trades,
@@ -95,6 +212,58 @@ class Backtester:
                         "Trades": trades
                     })
             except Exception as e:
-                print(f"Backtest error {ticker}: {e}")
-                
+                self.last_failures[ticker] = f"{type(e).__name__}: {e}"
+
         return pd.DataFrame(results)
+
+    def robustness(self, results: pd.DataFrame, period=None, interval="1d", analyzer: RobustnessAnalyzer = None) -> dict:
+        """
+        Bootstrap confidence intervals and permutation p-values for a
+        backtest_tickers result (see robustness.RobustnessAnalyzer), against the
+        same bars the trades came from (cached frames, otherwise the store).
+        """
+        if results.empty:
+            return {"tickers": pd.DataFrame(), "aggregate": {}}
+        period = period or timeframes.backtest_period(interval)
+        analyzer = analyzer or RobustnessAnalyzer()
+
+        closes, pending = {}, []
+        for ticker in results['Ticker']:
+            df = None if self.result_cache is None else \
+                self.result_cache.get((ticker, interval, period, self.strategy_engine.params))
+            if df is None:
+                pending.append(ticker)
+            else:
+                closes[ticker] = df['close']
+        if pending:
+            report = self.data_manager.fetch_many(pending, period=period, interval=interval)
+            closes.update({ticker: df['close'] for ticker, df in report.results.items()})
+        return analyzer.run(results, closes)
+
+    def backtest_portfolio(self, tickers: list, period=None, interval="1d", simulator: PortfolioSimulator = None) -> dict:
+        """
+        Runs the strategy on one shared capital pool across tickers (see
+        portfolio.PortfolioSimulator). When more tickers signal than there are
+        free slots, the highest RSI is taken first.
+        Returns {'curve', 'trades', 'metrics'} or {} if nothing could be fetched.
+        """
+        period = period or timeframes.backtest_period(interval)
+        idx_period = timeframes.index_period(interval)
+        frames = self.data_manager.fetch_ohlcv_bulk(tickers, period=period, interval=interval)
+        if not frames:
+            return {}
+
+        fields = self.data_manager.to_panel(frames)
+        valid = fields['close'].notna()
+        for field in fields.values():
+            valid &= field.notna()
+        market_positive = self.market_regime.aligned(
+            fields['close'].index, period=idx_period, interval=interval, sma_len=self.strategy_engine.index_sma_len
+        )
+        panel = self.strategy_engine.calculate_panel(fields['close'], valid=valid, market_positive=market_positive)
+
+        # Same 50 bar minimum as backtest_tickers
+        buy = panel['buy_signal'] & (valid.sum() >= 50)
+        simulator = simulator or PortfolioSimulator(interval=interval)
+        return simulator.run(fields['close'], buy, panel['exit_signal'], valid, rank=panel['rsi'])
+
@@ -0,0 +1,268 @@
+"""
+Offline performance benchmark.
+
+Times the main pipeline stages on synthetic BIST-like data (no network):
+
+    python benchmark.py                      # full matrix, report only
+    python benchmark.py --check              # fail if benchmark_baseline.json is exceeded
+    python benchmark.py --update-baseline    # record current numbers as the baseline
+    python benchmark.py --tickers 30 --lengths 1y --verify
+    python benchmark.py --imports            # cold import times, fail over budget
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from backtester import Backtester
+from market_regime import MarketRegime
+from scanner import Scanner
+from strategy_engine import StrategyEngine
+from synthetic_data import SyntheticDataManager, SyntheticMarket
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+
+# name -> (bars, interval)
+LENGTHS = {
+    "1y": (252, "1d"),
+    "5y": (1260, "1d"),
+    "intraday": (2016, "1h"),   # ~1 year of hourly bars
+}
+TICKER_COUNTS = (30, 100, 500)
+# scan_market always scans timeframes.scan_period of the interval, so a longer history
+# of the same interval times the same scan: only run it once per interval
+SCAN_LENGTHS = ("1y", "intraday")
+
+# Entry points of scan workers / CLI jobs and their cold import budget in seconds,
+# on top of `import pandas` (which every module needs) so the budget holds on any machine
+IMPORT_BUDGETS = {"data_manager": 0.1, "scanner": 0.1, "backtester": 0.1, "scan_daemon": 0.1}
+# Heavy optional dependencies and opt-in code paths that must only be imported at first use
+LAZY_MODULES = ("yfinance", "plotly", "streamlit", "compact", "screener")
+
+
+def _scanner(data_manager):
+    scanner = Scanner()
+    scanner.data_manager = data_manager
+    scanner.market_regime = MarketRegime(data_manager)
+    return scanner
+
+
+def _backtester(data_manager):
+    return Backtester(data_manager, MarketRegime(data_manager))
+
+
+def build_stages(market: SyntheticMarket) -> dict:
+    """
+    Stage name -> zero-argument callable. Inputs are prepared up front so only
+    the stage itself is timed.
+    """
+    data_manager = SyntheticDataManager(market)
+    engine = StrategyEngine()
+    interval = market.interval
+    index_df = market.index_frame()
+    # The whole synthetic history, so every stage sees market.n_bars bars
+    frames = data_manager.fetch_ohlcv_bulk(market.tickers, period="max", interval=interval)
+    clean = {ticker: df.dropna() for ticker, df in frames.items()}
+
+    fields = data_manager.to_panel(frames)
+    valid = fields['close'].notna()
+    for field in fields.values():
+        valid &= field.notna()
+
+    signal_frames = {ticker: engine.calculate_indicators(df.copy(), index_df) for ticker, df in clean.items()}
+    backtester = _backtester(data_manager)
+
+    return {
+        "calculate_indicators": lambda: [engine.calculate_indicators(df.copy(), index_df) for df in clean.values()],
+        "calculate_panel": lambda: engine.calculate_panel(fields['close'], index_df, valid=valid),
+        "run_backtest": lambda: [backtester.run_backtest(df) for df in signal_frames.values()],
+        "scan_market": lambda: _scanner(data_manager).scan_market(market.tickers, interval=interval),
+        "backtest_tickers": lambda: _backtester(data_manager).backtest_tickers(market.tickers, period="max",
+                                                                              interval=interval),
+    }
+
+
+def measure(func, repeat: int = 3, memory: bool = True) -> dict:
+    """
+    Best wall time of `repeat` runs, plus peak traced memory of one extra run.
+    """
+    times = []
+    peak = None
+    # Stages print progress, keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+
+        if memory:
+            tracemalloc.start()
+            func()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return {"seconds": min(times), "peak_bytes": peak}
+
+
+def verify(market: SyntheticMarket):
+    """
+    Parity checks: array backtest vs the bar-by-bar loop, panel vs per-ticker indicators.
+    """
+    data_manager = SyntheticDataManager(market)
+    engine = StrategyEngine()
+    backtester = _backtester(data_manager)
+    index_df = market.index_frame()
+    frames = data_manager.fetch_ohlcv_bulk(market.tickers, period="max", interval=market.interval)
+
+    fields = data_manager.to_panel(frames)
+    valid = fields['close'].notna()
+    for field in fields.values():
+        valid &= field.notna()
+    panel = engine.calculate_panel(fields['close'], index_df, valid=valid)
+
+    for ticker, df in frames.items():
+        df = engine.calculate_indicators(df.dropna(), index_df)
+        if backtester.run_backtest(df) != backtester.run_backtest_loop(df):
+            raise AssertionError(f"run_backtest differs from run_backtest_loop for {ticker}")
+        for column in ("buy_signal", "exit_signal"):
+            if not (panel[column][ticker].reindex(df.index) == df[column]).all():
+                raise AssertionError(f"calculate_panel {column} differs for {ticker}")
+        if not np.allclose(panel['wma_30'][ticker].reindex(df.index), df['wma_30'], equal_nan=True):
+            raise AssertionError(f"calculate_panel wma_30 differs for {ticker}")
+
+
+def run(ticker_counts, lengths, stages=None, repeat=3, memory=True, seed=42) -> dict:
+    results = {}
+    for length in lengths:
+        n_bars, interval = LENGTHS[length]
+        for n_tickers in ticker_counts:
+            market = SyntheticMarket(n_tickers=n_tickers, n_bars=n_bars, interval=interval, seed=seed)
+            for stage, func in build_stages(market).items():
+                if stages and stage not in stages:
+                    continue
+                if stage == "scan_market" and length not in SCAN_LENGTHS:
+                    continue
+                result = measure(func, repeat=repeat, memory=memory)
+                result["bars_per_second"] = n_tickers * n_bars / result["seconds"] if result["seconds"] else None
+                key = f"{stage}|{n_tickers}|{length}"
+                results[key] = result
+                peak = f"{result['peak_bytes'] / 2 ** 20:8.1f} MB" if result["peak_bytes"] is not None else ""
+                print(f"{stage:22s} {n_tickers:4d} tickers {length:9s} {result['seconds'] * 1000:9.1f} ms "
+                      f"{result['bars_per_second']:14,.0f} bars/s {peak}")
+    return results
+
+
+def check(results: dict, baseline: dict, tolerance: float) -> list:
+    """Returns human readable regressions against the baseline."""
+    failures = []
+    for key, result in results.items():
+        expected = baseline.get(key)
+        if expected is None:
+            continue
+        if result["seconds"] > expected["seconds"] * tolerance:
+            failures.append(f"{key}: {result['seconds']:.3f}s > {expected['seconds']:.3f}s x {tolerance}")
+        if result["peak_bytes"] and expected.get("peak_bytes") and result["peak_bytes"] > expected["peak_bytes"] * tolerance:
+            failures.append(f"{key}: peak {result['peak_bytes']} B > {expected['peak_bytes']} B x {tolerance}")
+    return failures
+
+
+def _cold_import(module: str) -> tuple:
+    # Fresh interpreter per measurement: (seconds for pandas, seconds for the module after it, lazy modules loaded)
+    code = ("import sys, time; t = time.perf_counter(); import pandas; p = time.perf_counter() - t; "
+            f"import {module}; print(p, time.perf_counter() - t - p); "
+            f"print(','.join(name for name in {LAZY_MODULES!r} if name in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(os.path.abspath(__file__))).stdout.splitlines()
+    pandas_seconds, seconds = map(float, out[0].split())
+    return pandas_seconds, seconds, [name for name in out[1].split(",") if name]
+
+
+def check_imports(budgets: dict = None, repeat: int = 3) -> list:
+    """
+    Cold import time of each module (best of `repeat` fresh interpreters)
+    against its budget, and no eager import of LAZY_MODULES. Returns failures.
+    """
+    failures = []
+    for module, budget in (budgets or IMPORT_BUDGETS).items():
+        runs = [_cold_import(module) for _ in range(repeat)]
+        pandas_seconds = min(run[0] for run in runs)
+        seconds = min(run[1] for run in runs)
+        eager = sorted(set(name for run in runs for name in run[2]))
+        print(f"import {module:16s} {seconds * 1000:7.1f} ms (+ pandas {pandas_seconds * 1000:.0f} ms), "
+              f"budget {budget * 1000:.0f} ms{', eager: ' + ', '.join(eager) if eager else ''}")
+        if seconds > budget:
+            failures.append(f"import {module}: {seconds:.3f}s > {budget:.3f}s")
+        if eager:
+            failures.append(f"import {module} loads {', '.join(eager)} eagerly")
+    return failures
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmark on synthetic BIST-like data")
+    parser.add_argument("--tickers", type=int, nargs="+", default=list(TICKER_COUNTS))
+    parser.add_argument("--lengths", nargs="+", choices=list(LENGTHS), default=list(LENGTHS))
+    parser.add_argument("--stages", nargs="+", help="Only run these stages")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--verify", action="store_true", help="Run parity checks first")
+    parser.add_argument("--check", action="store_true", help="Fail if the baseline is exceeded")
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--imports", action="store_true", help="Only check cold import times against IMPORT_BUDGETS")
+    args = parser.parse_args(argv)
+
+    if args.imports:
+        failures = check_imports(repeat=args.repeat)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            return 1
+        print("All imports within budget.")
+        return 0
+
+    if args.verify:
+        with contextlib.redirect_stdout(io.StringIO()):
+            verify(SyntheticMarket(n_tickers=min(args.tickers), n_bars=LENGTHS[args.lengths[0]][0],
+                                   interval=LENGTHS[args.lengths[0]][1]))
+        print("Parity checks passed.")
+
+    results = run(args.tickers, args.lengths, stages=args.stages, repeat=args.repeat, memory=not args.no_memory)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.update_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update({key: {"seconds": r["seconds"], "peak_bytes": r["peak_bytes"]} for key, r in results.items()})
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+
+    if args.check:
+        if not os.path.exists(args.baseline):
+            print(f"No baseline at {args.baseline}")
+            return 1
+        with open(args.baseline) as f:
+            failures = check(results, json.load(f), args.tolerance)
+        for failure in failures:
+            print(f"REGRESSION {failure}")
+        if failures:
+            return 1
+        print("All stages within baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
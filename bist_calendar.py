@@ -0,0 +1,94 @@
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+BIST_TZ = ZoneInfo("Europe/Istanbul")
+
+# Continuous session 10:00 - 18:00, closing auction finishes around 18:10
+SESSION_OPEN = time(10, 0)
+SESSION_CLOSE = time(18, 10)
+
+# Fixed-date national holidays (month, day). Religious holidays move every year
+# and are not listed; on those days data simply looks stale and gets re-checked.
+FIXED_HOLIDAYS = {(1, 1), (4, 23), (5, 1), (5, 19), (7, 15), (8, 30), (10, 29)}
+
+
+def now_bist() -> datetime:
+    """Current time in Istanbul."""
+    return datetime.now(BIST_TZ)
+
+
+def to_bist(now: datetime = None) -> datetime:
+    """Naive timestamps (e.g. bar times in replayed data) are taken as Istanbul local time."""
+    now = now or now_bist()
+    if now.tzinfo is None:
+        return now.replace(tzinfo=BIST_TZ)
+    return now.astimezone(BIST_TZ)
+
+
+def is_trading_day(day: date) -> bool:
+    """
+    True if BIST is expected to hold a session on this day.
+    """
+    if day.weekday() >= 5:
+        return False
+    return (day.month, day.day) not in FIXED_HOLIDAYS
+
+
+def is_session_open(now: datetime = None) -> bool:
+    """
+    True while the continuous session (or closing auction) is running.
+    """
+    now = to_bist(now)
+    return is_trading_day(now.date()) and SESSION_OPEN <= now.time() < SESSION_CLOSE
+
+
+def last_session_close(now: datetime = None) -> datetime:
+    """
+    Close time of the most recent completed session at or before `now`.
+    """
+    now = to_bist(now)
+    day = now.date()
+    if not (is_trading_day(day) and now.time() >= SESSION_CLOSE):
+        day -= timedelta(days=1)
+        while not is_trading_day(day):
+            day -= timedelta(days=1)
+    return datetime.combine(day, SESSION_CLOSE, tzinfo=BIST_TZ)
+
+
+def next_session_open(now: datetime = None) -> datetime:
+    """
+    Open time of the first session starting after `now`.
+    """
+    now = to_bist(now)
+    day = now.date()
+    if not (is_trading_day(day) and now.time() < SESSION_OPEN):
+        day += timedelta(days=1)
+        while not is_trading_day(day):
+            day += timedelta(days=1)
+    return datetime.combine(day, SESSION_OPEN, tzinfo=BIST_TZ)
+
+
+def period_start(period: str, now: datetime = None):
+    """
+    Converts a yfinance period string ("6mo", "1y", "60d", "ytd", ...) into the
+    first timestamp it covers. Returns None for "max".
+    """
+    now = to_bist(now)
+    today = pd.Timestamp(now.date())
+    if period == "max":
+        return None
+    if period == "ytd":
+        return pd.Timestamp(year=today.year, month=1, day=1)
+
+    units = {
+        "d": lambda n: pd.DateOffset(days=n),
+        "wk": lambda n: pd.DateOffset(weeks=n),
+        "mo": lambda n: pd.DateOffset(months=n),
+        "y": lambda n: pd.DateOffset(years=n),
+    }
+    for suffix, offset in units.items():
+        if period.endswith(suffix) and period[:-len(suffix)].isdigit():
+            return today - offset(int(period[:-len(suffix)]))
+    raise ValueError(f"Unsupported period: {period}")
@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+# Compact containers for large universes / long histories (opt-in).
+# Prices are float32 dates x tickers arrays, flags are bit-packed and scan
+# rows are stored column-wise instead of as one dict per ticker.
+
+OHLCV_FIELDS = ("open", "high", "low", "close", "volume")
+
+
+class CompactOHLCV:
+    """
+    OHLCV for many tickers as contiguous float32 dates x tickers arrays on a
+    shared calendar. `valid` marks the bars a ticker actually has.
+    """
+
+    __slots__ = ("index", "tickers", "open", "high", "low", "close", "volume", "valid")
+
+    def __init__(self, index: pd.Index, tickers: list, arrays: dict, valid: np.ndarray):
+        self.index = index
+        self.tickers = list(tickers)
+        for field in OHLCV_FIELDS:
+            setattr(self, field, np.ascontiguousarray(arrays[field], dtype=np.float32))
+        self.valid = np.ascontiguousarray(valid, dtype=bool)
+
+    @classmethod
+    def from_frames(cls, frames: dict) -> "CompactOHLCV":
+        """
+        Builds the arrays one ticker at a time, so no wide float64 frame is
+        ever materialized. Frames can be released by the caller afterwards.
+        """
+        tickers = list(frames)
+        index = pd.Index([])
+        for df in frames.values():
+            index = index.union(df.index)
+
+        arrays = {field: np.full((len(index), len(tickers)), np.nan, dtype=np.float32) for field in OHLCV_FIELDS}
+        for col, df in enumerate(frames.values()):
+            rows = index.get_indexer(df.index)
+            for field in OHLCV_FIELDS:
+                arrays[field][rows, col] = df[field].to_numpy(dtype=np.float32)
+
+        valid = np.ones((len(index), len(tickers)), dtype=bool)
+        for field in OHLCV_FIELDS:
+            valid &= ~np.isnan(arrays[field])
+        return cls(index, tickers, arrays, valid)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(getattr(self, field).nbytes for field in OHLCV_FIELDS) + self.valid.nbytes
+
+    def frame(self, ticker: str) -> pd.DataFrame:
+        """One ticker as a regular OHLCV frame (only its own bars)."""
+        col = self.tickers.index(ticker)
+        rows = self.valid[:, col]
+        return pd.DataFrame(
+            {field: getattr(self, field)[rows, col].astype(float) for field in OHLCV_FIELDS},
+            index=self.index[rows]
+        )
+
+
+class SignalBits:
+    """
+    Boolean dates x tickers matrix stored with 8 bars per byte.
+    """
+
+    __slots__ = ("bits", "shape")
+
+    def __init__(self, flags: np.ndarray):
+        flags = np.asarray(flags, dtype=bool)
+        self.shape = flags.shape
+        self.bits = np.packbits(flags, axis=0)
+
+    def unpack(self) -> np.ndarray:
+        return np.unpackbits(self.bits, axis=0, count=self.shape[0]).astype(bool)
+
+    def row(self, i: int) -> np.ndarray:
+        """Flags of every ticker on bar `i`."""
+        i = i % self.shape[0]
+        return (self.bits[i // 8] >> (7 - i % 8) & 1).astype(bool)
+
+    def column(self, j: int) -> np.ndarray:
+        """Flags of one ticker over time."""
+        return np.unpackbits(self.bits[:, j], count=self.shape[0]).astype(bool)
+
+    @property
+    def nbytes(self) -> int:
+        return self.bits.nbytes
+
+
+class ScanResults:
+    """
+    Latest signal per ticker, stored column-wise (struct of arrays).
+    to_frame() gives the same table as Scanner.scan_market.
+    """
+
+    __slots__ = ("tickers", "dates", "price", "ema", "wma", "rsi",
+                 "trend_up", "market_positive", "buy_signal", "exit_signal")
+
+    def __init__(self, tickers, dates, price, ema, wma, rsi, trend_up, market_positive, buy_signal, exit_signal):
+        self.tickers = np.asarray(tickers, dtype=object)
+        self.dates = dates
+        self.price = np.asarray(price, dtype=np.float32)
+        self.ema = np.asarray(ema, dtype=np.float32)
+        self.wma = np.asarray(wma, dtype=np.float32)
+        self.rsi = np.asarray(rsi, dtype=np.float32)
+        self.trend_up = np.asarray(trend_up, dtype=bool)
+        self.market_positive = np.asarray(market_positive, dtype=bool)
+        self.buy_signal = np.asarray(buy_signal, dtype=bool)
+        self.exit_signal = np.asarray(exit_signal, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.tickers)
+
+    @property
+    def empty(self) -> bool:
+        return len(self) == 0
+
+    def buy_tickers(self) -> list:
+        return self.tickers[self.buy_signal].tolist()
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "Ticker": self.tickers,
+            "Price": self.price.astype(float),
+            "Trend Up": self.trend_up,
+            "Market Pos": self.market_positive,
+            "Buy Signal": self.buy_signal,
+            "Exit Signal": self.exit_signal,
+            "EMA9": self.ema.astype(float),
+            "WMA30": self.wma.astype(float),
+            "RSI": self.rsi.astype(float)
+        })
@@ -1,39 +1,264 @@
-import yfinance as yf
 import pandas as pd
+from ohlcv_store import OHLCVStore, DEFAULT_STORE_DIR, slice_period
+from fetch_scheduler import FetchScheduler, FetchReport
+from providers import DataProvider, YFinanceProvider, OHLCV_COLUMNS, normalize_columns
+from instrumentation import RunProfile, frame_bytes
+import timeframes
+import time
+
+# Default store_dir: DEFAULT_STORE_DIR for live data, no store for other providers
+_LIVE_STORE = object()
+
 
 class DataManager:
-    def __init__(self):
-        pass
+    def __init__(self, store_dir: str = _LIVE_STORE, scheduler: FetchScheduler = None,
+                 provider: DataProvider = None, derive: dict = None):
+        # Where bars and fundamentals come from (yfinance, or ReplayProvider for offline runs)
+        self.provider = provider or YFinanceProvider()
+        # Local OHLCV store, pass store_dir=None to always hit the provider. Replayed and synthetic
+        # bars are not stored unless a store_dir is given, so they never mix with live ones
+        if store_dir is _LIVE_STORE:
+            store_dir = DEFAULT_STORE_DIR if isinstance(self.provider, YFinanceProvider) else None
+        self.store = OHLCVStore(store_dir) if store_dir else None
+        # Bounded, rate limited concurrency for per-ticker requests
+        self.scheduler = scheduler or FetchScheduler()
+        # {interval: base interval} built by resampling stored base bars instead of downloading
+        # (weekly from daily by default), pass derive={} to download every interval natively
+        self.derive = dict(timeframes.DERIVED_INTERVALS if derive is None else derive)
+
+    @staticmethod
+    def to_yf_ticker(ticker: str) -> str:
+        # yfinance tickers for BIST usually end with .IS, ensure it's there if not provided
+        return ticker if ticker.endswith(".IS") else f"{ticker}.IS"
+
+    normalize_columns = staticmethod(normalize_columns)
 
     def fetch_ohlcv(self, ticker: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
         """
         Fetches OHLCV data for a given ticker.
+        Reads the local store first and only downloads the bars it is missing.
         """
         try:
-            # yfinance tickers for BIST usually end with .IS, ensure it's there if not provided
-            full_ticker = ticker if ticker.endswith(".IS") else f"{ticker}.IS"
-            df = yf.download(full_ticker, period=period, interval=interval, progress=False)
-            
-            if df.empty:
-                return pd.DataFrame()
-                
-            # Flatten MultiIndex columns if present (common in recent yfinance versions)
-            if isinstance(df.columns, pd.MultiIndex):
-                df.columns = df.columns.get_level_values(0)
-            
-            # Ensure standard column names
-            df = df.rename(columns={
-                "Open": "open", "High": "high", "Low": "low", 
-                "Close": "close", "Volume": "volume"
-            })
-            
-            # Return only necessary columns
-            return df[["open", "high", "low", "close", "volume"]]
-            
+            return self.download_ohlcv(ticker, period=period, interval=interval)
         except Exception as e:
             print(f"Error fetching data for {ticker}: {e}")
             return pd.DataFrame()
 
+    def download_ohlcv(self, ticker: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
+        """
+        Same as fetch_ohlcv but lets errors propagate (used by the fetch scheduler).
+        """
+        if interval in self.derive:
+            df = self.download_ohlcv(ticker, period=period, interval=self.derive[interval])
+            return timeframes.resample_ohlcv(df, interval)
+
+        full_ticker = self.to_yf_ticker(ticker)
+
+        if self.store is None:
+            return self.window(self._download(full_ticker, interval, period=period), period)
+
+        now = self.provider.now()
+        stored = self.store.load(full_ticker, interval)
+        if self.store.covers(stored, period, now):
+            if self.store.is_fresh(full_ticker, interval, now):
+                return self.window(stored, period)
+            # Top up from the bar before the last stored one: the last may have been partial,
+            # the one before it is a complete bar to check the price basis against
+            df = self._download(full_ticker, interval, start=self._overlap_day(stored))
+            if self.store.basis_changed(stored, df):
+                # Split/dividend re-adjusted the history, refetch all of it instead of appending
+                df = self._download(full_ticker, interval, start=self._day(stored.index[0]))
+                return self.window(self.store.replace(full_ticker, interval, df), period)
+        else:
+            df = self._download(full_ticker, interval, period=period)
+
+        merged = self.store.append(full_ticker, interval, df)
+        return self.window(merged, period)
+
+    def fetch_many(self, tickers: list, period: str = "1y", interval: str = "1d", profile: RunProfile = None) -> FetchReport:
+        """
+        Fetches tickers concurrently through the fetch scheduler.
+        report.results is {ticker: DataFrame}, report.failures is {ticker: error}.
+        Per ticker time, rows and bytes go into `profile` if given.
+        """
+        profile = profile or RunProfile("fetch_many")
+        if interval in self.derive:
+            report = self.fetch_many(tickers, period=period, interval=self.derive[interval], profile=profile)
+            with profile.stage("resample"):
+                report.results = {ticker: timeframes.resample_ohlcv(df, interval) for ticker, df in report.results.items()}
+            return report
+
+        # Fresh bars are read straight from the store, only network requests go through the rate limit
+        cached = {}
+        if self.store is not None:
+            now = self.provider.now()
+            with profile.stage("fetch.store"):
+                for ticker in tickers:
+                    full_ticker = self.to_yf_ticker(ticker)
+                    stored = self.store.load(full_ticker, interval)
+                    if self.store.covers(stored, period, now) and self.store.is_fresh(full_ticker, interval, now):
+                        cached[ticker] = self.window(stored, period)
+                        profile.add_frame("fetch.store", cached[ticker], ticker=ticker)
+
+        def download(ticker):
+            start = time.perf_counter()
+            df = self.download_ohlcv(ticker, period=period, interval=interval)
+            profile.add_frame("fetch.download", df, time.perf_counter() - start, ticker=ticker)
+            return df
+
+        pending = [ticker for ticker in tickers if ticker not in cached]
+        report = self.scheduler.run(download, pending)
+        for ticker, df in cached.items():
+            if not df.empty:
+                report.results[ticker] = df
+                report.attempts[ticker] = 0
+        for ticker, error in report.failures.items():
+            profile.fail("fetch.download", ticker, error)
+        return report
+
+    def fetch_ohlcv_bulk(self, tickers: list, period: str = "1y", interval: str = "1d", progress: bool = True,
+                         profile: RunProfile = None) -> dict:
+        """
+        Fetches OHLCV data for many tickers with as few requests as possible.
+        Fresh tickers come straight from the store, stale ones are topped up with
+        one bulk request and missing ones are downloaded with another. Stale
+        tickers whose history was re-adjusted get one more request for their
+        whole stored range.
+        Returns {ticker: DataFrame}; tickers that could not be fetched are left out
+        (and recorded as failures in `profile` if given).
+        """
+        profile = profile or RunProfile("fetch_ohlcv_bulk")
+        if interval in self.derive:
+            frames = self.fetch_ohlcv_bulk(tickers, period=period, interval=self.derive[interval],
+                                           progress=progress, profile=profile)
+            with profile.stage("resample"):
+                return {ticker: timeframes.resample_ohlcv(df, interval) for ticker, df in frames.items()}
+
+        frames = {}
+        yf_tickers = {ticker: self.to_yf_ticker(ticker) for ticker in tickers}
+
+        stale, missing = {}, []
+        now = self.provider.now()
+        with profile.stage("fetch.store"):
+            for ticker, yf_ticker in yf_tickers.items():
+                if self.store is None:
+                    missing.append(ticker)
+                    continue
+                stored = self.store.load(yf_ticker, interval)
+                if not self.store.covers(stored, period, now):
+                    missing.append(ticker)
+                elif self.store.is_fresh(yf_ticker, interval, now):
+                    frames[ticker] = self.window(stored, period)
+                    profile.add_frame("fetch.store", frames[ticker], ticker=ticker)
+                else:
+                    stale[ticker] = stored
+
+        # (tickers, download arguments, stored bars are replaced instead of appended to)
+        requests = []
+        if stale:
+            requests.append((list(stale), {"start": min(self._overlap_day(df) for df in stale.values())}, False))
+        if missing:
+            requests.append((missing, {"period": period}, False))
+
+        rebase = []
+        for group, kwargs, replace in requests:
+            try:
+                with profile.stage("fetch.download") as record:
+                    bulk_data = self.provider.download([yf_tickers[t] for t in group], interval=interval,
+                                                       progress=progress, **kwargs)
+                    # Bytes are recorded once per ticker, under fetch.extract
+                    record["rows"] = sum(len(df) for df in bulk_data.values())
+            except Exception as e:
+                print(f"Bulk download failed: {e}")
+                continue
+
+            for ticker in group:
+                try:
+                    with profile.stage("fetch.extract", ticker=ticker) as record:
+                        df = bulk_data.get(yf_tickers[ticker], pd.DataFrame())
+                        record["bytes"] = frame_bytes(df)
+                        if replace:
+                            df = self.store.replace(yf_tickers[ticker], interval, df)
+                        elif ticker in stale and self.store.basis_changed(stale[ticker], df):
+                            rebase.append(ticker)
+                            continue
+                        elif self.store is not None:
+                            df = self.store.append(yf_tickers[ticker], interval, df)
+                        record["rows"] = len(df)
+                except Exception as e:
+                    print(f"Error storing data for {ticker}: {e}")
+                    continue
+                df = self.window(df, period)
+                if not df.empty:
+                    frames[ticker] = df
+
+            if rebase:
+                # Split/dividend re-adjusted these tickers' history: refetch everything stored
+                start = min(self._day(stale[ticker].index[0]) for ticker in rebase)
+                requests.append((rebase, {"start": start}, True))
+                rebase = []
+
+        for ticker in tickers:
+            if ticker not in frames:
+                profile.fail("fetch", ticker, "no data")
+
+        # Keep the caller's ticker order
+        return {ticker: frames[ticker] for ticker in tickers if ticker in frames}
+
+    def fetch_timeframes(self, tickers: list, intervals: list, period: str = "1y",
+                         profile: RunProfile = None) -> dict:
+        """
+        Multi-timeframe fetch: downloads the finest interval once and resamples
+        it into the others along BIST session boundaries.
+        `period` must be available at the finest interval (e.g. <= 60d for 15m).
+        Returns {interval: {ticker: DataFrame}}.
+        """
+        profile = profile or RunProfile("fetch_timeframes")
+        base = timeframes.finest(intervals)
+        frames = self.fetch_ohlcv_bulk(tickers, period=period, interval=base, profile=profile)
+
+        result = {}
+        for interval in intervals:
+            if interval == base:
+                result[interval] = frames
+                continue
+            with profile.stage("resample"):
+                result[interval] = {ticker: timeframes.resample_ohlcv(df, interval) for ticker, df in frames.items()}
+        return result
+
+    @staticmethod
+    def to_panel(frames: dict) -> dict:
+        """
+        Turns {ticker: OHLCV frame} into {field: dates x tickers frame} on the
+        union of all dates. Missing bars are NaN.
+        """
+        wide = pd.concat(frames, axis=1, sort=True)
+        return {field: wide.xs(field, level=1, axis=1) for field in OHLCV_COLUMNS}
+
+    def window(self, df: pd.DataFrame, period: str) -> pd.DataFrame:
+        """
+        The bars of `df` inside `period`, counted back from the provider's now
+        (the replay date for replays). Every fetch path returns frames through
+        this, so store reads, top-ups and providers that ignore `period` (or
+        return more history than asked for) all give the same window.
+        """
+        return slice_period(df, period, self.provider.now())
+
+    def _download(self, full_ticker: str, interval: str, **kwargs) -> pd.DataFrame:
+        """
+        Single ticker request through the provider (period= or start=).
+        """
+        return self.provider.download([full_ticker], interval=interval, **kwargs).get(full_ticker, pd.DataFrame())
+
+    @staticmethod
+    def _day(ts) -> str:
+        return pd.Timestamp(ts).strftime("%Y-%m-%d")
+
+    @classmethod
+    def _overlap_day(cls, df: pd.DataFrame) -> str:
+        # Top-ups start at the second to last stored bar (see OHLCVStore.basis_changed)
+        return cls._day(df.index[-2 if len(df) > 1 else -1])
+
     def fetch_index_data(self, index_ticker: str = "XU100.IS", period: str = "1y") -> pd.DataFrame:
         """
         Fetches benchmark index data (BIST 100 default).
@@ -46,17 +271,29 @@ class DataManager:
         Returns specific metrics relevant to 'Basic Fundamental Analysis'.
         """
         try:
-            full_ticker = ticker if ticker.endswith(".IS") else f"{ticker}.IS"
-            info = yf.Ticker(full_ticker).info
-            
-            return {
-                "symbol": ticker,
-                "pe_ratio": info.get("trailingPE"),
-                "pb_ratio": info.get("priceToBook"),
-                "market_cap": info.get("marketCap"),
-                "sector": info.get("sector"),
-                "industry": info.get("industry")
-            }
+            return self.download_fundamentals(ticker)
         except Exception as e:
             print(f"Error fetching fundamentals for {ticker}: {e}")
             return {}
+
+    def download_fundamentals(self, ticker: str) -> dict:
+        """
+        Same as fetch_fundamentals but lets errors propagate.
+        """
+        full_ticker = self.to_yf_ticker(ticker)
+        info = self.provider.fundamentals(full_ticker)
+
+        return {
+            "symbol": ticker,
+            "pe_ratio": info.get("trailingPE"),
+            "pb_ratio": info.get("priceToBook"),
+            "market_cap": info.get("marketCap"),
+            "sector": info.get("sector"),
+            "industry": info.get("industry")
+        }
+
+    def fetch_fundamentals_many(self, tickers: list) -> FetchReport:
+        """
+        Fetches fundamentals concurrently through the fetch scheduler.
+        """
+        return self.scheduler.run(self.download_fundamentals, tickers)
@@ -0,0 +1,110 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all worker threads.
+    `rate` tokens per second are added up to `burst`; each request takes one.
+    """
+
+    def __init__(self, rate: float = 4.0, burst: int = 4, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = float(burst)
+        self.updated = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = self.clock()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            self.sleep(wait)
+
+
+class FetchReport:
+    """
+    Outcome of a scheduled batch: results per key, and the last error per failed key.
+    """
+
+    def __init__(self):
+        self.results = {}
+        self.failures = {}
+        self.attempts = {}
+        self.elapsed = 0.0
+
+    def summary(self) -> str:
+        return f"{len(self.results)} ok, {len(self.failures)} failed in {self.elapsed:.1f}s"
+
+
+class FetchScheduler:
+    """
+    Runs fetch calls through a bounded thread pool with a token bucket rate
+    limit and retry with exponential backoff. Wall time becomes roughly the
+    slowest request instead of the sum of all of them.
+    """
+
+    def __init__(self, max_workers: int = 8, rate: float = 4.0, burst: int = 4,
+                 retries: int = 2, backoff: float = 1.0, clock=time.monotonic, sleep=time.sleep):
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.sleep = sleep
+        self.limiter = RateLimiter(rate=rate, burst=burst, clock=clock, sleep=sleep)
+
+    def run(self, fetch, keys: list) -> FetchReport:
+        """
+        Calls fetch(key) for every key. A call fails if it raises or returns an
+        empty result; failed calls are retried `retries` times.
+        """
+        report = FetchReport()
+        start = time.perf_counter()
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return report
+
+        def task(key):
+            error = None
+            for attempt in range(self.retries + 1):
+                if attempt:
+                    self.sleep(self.backoff * 2 ** (attempt - 1))
+                self.limiter.acquire()
+                try:
+                    result = fetch(key)
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                    continue
+                if _is_empty(result):
+                    error = "no data"
+                    continue
+                return key, result, None, attempt + 1
+            return key, None, error, self.retries + 1
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(keys))) as pool:
+            for key, result, error, attempts in pool.map(task, keys):
+                report.attempts[key] = attempts
+                if error is None:
+                    report.results[key] = result
+                else:
+                    report.failures[key] = error
+
+        report.elapsed = time.perf_counter() - start
+        return report
+
+
+def _is_empty(result) -> bool:
+    if result is None:
+        return True
+    empty = getattr(result, "empty", None)
+    if empty is not None:
+        return bool(empty)
+    return len(result) == 0 if hasattr(result, "__len__") else False
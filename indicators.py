@@ -0,0 +1,181 @@
+import numpy as np
+import pandas as pd
+
+# NumPy indicator kernels.
+# Every kernel accepts a 1-D array (one ticker) or a 2-D array with time on
+# axis 0 and one column per ticker, so the same code serves single frames and panels.
+
+
+def _as_2d(values):
+    values = np.asarray(values, dtype=float)
+    return (values[:, None], True) if values.ndim == 1 else (values, False)
+
+
+def _restore(values, was_1d):
+    return values[:, 0] if was_1d else values
+
+
+def ewm_mean(values, alpha: float, min_periods: int = 0):
+    """
+    Recursive exponential mean (pandas ewm with adjust=False), column-wise.
+    """
+    values, was_1d = _as_2d(values)
+    out = pd.DataFrame(values).ewm(alpha=alpha, min_periods=min_periods, adjust=False).mean().to_numpy()
+    return _restore(out, was_1d)
+
+
+def ema(values, span: int):
+    """Exponential Moving Average, same as Series.ewm(span=span, adjust=False).mean()."""
+    return ewm_mean(values, alpha=2.0 / (span + 1))
+
+
+def sma(values, length: int):
+    """
+    Simple Moving Average from prefix sums. NaN while the window is incomplete
+    or contains a NaN, like Series.rolling(length).mean().
+    """
+    values, was_1d = _as_2d(values)
+    window_sum, nan_count = _window_sums(values, length)
+    with np.errstate(invalid="ignore"):
+        out = window_sum / length
+    out[nan_count > 0] = np.nan
+    return _restore(out, was_1d)
+
+
+def wma(values, length: int):
+    """
+    Weighted Moving Average (weights 1..length, newest bar heaviest) in O(n).
+
+    Uses prefix sums of x and k*x, so the weighted window sum is
+        sum_k (k - (t - length)) * x_k = (C2_t - C2_{t-L}) - (t - L) * (C1_t - C1_{t-L})
+    instead of one dot product per window. Matches
+    Series.rolling(length).apply(np.dot(x, weights) / weights.sum()) up to float rounding.
+    """
+    values, was_1d = _as_2d(values)
+    n = values.shape[0]
+    out = np.full(values.shape, np.nan)
+    if n < length:
+        return _restore(out, was_1d)
+
+    nan_mask = np.isnan(values)
+    clean = np.where(nan_mask, 0.0, values)
+    k = np.arange(n, dtype=float)[:, None]
+
+    c1 = _prefix(clean)
+    c2 = _prefix(clean * k)
+    nans = _prefix(nan_mask.astype(float))
+
+    t = k[length - 1:]
+    plain = c1[length:] - c1[:-length]
+    weighted = (c2[length:] - c2[:-length]) - (t - length) * plain
+    out[length - 1:] = weighted / (length * (length + 1) / 2)
+    out[length - 1:][(nans[length:] - nans[:-length]) > 0] = np.nan
+    return _restore(out, was_1d)
+
+
+def rsi(values, window: int = 14):
+    """
+    Wilder RSI, numerically the same as ta.momentum.RSIIndicator(close, window).rsi().
+    Gains and losses are smoothed in a single ewm call.
+    """
+    values, was_1d = _as_2d(values)
+    diff = np.diff(values, axis=0, prepend=np.nan)
+    with np.errstate(invalid="ignore"):
+        up = np.where(diff > 0, diff, 0.0)
+        down = np.where(diff < 0, -diff, 0.0)
+
+    smoothed = ewm_mean(np.hstack([up, down]), alpha=1.0 / window, min_periods=window)
+    ema_up, ema_down = np.split(smoothed, 2, axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out = np.where(ema_down == 0, 100.0, 100 - (100 / (1 + ema_up / ema_down)))
+    return _restore(out, was_1d)
+
+
+def shift(values, periods: int = 1, fill=np.nan):
+    """Shifts along the time axis, like Series.shift."""
+    values = np.asarray(values)
+    out = np.empty_like(values, dtype=float if np.isnan(fill) else values.dtype)
+    if periods == 0:
+        out[:] = values
+    else:
+        out[:periods] = fill
+        out[periods:] = values[:-periods]
+    return out
+
+
+def rolling_beta(values, market, length: int):
+    """
+    Rolling beta and correlation of `values` against `market` (returns, time
+    on axis 0; market 1-D or one column per ticker) from prefix sums of x, y,
+    xy, x^2, y^2 in O(n), instead of a rolling cov/var per ticker.
+    NaN while the window is incomplete or contains a NaN in either input.
+    Returns (beta, correlation).
+    """
+    values, was_1d = _as_2d(values)
+    market = np.asarray(market, dtype=float)
+    market = np.broadcast_to(market[:, None] if market.ndim == 1 else market, values.shape)
+    # A bar counts only if both sides have it
+    missing = np.isnan(values) | np.isnan(market)
+    x = np.where(missing, np.nan, market)
+    y = np.where(missing, np.nan, values)
+
+    sx, nan_count = _window_sums(x, length)
+    sy = _window_sums(y, length)[0]
+    sxy = _window_sums(x * y, length)[0]
+    sxx = _window_sums(x * x, length)[0]
+    syy = _window_sums(y * y, length)[0]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sy / length
+        var_x = sxx - sx * sx / length
+        var_y = syy - sy * sy / length
+        beta = cov / var_x
+        corr = cov / np.sqrt(var_x * var_y)
+    incomplete = nan_count > 0
+    beta[incomplete] = np.nan
+    corr[incomplete] = np.nan
+    return _restore(beta, was_1d), _restore(corr, was_1d)
+
+
+def _prefix(values):
+    # Prefix sums with a leading zero row, so window sums are c[t + 1] - c[t + 1 - length]
+    return np.concatenate([np.zeros((1,) + values.shape[1:]), np.cumsum(values, axis=0)])
+
+
+def _window_sums(values, length: int):
+    n = values.shape[0]
+    window_sum = np.full(values.shape, np.nan)
+    nan_count = np.ones(values.shape)
+    if n < length:
+        return window_sum, nan_count
+    nan_mask = np.isnan(values)
+    c = _prefix(np.where(nan_mask, 0.0, values))
+    nans = _prefix(nan_mask.astype(float))
+    window_sum[length - 1:] = c[length:] - c[:-length]
+    nan_count[length - 1:] = nans[length:] - nans[:-length]
+    return window_sum, nan_count
+
+
+def pack_columns(values, valid):
+    """
+    Moves every column's valid rows to the top, keeping their order, so a
+    dates x tickers matrix with halts/late listings can be run through the
+    kernels as if each ticker's gaps had been dropped.
+    Returns (packed, order); invalid rows end up as trailing NaNs.
+    """
+    values = np.asarray(values, dtype=float)
+    valid = np.asarray(valid, dtype=bool)
+    order = np.argsort(~valid, axis=0, kind="stable")
+    packed = np.take_along_axis(values, order, axis=0)
+    rows = np.arange(values.shape[0])[:, None]
+    packed[rows >= valid.sum(axis=0)] = np.nan
+    return packed, order
+
+
+def unpack_columns(packed, order, valid, fill=np.nan):
+    """Inverse of pack_columns; invalid rows are set to `fill`."""
+    out = np.empty_like(packed)
+    np.put_along_axis(out, order, packed, axis=0)
+    out[~np.asarray(valid, dtype=bool)] = fill
+    return out
@@ -0,0 +1,167 @@
+import contextlib
+import io
+import json
+import threading
+import time
+
+import pandas as pd
+
+
+def frame_bytes(df: pd.DataFrame) -> int:
+    """
+    In-memory size of a frame (values + index), used as "bytes fetched".
+    Same as memory_usage(index=True).sum() for OHLCV frames, from the dtypes
+    alone (memory_usage builds a Series per column, which costs more than the
+    fetch it is measuring).
+    """
+    if df is None or df.empty:
+        return 0
+    return len(df) * sum(dtype.itemsize for dtype in df.dtypes) + df.index.nbytes
+
+
+class RunProfile:
+    """
+    Wall time, rows, bytes and failures per stage and per ticker for one
+    scan/backtest run. Thread safe, so fetch workers can record into it.
+
+        with RunProfile("scan_market", profiler="cprofile") as profile:
+            with profile.stage("fetch") as record:
+                frames = ...
+                record["rows"] = ...
+
+    `profiler` ("cprofile" or "pyinstrument") profiles the whole run, the text
+    report ends up in `profiler_report`.
+    """
+
+    def __init__(self, name: str, profiler: str = None):
+        self.name = name
+        self.profiler = profiler
+        self.stages = {}
+        self.tickers = {}
+        self.failures = {}
+        self.started = None
+        self.elapsed = 0.0
+        self.profiler_report = None
+        self._lock = threading.Lock()
+        self._profiler = None
+        self._start = None
+
+    def __enter__(self):
+        self.started = time.time()
+        self._start = time.perf_counter()
+        self._start_profiler()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._stop_profiler()
+        self.elapsed = time.perf_counter() - self._start
+        return False
+
+    @contextlib.contextmanager
+    def stage(self, name: str, ticker: str = None):
+        """
+        Times a block. The yielded dict takes optional "rows" and "bytes".
+        An exception is recorded as a failure and re-raised.
+        """
+        record = {"rows": 0, "bytes": 0}
+        start = time.perf_counter()
+        try:
+            yield record
+        except Exception as e:
+            self.fail(name, ticker, e)
+            raise
+        finally:
+            self.add(name, time.perf_counter() - start, rows=record["rows"], nbytes=record["bytes"], ticker=ticker)
+
+    def add(self, stage: str, seconds: float = 0.0, rows: int = 0, nbytes: int = 0, ticker: str = None):
+        with self._lock:
+            stats = self.stages.setdefault(stage, {"seconds": 0.0, "calls": 0, "rows": 0, "bytes": 0, "failures": 0})
+            stats["seconds"] += seconds
+            stats["calls"] += 1
+            stats["rows"] += int(rows)
+            stats["bytes"] += int(nbytes)
+            if ticker is not None:
+                per_ticker = self.tickers.setdefault(ticker, {}).setdefault(stage, {"seconds": 0.0, "rows": 0, "bytes": 0})
+                per_ticker["seconds"] += seconds
+                per_ticker["rows"] += int(rows)
+                per_ticker["bytes"] += int(nbytes)
+
+    def add_frame(self, stage: str, df: pd.DataFrame, seconds: float = 0.0, ticker: str = None):
+        """Records rows/bytes of a frame produced by a stage."""
+        rows = 0 if df is None else len(df)
+        self.add(stage, seconds, rows=rows, nbytes=frame_bytes(df), ticker=ticker)
+
+    def fail(self, stage: str, ticker: str, error):
+        if isinstance(error, Exception):
+            error = f"{type(error).__name__}: {error}"
+        with self._lock:
+            stats = self.stages.setdefault(stage, {"seconds": 0.0, "calls": 0, "rows": 0, "bytes": 0, "failures": 0})
+            stats["failures"] += 1
+            self.failures[f"{stage}:{ticker}" if ticker else stage] = str(error)
+
+    def stage_frame(self) -> pd.DataFrame:
+        """One row per stage, in the order stages first ran."""
+        if not self.stages:
+            return pd.DataFrame(columns=["stage", "seconds", "calls", "rows", "bytes", "failures", "share"])
+        df = pd.DataFrame([{"stage": name, **stats} for name, stats in self.stages.items()])
+        df["share"] = df["seconds"] / self.elapsed if self.elapsed else 0.0
+        return df
+
+    def ticker_frame(self) -> pd.DataFrame:
+        """Tickers x stages seconds, slowest first."""
+        if not self.tickers:
+            return pd.DataFrame()
+        df = pd.DataFrame({ticker: {stage: s["seconds"] for stage, s in stages.items()}
+                           for ticker, stages in self.tickers.items()}).T
+        df["total"] = df.sum(axis=1)
+        return df.sort_values("total", ascending=False)
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "started": self.started,
+            "elapsed": self.elapsed,
+            "stages": self.stages,
+            "tickers": self.tickers,
+            "failures": self.failures,
+            "profiler": self.profiler,
+            "profiler_report": self.profiler_report,
+        }
+
+    def to_json(self, path: str = None) -> str:
+        text = json.dumps(self.to_dict(), indent=2, default=str)
+        if path:
+            with open(path, "w") as f:
+                f.write(text)
+        return text
+
+    def summary(self) -> str:
+        parts = [f"{name} {stats['seconds']:.2f}s" for name, stats in self.stages.items()]
+        return f"{self.name} {self.elapsed:.2f}s ({', '.join(parts)}), {len(self.failures)} failed"
+
+    def _start_profiler(self):
+        if self.profiler == "cprofile":
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        elif self.profiler == "pyinstrument":
+            # Optional dependency, only needed when asked for
+            from pyinstrument import Profiler
+            self._profiler = Profiler()
+            self._profiler.start()
+        elif self.profiler:
+            raise ValueError(f"Unknown profiler: {self.profiler}")
+
+    def _stop_profiler(self):
+        if self._profiler is None:
+            return
+        if self.profiler == "cprofile":
+            import pstats
+            self._profiler.disable()
+            out = io.StringIO()
+            pstats.Stats(self._profiler, stream=out).sort_stats("cumulative").print_stats(30)
+            self.profiler_report = out.getvalue()
+        else:
+            self._profiler.stop()
+            self.profiler_report = self._profiler.output_text()
+        self._profiler = None
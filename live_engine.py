@@ -0,0 +1,252 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+import indicators
+from strategy_engine import StrategyEngine
+
+NAN = float("nan")
+
+
+class RollingWindow:
+    """
+    Ring buffer keeping the plain and linearly weighted sums of the last
+    `length` values (weights 1..length, newest heaviest) in O(1) per value.
+    Sums are rebuilt from the buffer once per full cycle so float drift
+    can't accumulate.
+    """
+
+    __slots__ = ("length", "values", "pos", "count", "plain", "weighted")
+
+    def __init__(self, length: int):
+        self.length = length
+        self.values = [0.0] * length
+        self.pos = 0
+        self.count = 0
+        self.plain = 0.0
+        self.weighted = 0.0
+
+    def push(self, value: float):
+        if self.count < self.length:
+            self.count += 1
+            self.weighted += self.count * value
+            self.plain += value
+        else:
+            # Every weight drops by one (the oldest falls to zero), the new value gets `length`
+            self.weighted += self.length * value - self.plain
+            self.plain += value - self.values[self.pos]
+        self.values[self.pos] = value
+        self.pos = (self.pos + 1) % self.length
+        if self.pos == 0 and self.count == self.length:
+            self._rebuild()
+
+    def _rebuild(self):
+        # pos == 0 here, so the buffer is already oldest to newest
+        self.plain = math.fsum(self.values)
+        self.weighted = math.fsum((i + 1) * v for i, v in enumerate(self.values))
+
+    def peek_mean(self, value: float) -> float:
+        """Mean of the window if `value` were pushed, without pushing it."""
+        if self.count + 1 < self.length:
+            return NAN
+        if self.count < self.length:
+            return (self.plain + value) / self.length
+        return (self.plain + value - self.values[self.pos]) / self.length
+
+    def peek_weighted_mean(self, value: float) -> float:
+        """Weighted mean of the window if `value` were pushed, without pushing it."""
+        if self.count + 1 < self.length:
+            return NAN
+        if self.count < self.length:
+            weighted = self.weighted + self.length * value
+        else:
+            weighted = self.weighted + self.length * value - self.plain
+        return weighted / (self.length * (self.length + 1) / 2)
+
+
+class TickerState:
+    """
+    Indicator state after the last committed bar of one ticker.
+    The newest (possibly still forming) bar is kept separately so intraday
+    polls can replace it without touching committed history.
+    """
+
+    __slots__ = ("bars", "close", "ema", "wma", "window", "avg_up", "avg_down",
+                 "last_date", "last_close", "latest")
+
+    def __init__(self, wma_len: int):
+        # Committed bars and the values after the last of them
+        self.bars = 0
+        self.close = NAN
+        self.ema = NAN
+        self.wma = NAN
+        self.window = RollingWindow(wma_len)
+        self.avg_up = 0.0
+        self.avg_down = 0.0
+        # Newest bar, replaced until a bar with a new date arrives
+        self.last_date = None
+        self.last_close = NAN
+        self.latest = None
+
+
+class LiveSignalEngine:
+    """
+    Incremental version of StrategyEngine for bar-by-bar updates.
+    Each update is O(1) per ticker and returns the same dict as
+    StrategyEngine.get_latest_signal on the full history.
+    """
+
+    def __init__(self, ema_len=9, wma_len=30, index_sma_len=50, rsi_len=14, min_bars=50):
+        self.ema_len = ema_len
+        self.wma_len = wma_len
+        self.index_sma_len = index_sma_len
+        self.rsi_len = rsi_len
+        self.min_bars = min_bars
+        self.ema_alpha = 2.0 / (ema_len + 1)
+        self.rsi_alpha = 1.0 / rsi_len
+        self.states = {}
+
+        # Index regime: committed SMA window plus the newest index bar
+        self.index_window = RollingWindow(index_sma_len)
+        self.index_last_date = None
+        self.index_last_close = NAN
+        self.index_positive = {}
+
+    @classmethod
+    def from_strategy(cls, strategy_engine: StrategyEngine) -> "LiveSignalEngine":
+        return cls(strategy_engine.ema_len, strategy_engine.wma_len, strategy_engine.index_sma_len)
+
+    # --- Index ---
+    def seed_index(self, index_df: pd.DataFrame):
+        """Replays index history so the market filter is ready for live updates."""
+        for date, close in zip(index_df.index, index_df['close'].to_numpy(dtype=float)):
+            self.update_index(date, close)
+
+    def update_index(self, date, close: float) -> bool:
+        """
+        Adds (or replaces, for the same date) the newest index bar.
+        Returns market_positive for that bar.
+        """
+        if math.isnan(close):
+            return False
+        if self.index_last_date is not None and date != self.index_last_date:
+            self.index_window.push(self.index_last_close)
+            # Only the current bar is needed for live checks
+            self.index_positive.clear()
+        self.index_last_date = date
+        self.index_last_close = close
+
+        sma = self.index_window.peek_mean(close)
+        positive = not math.isnan(sma) and close > sma
+        self.index_positive[date] = positive
+        return positive
+
+    # --- Tickers ---
+    def seed(self, ticker: str, df: pd.DataFrame, index_df: pd.DataFrame = None) -> dict:
+        """
+        Builds the state for a ticker from history (one O(n) replay).
+        index_df gives the historical market filter; without it the filter is
+        taken as positive, like calculate_indicators without an index.
+        """
+        self.states.pop(ticker, None)
+        df = df.dropna()
+
+        if index_df is not None and not index_df.empty:
+            index_close = index_df['close'].to_numpy(dtype=float)
+            index_sma = pd.Series(indicators.sma(index_close, self.index_sma_len), index=index_df.index)
+            market = (index_df['close'].reindex(df.index) > index_sma.reindex(df.index)).to_numpy()
+        else:
+            market = np.ones(len(df), dtype=bool)
+
+        latest = None
+        for date, close, positive in zip(df.index, df['close'].to_numpy(dtype=float), market):
+            latest = self.update(ticker, date, close, market_positive=bool(positive))
+        return latest
+
+    def update(self, ticker: str, date, close: float, market_positive: bool = None) -> dict:
+        """
+        Ingests one bar. A bar with the same date as the previous one replaces it
+        (intraday refresh of the forming bar). market_positive defaults to the
+        index state for `date` (False if the index has no bar for it).
+        Returns the latest signal dict, or None while history is too short.
+        """
+        if close is None or math.isnan(close):
+            return None
+
+        state = self.states.get(ticker)
+        if state is None:
+            state = self.states[ticker] = TickerState(self.wma_len)
+
+        if state.last_date is not None and date != state.last_date:
+            self._commit(state)
+
+        if market_positive is None:
+            market_positive = self.index_positive.get(date, False) if self.index_last_date is not None else True
+
+        state.last_date = date
+        state.last_close = close
+        state.latest = self._evaluate(state, date, close, market_positive)
+        return state.latest if state.bars + 1 >= self.min_bars else None
+
+    def latest_signals(self) -> dict:
+        """{ticker: latest signal dict} for tickers with enough history."""
+        return {
+            ticker: state.latest for ticker, state in self.states.items()
+            if state.latest is not None and state.bars + 1 >= self.min_bars
+        }
+
+    def _values(self, state: TickerState, close: float):
+        # Indicator values if `close` were appended to the committed history
+        if state.bars == 0:
+            ema = close
+            up = down = 0.0
+        else:
+            ema = self.ema_alpha * close + (1 - self.ema_alpha) * state.ema
+            diff = close - state.close
+            up = diff if diff > 0 else 0.0
+            down = -diff if diff < 0 else 0.0
+
+        if state.bars == 0:
+            avg_up, avg_down = up, down
+        else:
+            avg_up = self.rsi_alpha * up + (1 - self.rsi_alpha) * state.avg_up
+            avg_down = self.rsi_alpha * down + (1 - self.rsi_alpha) * state.avg_down
+
+        wma = state.window.peek_weighted_mean(close)
+        return ema, wma, avg_up, avg_down
+
+    def _commit(self, state: TickerState):
+        close = state.last_close
+        state.ema, state.wma, state.avg_up, state.avg_down = self._values(state, close)
+        state.window.push(close)
+        state.close = close
+        state.bars += 1
+
+    def _evaluate(self, state: TickerState, date, close: float, market_positive: bool) -> dict:
+        ema, wma, avg_up, avg_down = self._values(state, close)
+
+        if state.bars + 1 < self.rsi_len:
+            rsi = NAN
+        elif avg_down == 0:
+            rsi = 100.0
+        else:
+            rsi = 100 - (100 / (1 + avg_up / avg_down))
+
+        prev_close = state.close
+        trend_up = ema > wma
+        rsi_positive = rsi > 50
+        crossover = prev_close < state.ema and close > ema
+
+        return {
+            "date": date,
+            "close": close,
+            "ema_9": ema,
+            "wma_30": wma,
+            "rsi": rsi,
+            "trend_up": bool(trend_up),
+            "market_positive": bool(market_positive),
+            "rsi_positive": bool(rsi_positive),
+            "buy_signal": bool(market_positive and trend_up and crossover and rsi_positive),
+            "exit_signal": bool(prev_close > state.wma and close < wma)
+        }
@@ -0,0 +1,95 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+import indicators
+from data_manager import DataManager
+
+
+class MarketRegime:
+    """
+    Index (XU100) regime shared by the app, scanner and backtester.
+    The index is fetched once per (period, interval) and the SMA /
+    market_positive series once per SMA length; both are cached for `ttl` seconds.
+    """
+
+    def __init__(self, data_manager: DataManager = None, index_ticker: str = "XU100.IS", ttl: int = 900):
+        self.data_manager = data_manager or DataManager()
+        self.index_ticker = index_ticker
+        self.ttl = ttl
+        self._index = {}    # (period, interval) -> (fetched_at, DataFrame)
+        self._regime = {}   # (period, interval, sma_len) -> DataFrame[close, sma, market_positive]
+
+    def index_data(self, period: str = "6mo", interval: str = "1d") -> pd.DataFrame:
+        """
+        Index OHLCV, fetched at most once per `ttl`.
+        """
+        key = (period, interval)
+        cached = self._index.get(key)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl:
+            return cached[1]
+
+        df = self.data_manager.fetch_ohlcv(self.index_ticker, period=period, interval=interval)
+        self._index[key] = (time.monotonic(), df)
+        # Regime series built on the old frame are no longer valid
+        self._regime = {k: v for k, v in self._regime.items() if k[:2] != key}
+        return df
+
+    def regime(self, period: str = "6mo", interval: str = "1d", sma_len: int = 50) -> pd.DataFrame:
+        """
+        Index close, SMA and market_positive (close > SMA) on the index calendar.
+        """
+        index_df = self.index_data(period, interval)
+        key = (period, interval, sma_len)
+        if key not in self._regime:
+            if index_df.empty:
+                self._regime[key] = pd.DataFrame(columns=['close', 'sma', 'market_positive'])
+            else:
+                close = index_df['close'].to_numpy(dtype=float)
+                sma = indicators.sma(close, sma_len)
+                self._regime[key] = pd.DataFrame(
+                    {'close': close, 'sma': sma, 'market_positive': close > sma}, index=index_df.index
+                )
+        return self._regime[key]
+
+    def aligned(self, dates: pd.Index, period: str = "6mo", interval: str = "1d", sma_len: int = 50) -> np.ndarray:
+        """
+        market_positive as a boolean array aligned to `dates`.
+        Dates the index has no bar for are negative, same as the old join.
+        If the index could not be fetched at all, everything is positive.
+        """
+        regime = self.regime(period, interval, sma_len)
+        if regime.empty:
+            return np.ones(len(dates), dtype=bool)
+        return regime['market_positive'].reindex(dates, fill_value=False).to_numpy(dtype=bool)
+
+    def aligned_close(self, dates: pd.Index, period: str = "6mo", interval: str = "1d") -> np.ndarray:
+        """
+        Index close aligned to `dates`, carried forward over dates the index has
+        no bar for (relative strength / beta inputs). None if the index is unavailable.
+        """
+        index_df = self.index_data(period, interval)
+        if index_df.empty:
+            return None
+        close = index_df['close']
+        return close.reindex(close.index.union(dates)).ffill().reindex(dates).to_numpy(dtype=float)
+
+    def status(self, period: str = "6mo", interval: str = "1d", sma_len: int = 50) -> dict:
+        """
+        Latest index close vs its SMA, for status displays. None if unavailable.
+        """
+        regime = self.regime(period, interval, sma_len)
+        if regime.empty:
+            return None
+        last = regime.iloc[-1]
+        return {
+            "date": regime.index[-1],
+            "close": last['close'],
+            "sma": last['sma'],
+            "market_positive": bool(last['market_positive'])
+        }
+
+    def clear(self):
+        self._index.clear()
+        self._regime.clear()
@@ -0,0 +1,156 @@
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+import bist_calendar
+
+DEFAULT_STORE_DIR = os.environ.get(
+    "BIST_STORE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "bist-alpha-filter", "ohlcv")
+)
+
+# Relative close difference on an already stored bar that means the provider re-adjusted history
+ADJUSTMENT_RTOL = 1e-4
+
+
+class OHLCVStore:
+    """
+    On-disk Parquet store, one file per ticker/interval.
+    Bars are only ever appended (or the last partial bar overwritten), so a scan
+    only needs to download what happened since the previous run. A top-up that
+    shows history was re-adjusted (see basis_changed) replaces the whole file.
+    """
+
+    def __init__(self, root: str = DEFAULT_STORE_DIR, live_ttl: int = 900):
+        self.root = root
+        # During the session the newest bar keeps changing; refresh at most this often (seconds)
+        self.live_ttl = timedelta(seconds=live_ttl)
+
+    def path(self, ticker: str, interval: str) -> str:
+        return os.path.join(self.root, interval, f"{ticker}.parquet")
+
+    def load(self, ticker: str, interval: str) -> pd.DataFrame:
+        """
+        Returns stored bars or an empty frame if nothing is stored yet.
+        """
+        path = self.path(ticker, interval)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        try:
+            return pd.read_parquet(path)
+        except Exception as e:
+            print(f"Corrupt store file {path}: {e}")
+            return pd.DataFrame()
+
+    def save(self, ticker: str, interval: str, df: pd.DataFrame):
+        path = self.path(ticker, interval)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so a crashed run never leaves a half written file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+
+    def touch(self, ticker: str, interval: str):
+        """Marks stored bars as checked now without rewriting them."""
+        path = self.path(ticker, interval)
+        if os.path.exists(path):
+            os.utime(path)
+
+    def append(self, ticker: str, interval: str, new_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Merges freshly downloaded bars into the store. Overlapping bars are
+        replaced by the new download (the last stored bar may have been partial).
+        """
+        stored = self.load(ticker, interval)
+        if new_df.empty:
+            self.touch(ticker, interval)
+            return stored
+
+        if stored.empty:
+            merged = new_df
+        else:
+            merged = pd.concat([stored, new_df])
+            merged = merged[~merged.index.duplicated(keep="last")].sort_index()
+
+        self.save(ticker, interval, merged)
+        return merged
+
+    def replace(self, ticker: str, interval: str, new_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Overwrites the stored bars with a full refetch (after basis_changed).
+        An empty refetch keeps what is stored.
+        """
+        if new_df.empty:
+            return self.load(ticker, interval)
+        self.save(ticker, interval, new_df)
+        return new_df
+
+    @staticmethod
+    def basis_changed(stored: pd.DataFrame, new_df: pd.DataFrame, rtol: float = ADJUSTMENT_RTOL) -> bool:
+        """
+        True if a top-up disagrees with the stored closes of bars that were
+        already complete (all but the last stored bar, which may have been
+        partial). Bars are auto-adjusted, so after a split or dividend the
+        provider rewrites history and the stored bars must be refetched rather
+        than appended to.
+        """
+        if stored.empty or new_df.empty:
+            return False
+        overlap = stored.index[:-1].intersection(new_df.index)
+        if overlap.empty:
+            return False
+        old = stored.loc[overlap, "close"].to_numpy(dtype=float)
+        new = new_df.loc[overlap, "close"].to_numpy(dtype=float)
+        return not np.allclose(new, old, rtol=rtol, equal_nan=True)
+
+    def is_fresh(self, ticker: str, interval: str, now: datetime = None) -> bool:
+        """
+        Staleness follows the BIST session calendar:
+        - during the session, bars are fresh for `live_ttl`
+        - outside the session, bars are fresh if written after the last session close
+        """
+        path = self.path(ticker, interval)
+        if not os.path.exists(path):
+            return False
+
+        now = bist_calendar.to_bist(now)
+        written = datetime.fromtimestamp(os.path.getmtime(path), tz=bist_calendar.BIST_TZ)
+
+        if bist_calendar.is_session_open(now):
+            return now - written < self.live_ttl
+        return written >= bist_calendar.last_session_close(now)
+
+    def covers(self, df: pd.DataFrame, period: str, now: datetime = None) -> bool:
+        """
+        True if stored bars reach back far enough for the requested period.
+        """
+        if df.empty:
+            return False
+        start = bist_calendar.period_start(period, now)
+        if start is None:
+            # "max" can't be verified locally, trust whatever was stored
+            return True
+        first = _naive(df.index[0])
+        # Allow a few days of slack for weekends/holidays at the start of the window
+        return first <= start + pd.Timedelta(days=5)
+
+
+def slice_period(df: pd.DataFrame, period: str, now: datetime = None) -> pd.DataFrame:
+    """
+    Returns the bars of `df` that fall inside a yfinance style period counted
+    back from `now` (default: today). Bars after an explicit `now` are dropped.
+    """
+    start = bist_calendar.period_start(period, now)
+    if df.empty or (start is None and now is None):
+        return df
+    index = df.index.tz_localize(None) if getattr(df.index, "tz", None) is not None else df.index
+    keep = index >= start if start is not None else np.ones(len(df), dtype=bool)
+    if now is not None:
+        keep &= index <= _naive(now)
+    return df[keep]
+
+
+def _naive(ts) -> pd.Timestamp:
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize(None) if ts.tzinfo is not None else ts
@@ -0,0 +1,172 @@
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import indicators
+from backtester import position_events
+from data_manager import DataManager
+from market_regime import MarketRegime
+from strategy_engine import StrategyEngine
+import timeframes
+
+# Precomputed arrays shared with worker processes (set once per worker by the pool initializer)
+_shared = {}
+
+
+def _init_worker(precomputed: dict):
+    _shared.update(precomputed)
+
+
+def _evaluate_chunk(combos: list) -> list:
+    return [evaluate_combo(_shared, *combo) for combo in combos]
+
+
+def combo_signals(pre: dict, ema_len: int, wma_len: int, index_sma_len: int):
+    """Buy and exit signals of one parameter combination on the precomputed (packed) arrays."""
+    signals = StrategyEngine.calculate_signals(
+        pre['close'], pre['ema'][ema_len], pre['wma'][wma_len], pre['rsi'], pre['market'][index_sma_len]
+    )
+    return signals['buy_signal'], signals['exit_signal']
+
+
+def combo_events(pre: dict, buy: np.ndarray, exit_: np.ndarray, window=None):
+    """
+    Entry/exit bars from combo_signals. `window` optionally limits trading to a
+    packed-row mask: signals outside it are ignored, so every window starts flat.
+    """
+    if window is not None:
+        buy, exit_ = buy & window, exit_ & window
+    opens, closes = position_events(buy, exit_)
+    # Backtester skips tickers with less than 50 bars
+    opens &= pre['eligible']
+    return opens, closes
+
+
+def trade_stats(close: np.ndarray, opens: np.ndarray, closes: np.ndarray, last_bar: np.ndarray):
+    """
+    Pairs entries with exits per ticker. An unmatched last entry closes on
+    `last_bar` (per ticker). Returns per ticker (trades, wins, summed return).
+    """
+    # (ticker, bar) pairs sorted by ticker then bar
+    entry_col, entry_row = np.nonzero(opens.T)
+    exit_col, exit_row = np.nonzero(closes.T)
+
+    n_tickers = close.shape[1]
+    n_entries = np.bincount(entry_col, minlength=n_tickers)
+    n_exits = np.bincount(exit_col, minlength=n_tickers)
+    entry_start = np.concatenate([[0], np.cumsum(n_entries)[:-1]])
+    exit_start = np.concatenate([[0], np.cumsum(n_exits)[:-1]])
+
+    # k-th exit of a ticker closes its k-th entry, an unmatched last entry closes on the last bar
+    rank = np.arange(len(entry_col)) - entry_start[entry_col]
+    matched = rank < n_exits[entry_col]
+    exit_bar = last_bar[entry_col].copy()
+    exit_bar[matched] = exit_row[exit_start[entry_col[matched]] + rank[matched]]
+
+    entry_price = close[entry_row, entry_col]
+    returns = (close[exit_bar, entry_col] - entry_price) / entry_price
+
+    wins = np.bincount(entry_col, weights=returns > 0, minlength=n_tickers)
+    total_return = np.bincount(entry_col, weights=returns, minlength=n_tickers)
+    return n_entries, wins, total_return
+
+
+def evaluate_combo(pre: dict, ema_len: int, wma_len: int, index_sma_len: int) -> dict:
+    """
+    Backtests one parameter combination over every ticker using precomputed
+    indicator arrays. Same metrics as Backtester.backtest_tickers, averaged over
+    tickers that traded.
+    """
+    opens, closes = combo_events(pre, *combo_signals(pre, ema_len, wma_len, index_sma_len))
+    n_entries, wins, total_return = trade_stats(pre['close'], opens, closes, pre['last_bar'])
+    traded = n_entries > 0
+
+    return {
+        "ema_len": ema_len,
+        "wma_len": wma_len,
+        "index_sma_len": index_sma_len,
+        "Tickers": int(traded.sum()),
+        "Total Trades": int(n_entries.sum()),
+        "Win Rate": float((wins[traded] / n_entries[traded]).mean()) if traded.any() else 0.0,
+        "Total Return": float(total_return[traded].mean()) if traded.any() else 0.0,
+    }
+
+
+class ParameterOptimizer:
+    def __init__(self, data_manager: DataManager = None, market_regime: MarketRegime = None):
+        self.data_manager = data_manager or DataManager()
+        self.market_regime = market_regime or MarketRegime(self.data_manager)
+
+    def load_data(self, tickers: list, period: str = None, interval: str = "1d"):
+        """
+        Downloads (or reads from the store) everything once.
+        Returns (close, valid).
+        """
+        period = period or timeframes.backtest_period(interval)
+        frames = self.data_manager.fetch_ohlcv_bulk(tickers, period=period, interval=interval)
+        if not frames:
+            return pd.DataFrame(), pd.DataFrame()
+
+        fields = self.data_manager.to_panel(frames)
+        valid = fields['close'].notna()
+        for field in fields.values():
+            valid &= field.notna()
+        return fields['close'], valid
+
+    @staticmethod
+    def precompute(close: pd.DataFrame, valid: pd.DataFrame, market_positive: dict,
+                   ema_lens: list, wma_lens: list) -> dict:
+        """
+        Computes each distinct EMA span and WMA length once, on packed columns
+        (see StrategyEngine.calculate_panel). market_positive maps each index
+        SMA length to a filter aligned to close.index.
+        """
+        valid = valid.to_numpy(dtype=bool)
+        packed, order = indicators.pack_columns(close.to_numpy(dtype=float), valid)
+        counts = valid.sum(axis=0)
+        market = {length: np.asarray(positive, dtype=bool)[order] for length, positive in market_positive.items()}
+
+        return {
+            "close": packed,
+            "ema": {span: indicators.ema(packed, span) for span in set(ema_lens)},
+            "wma": {length: indicators.wma(packed, length) for length in set(wma_lens)},
+            "rsi": indicators.rsi(packed, 14),
+            "market": market,
+            "eligible": counts >= 50,
+            "last_bar": np.maximum(counts - 1, 0),
+            "order": order,
+        }
+
+    def optimize(self, tickers: list, ema_lens: list, wma_lens: list, index_sma_lens: list,
+                 period: str = None, interval: str = "1d", max_workers: int = None) -> pd.DataFrame:
+        """
+        Evaluates every (ema_len, wma_len, index_sma_len) combination across the
+        ticker list. Returns a table ranked by Total Return.
+        """
+        close, valid = self.load_data(tickers, period=period, interval=interval)
+        if close.empty:
+            return pd.DataFrame()
+
+        idx_period = timeframes.index_period(interval)
+        market_positive = {
+            length: self.market_regime.aligned(close.index, period=idx_period, interval=interval, sma_len=length)
+            for length in set(index_sma_lens)
+        }
+        pre = self.precompute(close, valid, market_positive, ema_lens, wma_lens)
+        combos = list(itertools.product(sorted(set(ema_lens)), sorted(set(wma_lens)), sorted(set(index_sma_lens))))
+
+        max_workers = max_workers or os.cpu_count() or 1
+        if max_workers == 1 or len(combos) < 2 * max_workers:
+            # Not worth the process start-up cost
+            rows = [evaluate_combo(pre, *combo) for combo in combos]
+        else:
+            chunk_size = -(-len(combos) // (max_workers * 4))
+            chunks = [combos[i:i + chunk_size] for i in range(0, len(combos), chunk_size)]
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(pre,)) as pool:
+                rows = [row for chunk_rows in pool.map(_evaluate_chunk, chunks) for row in chunk_rows]
+
+        results = pd.DataFrame(rows)
+        return results.sort_values(by=["Total Return", "Win Rate"], ascending=False).reset_index(drop=True)
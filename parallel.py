@@ -0,0 +1,24 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Fewer items than this per chunk cost more in process start-up and pickling than they save
+MIN_CHUNK = 10
+
+
+def run_chunked(fn, items, max_workers: int = None, job=None) -> list:
+    """
+    Splits `items` into at most `max_workers` strided chunks of about
+    MIN_CHUNK items or more and returns [fn(job(chunk)) for each chunk],
+    computed in a process pool. With a single chunk everything runs
+    in-process. `job` builds fn's argument from a chunk (in this process,
+    so it may be a lambda); fn must be picklable (module level).
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    n_chunks = min(max_workers, max(len(items) // MIN_CHUNK, 1))
+    jobs = [items[i::n_chunks] for i in range(n_chunks)]
+    if job is not None:
+        jobs = [job(chunk) for chunk in jobs]
+    if n_chunks == 1:
+        return [fn(arg) for arg in jobs]
+    with ProcessPoolExecutor(max_workers=n_chunks) as pool:
+        return list(pool.map(fn, jobs))
@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+
+import timeframes
+
+
+class PortfolioSimulator:
+    """
+    Finite-capital simulation of the buy/exit signal matrix on a common
+    dates x tickers calendar. Orders fill at the signal bar's close (like
+    Backtester.run_backtest), with slippage on the price and a commission on
+    traded notional. Exits are processed before entries, so an exit + buy on
+    the same bar re-enters.
+
+    Sizing: each new position gets `position_size` of current equity (default
+    1 / max_positions), capped by available cash. When more tickers signal than
+    there are free slots, the highest `rank` wins (column order without a rank).
+    """
+
+    def __init__(self, initial_capital: float = 100_000.0, max_positions: int = 10, position_size: float = None,
+                 commission: float = 0.002, slippage: float = 0.001, interval: str = "1d"):
+        self.initial_capital = initial_capital
+        self.max_positions = max_positions
+        self.position_size = position_size or 1.0 / max_positions
+        # Fractions of notional, e.g. 0.002 = 20 bps per side
+        self.commission = commission
+        self.slippage = slippage
+        self.interval = interval
+
+    def run(self, close: pd.DataFrame, buy: pd.DataFrame, exit_: pd.DataFrame, valid: pd.DataFrame = None,
+            rank: pd.DataFrame = None) -> dict:
+        """
+        Returns {'curve': per bar equity/cash/exposure/positions/drawdown/returns,
+        'trades': one row per round trip, 'metrics': summary dict}.
+        """
+        dates, tickers = close.index, close.columns
+        prices = close.to_numpy(dtype=float)
+        if valid is None:
+            valid = close.notna()
+        valid = valid.reindex(index=dates, columns=tickers, fill_value=False).to_numpy(dtype=bool)
+        buy = buy.reindex(index=dates, columns=tickers, fill_value=False).to_numpy(dtype=bool) & valid
+        exit_ = exit_.reindex(index=dates, columns=tickers, fill_value=False).to_numpy(dtype=bool) & valid
+        rank = None if rank is None else rank.reindex(index=dates, columns=tickers).to_numpy(dtype=float)
+        # Holdings are marked at the last traded price through halts
+        marks = pd.DataFrame(np.where(valid, prices, np.nan)).ffill().to_numpy()
+
+        n_rows, n_cols = prices.shape
+        shares = np.zeros(n_cols)
+        entry_price = np.zeros(n_cols)
+        entry_row = np.zeros(n_cols, dtype=int)
+        cash = self.initial_capital
+        equity = np.empty(n_rows)
+        cash_curve = np.empty(n_rows)
+        invested = np.empty(n_rows)
+        n_positions = np.empty(n_rows, dtype=int)
+        fees = 0.0
+        trades = []
+
+        for t in range(n_rows):
+            held = shares > 0
+
+            sells = np.flatnonzero(held & exit_[t])
+            if len(sells):
+                fill = prices[t, sells] * (1 - self.slippage)
+                notional = shares[sells] * fill
+                cash += notional.sum() * (1 - self.commission)
+                fees += notional.sum() * self.commission
+                for col, price in zip(sells, fill):
+                    trades.append((col, entry_row[col], t, entry_price[col], price, shares[col]))
+                shares[sells] = 0
+                held[sells] = False
+
+            free = self.max_positions - held.sum()
+            candidates = np.flatnonzero(~held & buy[t])
+            if free > 0 and len(candidates):
+                if rank is not None:
+                    candidates = candidates[np.argsort(-np.nan_to_num(rank[t, candidates], nan=-np.inf), kind="stable")]
+                candidates = candidates[:free]
+                equity_now = cash + np.nansum(shares * marks[t])
+                # Same target for every new position, scaled down together if cash runs short
+                target = min(equity_now * self.position_size, cash / len(candidates) / (1 + self.commission))
+                if target > 0:
+                    fill = prices[t, candidates] * (1 + self.slippage)
+                    shares[candidates] = target / fill
+                    entry_price[candidates] = fill
+                    entry_row[candidates] = t
+                    cash -= target * len(candidates) * (1 + self.commission)
+                    fees += target * len(candidates) * self.commission
+
+            value = np.nansum(shares * marks[t])
+            equity[t] = cash + value
+            cash_curve[t] = cash
+            invested[t] = value
+            n_positions[t] = (shares > 0).sum()
+
+        # Positions still open are valued at the last mark (no exit costs)
+        n_closed = len(trades)
+        for col in np.flatnonzero(shares > 0):
+            trades.append((col, entry_row[col], n_rows - 1, entry_price[col], marks[-1, col], shares[col]))
+
+        curve = pd.DataFrame({
+            "equity": equity,
+            "cash": cash_curve,
+            "exposure": np.divide(invested, equity, out=np.zeros(n_rows), where=equity > 0),
+            "positions": n_positions,
+        }, index=dates)
+        curve["drawdown"] = curve["equity"] / curve["equity"].cummax() - 1
+        curve["returns"] = curve["equity"].pct_change().fillna(0.0)
+
+        trades = pd.DataFrame(
+            [{"Ticker": tickers[col], "entry_date": dates[i], "exit_date": dates[j], "entry_price": p0,
+              "exit_price": p1, "shares": q, "return": p1 / p0 - 1, "status": "open" if k >= n_closed else "closed"}
+             for k, (col, i, j, p0, p1, q) in enumerate(trades)],
+            columns=["Ticker", "entry_date", "exit_date", "entry_price", "exit_price", "shares", "return", "status"]
+        )
+        return {"curve": curve, "trades": trades, "metrics": self.metrics(curve, trades, fees)}
+
+    def metrics(self, curve: pd.DataFrame, trades: pd.DataFrame, fees: float = 0.0) -> dict:
+        returns = curve["returns"]
+        bars_per_year = timeframes.BARS_PER_YEAR[self.interval]
+        years = len(curve) / bars_per_year if len(curve) else 0
+        final = curve["equity"].iloc[-1] if len(curve) else self.initial_capital
+        std = returns.std()
+        return {
+            "Final Equity": float(final),
+            "Total Return": float(final / self.initial_capital - 1),
+            "CAGR": float((final / self.initial_capital) ** (1 / years) - 1) if years > 0 and final > 0 else 0.0,
+            "Max Drawdown": float(curve["drawdown"].min()) if len(curve) else 0.0,
+            "Sharpe": float(returns.mean() / std * np.sqrt(bars_per_year)) if std > 0 else 0.0,
+            "Avg Exposure": float(curve["exposure"].mean()) if len(curve) else 0.0,
+            "Trades": int(len(trades)),
+            "Win Rate": float((trades["return"] > 0).mean()) if len(trades) else 0.0,
+            "Fees": float(fees),
+        }
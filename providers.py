@@ -0,0 +1,205 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import bist_calendar
+
+OHLCV_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Flattens yfinance columns and keeps only lower case OHLCV.
+    """
+    if df.empty:
+        return pd.DataFrame()
+
+    # Flatten MultiIndex columns if present (common in recent yfinance versions)
+    if isinstance(df.columns, pd.MultiIndex):
+        df = df.copy()
+        df.columns = df.columns.get_level_values(0)
+
+    # Ensure standard column names
+    df = df.rename(columns={
+        "Open": "open", "High": "high", "Low": "low",
+        "Close": "close", "Volume": "volume"
+    })
+
+    # Return only necessary columns
+    return df[OHLCV_COLUMNS]
+
+
+class DataProvider:
+    """
+    Source of raw market data behind DataManager.
+    Tickers are passed in provider form (e.g. "AKBNK.IS").
+    """
+
+    def download(self, tickers: list, interval: str = "1d", period: str = None, start: str = None,
+                 progress: bool = False) -> dict:
+        """
+        Returns {ticker: OHLCV frame with lower case columns}. Either `period`
+        or `start` is given. Tickers without data may be missing or empty.
+        """
+        raise NotImplementedError
+
+    def fundamentals(self, ticker: str) -> dict:
+        """
+        Returns a yfinance style info dict (trailingPE, priceToBook, marketCap, sector, industry).
+        """
+        raise NotImplementedError
+
+    def now(self):
+        """
+        The provider's current time: periods are counted back from it and stored
+        bars are judged fresh against it. None means the wall clock (live data).
+        """
+        return None
+
+
+class YFinanceProvider(DataProvider):
+    """Yahoo Finance via yfinance (network)."""
+
+    def download(self, tickers: list, interval: str = "1d", period: str = None, start: str = None,
+                 progress: bool = False) -> dict:
+        kwargs = {"start": start} if start is not None else {"period": period}
+        # Using threads=False sometimes helps with rate limits or errors, but True is faster
+        # Imported on first use: yfinance (and its HTTP stack) is the slowest import of the app
+        import yfinance as yf
+        bulk_data = yf.download(list(tickers), interval=interval, group_by='ticker',
+                                progress=progress, threads=True, **kwargs)
+        return self._split_tickers(bulk_data, list(tickers))
+
+    def fundamentals(self, ticker: str) -> dict:
+        import yfinance as yf
+        return yf.Ticker(ticker).info
+
+    @staticmethod
+    def _split_tickers(bulk_data: pd.DataFrame, tickers: list) -> dict:
+        """
+        Splits a group_by='ticker' bulk download into normalized per ticker
+        frames. The column layout is worked out once per download instead of
+        being probed for every ticker.
+        """
+        if bulk_data.empty:
+            return {}
+        if not isinstance(bulk_data.columns, pd.MultiIndex):
+            # Flat columns only happen for a single ticker request
+            return {tickers[0]: normalize_columns(bulk_data).dropna(how="all")} if len(tickers) == 1 else {}
+
+        # Sometimes yfinance returns (Price, Ticker) levels instead of (Ticker, Price)
+        names = set(bulk_data.columns.get_level_values(0))
+        if not any(t in names or t.removesuffix(".IS") in names for t in tickers):
+            bulk_data = bulk_data.swaplevel(axis=1)
+            names = set(bulk_data.columns.get_level_values(0))
+        # Normalize the price level for the whole chunk at once (see normalize_columns)
+        bulk_data = bulk_data.rename(columns=str.lower, level=1)
+        bulk_data = bulk_data.loc[:, bulk_data.columns.get_level_values(1).isin(OHLCV_COLUMNS)].sort_index(axis=1)
+
+        frames = {}
+        for ticker in tickers:
+            # Backup: some responses drop the .IS suffix
+            name = ticker if ticker in names else ticker.removesuffix(".IS")
+            if name in names:
+                # Rows where this ticker has no bar are all NaN in the shared frame
+                frames[ticker] = bulk_data[name][OHLCV_COLUMNS].dropna(how="all")
+        return frames
+
+
+class ReplayProvider(DataProvider):
+    """
+    Replays local snapshots, no network. Layout (same as OHLCVStore, so a
+    store directory can be replayed directly):
+
+        <root>/<interval>/<TICKER>.parquet   (or .csv)
+        <root>/fundamentals.json             {ticker: info dict}
+
+    Parquet files are read through memory maps. `as_of` pins "now" (see
+    DataProvider.now): bars after it are hidden and periods are counted back
+    from it, so runs are reproducible. Without it the snapshot is read like live
+    data, with periods counted back from today.
+    """
+
+    def __init__(self, root: str, as_of=None):
+        self.root = root
+        self.as_of = pd.Timestamp(as_of) if as_of is not None else None
+        self._fundamentals = None
+
+    def path(self, ticker: str, interval: str) -> str:
+        for name in (ticker, ticker.removesuffix(".IS")):
+            for ext in (".parquet", ".csv"):
+                path = os.path.join(self.root, interval, f"{name}{ext}")
+                if os.path.exists(path):
+                    return path
+        return None
+
+    def read(self, ticker: str, interval: str) -> pd.DataFrame:
+        path = self.path(ticker, interval)
+        if path is None:
+            return pd.DataFrame()
+        if path.endswith(".parquet"):
+            import pyarrow.parquet as pq
+            df = pq.read_table(path, memory_map=True).to_pandas()
+        else:
+            df = pd.read_csv(path, index_col=0, parse_dates=True, memory_map=True)
+        df = normalize_columns(df.rename(columns=str.capitalize))
+        return df.sort_index()
+
+    def download(self, tickers: list, interval: str = "1d", period: str = None, start: str = None,
+                 progress: bool = False) -> dict:
+        frames = {}
+        for ticker in tickers:
+            df = self.read(ticker, interval)
+            if df.empty:
+                frames[ticker] = df
+                continue
+
+            index = df.index.tz_localize(None) if getattr(df.index, "tz", None) is not None else df.index
+            keep = np.ones(len(df), dtype=bool)
+            if self.as_of is not None:
+                keep &= index <= self.as_of
+            if start is not None:
+                keep &= index >= pd.Timestamp(start)
+            elif period is not None:
+                first = bist_calendar.period_start(period, self.now())
+                if first is not None:
+                    keep &= index >= first
+            frames[ticker] = df[keep]
+        return frames
+
+    def now(self):
+        return self.as_of.to_pydatetime() if self.as_of is not None else None
+
+    def fundamentals(self, ticker: str) -> dict:
+        if self._fundamentals is None:
+            path = os.path.join(self.root, "fundamentals.json")
+            self._fundamentals = {}
+            if os.path.exists(path):
+                with open(path) as f:
+                    self._fundamentals = json.load(f)
+        info = self._fundamentals.get(ticker, self._fundamentals.get(ticker.removesuffix(".IS")))
+        if info is None:
+            raise KeyError(f"No fundamentals for {ticker} in snapshot")
+        return info
+
+
+def write_snapshot(root: str, frames: dict, interval: str = "1d", fmt: str = "parquet", fundamentals: dict = None):
+    """
+    Writes {ticker: OHLCV frame} (and optional {ticker: info dict}) in the
+    ReplayProvider layout, e.g. to freeze a live download for CI.
+    """
+    os.makedirs(os.path.join(root, interval), exist_ok=True)
+    for ticker, df in frames.items():
+        path = os.path.join(root, interval, f"{ticker}.{fmt}")
+        if fmt == "parquet":
+            df.to_parquet(path)
+        elif fmt == "csv":
+            df.to_csv(path)
+        else:
+            raise ValueError(f"Unsupported snapshot format: {fmt}")
+
+    if fundamentals:
+        with open(os.path.join(root, "fundamentals.json"), "w") as f:
+            json.dump(fundamentals, f, indent=2, default=str)
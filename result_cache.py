@@ -0,0 +1,65 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResultCache:
+    """
+    In-process TTL + LRU cache for computed artifacts (indicator frames, scan
+    panels). Keys are tuples like (ticker, interval, period, strategy params).
+    Lives on the Scanner, so under Streamlit it survives reruns.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 900, clock=time.monotonic):
+        self.maxsize = maxsize
+        # Seconds an entry stays valid, the same window as the store's live refresh
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or self.clock() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (self.clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        """Cached value for key, or compute() stored under it. Empty results are not cached."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            if not getattr(value, "empty", False):
+                self.put(key, value)
+        return value
+
+    def discard(self, match):
+        """Drops every entry whose key satisfies match(key)."""
+        with self._lock:
+            for key in [key for key in self._entries if match(key)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key) -> bool:
+        return self.get(key) is not None
@@ -0,0 +1,135 @@
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from parallel import run_chunked
+
+
+def trade_arrays(trades: list, close: pd.Series):
+    """
+    (returns, holding bars) of run_backtest trades, holding measured in bars
+    of `close`. Trades whose dates are not on the close index are dropped.
+    """
+    if not trades:
+        return np.empty(0), np.empty(0, dtype=int)
+    entries = close.index.get_indexer(pd.Index([t["entry_date"] for t in trades]))
+    exits = close.index.get_indexer(pd.Index([t["exit_date"] for t in trades]))
+    known = (entries >= 0) & (exits >= entries)
+    returns = np.array([t["return"] for t in trades], dtype=float)[known]
+    return returns, (exits - entries)[known]
+
+
+def bootstrap_paths(returns: np.ndarray, n_resamples: int, rng) -> tuple:
+    """
+    Resamples the trade list with replacement. Returns (total return, win
+    rate) per path, the same statistics backtest_tickers reports.
+    """
+    draws = returns[rng.integers(0, len(returns), size=(n_resamples, len(returns)))]
+    return draws.sum(axis=1), (draws > 0).mean(axis=1)
+
+
+def permutation_paths(close: np.ndarray, holding: np.ndarray, n_resamples: int, rng) -> np.ndarray:
+    """
+    Total return of the same number of trades with the same holding periods,
+    entered on random bars instead of on signals (the no-skill null). Random
+    trades may overlap each other, unlike the strategy's.
+    """
+    n_bars = len(close)
+    # Entry bar per path and trade, leaving room for each trade's holding period
+    entries = (rng.random((n_resamples, len(holding))) * (n_bars - holding)).astype(int)
+    return (close[entries + holding] / close[entries] - 1).sum(axis=1)
+
+
+def _analyze_chunk(args) -> tuple:
+    items, n_resamples, confidence, seed = args
+    alpha = (1 - confidence) / 2
+    rows = []
+    bootstrap_sum = np.zeros(n_resamples)
+    win_rate_sum = np.zeros(n_resamples)
+    permutation_sum = np.zeros(n_resamples)
+    for ticker, returns, holding, close in items:
+        # Seeded per ticker, so results don't depend on how tickers are split into chunks
+        rng = np.random.default_rng([seed, zlib.crc32(ticker.encode())])
+        totals, win_rates = bootstrap_paths(returns, n_resamples, rng)
+        random_totals = permutation_paths(close, holding, n_resamples, rng)
+        total = returns.sum()
+        rows.append({
+            "Ticker": ticker,
+            "Total Trades": len(returns),
+            "Total Return": total,
+            "Return CI Low": np.quantile(totals, alpha),
+            "Return CI High": np.quantile(totals, 1 - alpha),
+            "Win Rate": (returns > 0).mean(),
+            "Win Rate CI Low": np.quantile(win_rates, alpha),
+            "Win Rate CI High": np.quantile(win_rates, 1 - alpha),
+            # Share of resampled trade lists that lose money
+            "P(Loss)": (totals <= 0).mean(),
+            # How often random entries with the same holding periods did at least as well
+            "p-value": ((random_totals >= total).sum() + 1) / (n_resamples + 1),
+        })
+        bootstrap_sum += totals
+        win_rate_sum += win_rates
+        permutation_sum += random_totals
+    return rows, bootstrap_sum, win_rate_sum, permutation_sum
+
+
+class RobustnessAnalyzer:
+    """
+    Bootstrap and permutation tests on backtest trade lists: how much of a
+    ticker's Total Return / Win Rate survives resampling its trades, and how
+    often random entries with the same holding periods do as well. All paths
+    are drawn at once per ticker with NumPy; ticker chunks run in a process pool.
+    """
+
+    def __init__(self, n_resamples: int = 10_000, confidence: float = 0.95, seed: int = 42, max_workers: int = None):
+        self.n_resamples = n_resamples
+        self.confidence = confidence
+        self.seed = seed
+        self.max_workers = max_workers
+
+    def run(self, results: pd.DataFrame, closes: dict) -> dict:
+        """
+        results: backtest_tickers output (Ticker, Trades); closes: {ticker:
+        close Series the trades were run on}.
+        Returns {'tickers': per ticker table, 'aggregate': dict for the average
+        over tickers (what the backtest summary shows)}.
+        """
+        items = []
+        for ticker, trades in zip(results["Ticker"], results["Trades"]):
+            close = closes.get(ticker)
+            if close is None:
+                continue
+            returns, holding = trade_arrays(trades, close)
+            if len(returns):
+                items.append((ticker, returns, holding, close.to_numpy(dtype=float)))
+        if not items:
+            return {"tickers": pd.DataFrame(), "aggregate": {}}
+
+        parts = run_chunked(_analyze_chunk, items, self.max_workers,
+                            job=lambda chunk: (chunk, self.n_resamples, self.confidence, self.seed))
+
+        order = {ticker: i for i, (ticker, *_) in enumerate(items)}
+        table = pd.DataFrame([row for part in parts for row in part[0]])
+        table = table.sort_values("Ticker", key=lambda s: s.map(order)).reset_index(drop=True)
+
+        # Aggregate paths: average over tickers of each path
+        n = len(items)
+        totals = sum(part[1] for part in parts) / n
+        win_rates = sum(part[2] for part in parts) / n
+        random_totals = sum(part[3] for part in parts) / n
+        alpha = (1 - self.confidence) / 2
+        avg_return = table["Total Return"].mean()
+        aggregate = {
+            "Tickers": n,
+            "Total Trades": int(table["Total Trades"].sum()),
+            "Avg Total Return": float(avg_return),
+            "Return CI Low": float(np.quantile(totals, alpha)),
+            "Return CI High": float(np.quantile(totals, 1 - alpha)),
+            "Avg Win Rate": float(table["Win Rate"].mean()),
+            "Win Rate CI Low": float(np.quantile(win_rates, alpha)),
+            "Win Rate CI High": float(np.quantile(win_rates, 1 - alpha)),
+            "P(Loss)": float((totals <= 0).mean()),
+            "p-value": float(((random_totals >= avg_return).sum() + 1) / (self.n_resamples + 1)),
+        }
+        return {"tickers": table, "aggregate": aggregate}
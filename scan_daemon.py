@@ -0,0 +1,171 @@
+"""
+Headless scanner: runs scans (and optionally backtests) on a schedule and
+publishes the results as snapshots the app loads instead of scanning itself.
+
+    python scan_daemon.py --once                                  # one run, e.g. from cron
+    python scan_daemon.py --universe "BIST 100" --intervals 1d 1h --backtest
+    python scan_daemon.py --every 0                               # only after the close
+    python scan_daemon.py --once --replay snapshots/ --as-of 2024-06-28
+
+Schedule: every `--every` minutes while the session is open, plus one run
+`--after-close` minutes after the close.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from datetime import timedelta
+
+import pandas as pd
+
+import bist_calendar
+import timeframes
+from backtester import Backtester
+from data_manager import DataManager
+from market_regime import MarketRegime
+from ohlcv_store import DEFAULT_STORE_DIR
+from parallel import run_chunked
+from providers import ReplayProvider
+from scanner import Scanner
+from snapshots import DEFAULT_SNAPSHOT_DIR, SnapshotStore
+
+
+def build_scanner(params: tuple, replay: str = None, store_dir: str = DEFAULT_STORE_DIR, as_of: str = None) -> Scanner:
+    scanner = Scanner()
+    if replay:
+        # Replayed bars are never written to a store: a live store would serve them as fresh bars later
+        scanner.data_manager = DataManager(store_dir=None, provider=ReplayProvider(replay, as_of=as_of))
+    else:
+        scanner.data_manager = DataManager(store_dir=store_dir)
+    scanner.market_regime = MarketRegime(scanner.data_manager)
+    scanner.strategy_engine.ema_len, scanner.strategy_engine.wma_len, scanner.strategy_engine.index_sma_len = params
+    return scanner
+
+
+def _scan_chunk(args):
+    tickers, interval, params, replay, store_dir, as_of = args
+    scanner = build_scanner(params, replay, store_dir, as_of)
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = scanner.scan_market(tickers, interval=interval)
+    return results, scanner.last_profile.failures
+
+
+def _backtest_chunk(args):
+    tickers, interval, params, replay, store_dir, as_of = args
+    scanner = build_scanner(params, replay, store_dir, as_of)
+    backtester = Backtester(scanner.data_manager, scanner.market_regime)
+    backtester.strategy_engine = scanner.strategy_engine
+    with contextlib.redirect_stdout(io.StringIO()):
+        results = backtester.backtest_tickers(tickers, interval=interval)
+    return results, backtester.last_failures
+
+
+def run_pool(func, tickers: list, interval: str, params: tuple, workers: int, replay: str = None,
+             store_dir: str = DEFAULT_STORE_DIR, as_of: str = None):
+    """
+    Runs func over ticker chunks in a process pool (see parallel.run_chunked).
+    Returns (concatenated results, {ticker: error}).
+    """
+    parts = run_chunked(func, tickers, workers, job=lambda chunk: (chunk, interval, params, replay, store_dir, as_of))
+
+    failures = {}
+    for _, part_failures in parts:
+        failures.update(part_failures)
+    frames = [results for results, _ in parts if not results.empty]
+    return (pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()), failures
+
+
+def run_once(universes: list, intervals: list, params: tuple, backtest: bool, workers: int, snapshots: SnapshotStore,
+             replay: str = None, store_dir: str = DEFAULT_STORE_DIR, as_of: str = None):
+    for interval in intervals:
+        # Fetch the index once up front so every worker finds it fresh in the store
+        scanner = build_scanner(params, replay, store_dir, as_of)
+        with contextlib.redirect_stdout(io.StringIO()):
+            scanner.market_regime.index_data(period=timeframes.index_period(interval), interval=interval)
+
+        for universe in universes:
+            # A universe is an index name or a ticker list file (e.g. every BIST equity)
+            tickers = Scanner.load_universe(universe) if os.path.isfile(universe) else scanner.get_bist_tickers(universe)
+            start = time.perf_counter()
+            results, failures = run_pool(_scan_chunk, tickers, interval, params, workers,
+                                         replay, store_dir, as_of)
+            elapsed = time.perf_counter() - start
+            if results.empty:
+                print(f"[{universe} {interval}] scan returned nothing, snapshot not updated")
+            else:
+                version = snapshots.write("scan", interval, universe, params, {"results": results},
+                                          elapsed=elapsed, tickers=len(tickers), failures=failures)
+                print(f"[{universe} {interval}] scan {len(results)} rows in {elapsed:.1f}s -> {version}")
+
+            if not backtest:
+                continue
+            start = time.perf_counter()
+            results, failures = run_pool(_backtest_chunk, tickers, interval, params, workers,
+                                         replay, store_dir, as_of)
+            elapsed = time.perf_counter() - start
+            if results.empty:
+                print(f"[{universe} {interval}] backtest returned nothing, snapshot not updated")
+                continue
+            trades = pd.DataFrame([{"Ticker": row.Ticker, **trade} for row in results.itertuples() for trade in row.Trades])
+            version = snapshots.write("backtest", interval, universe, params,
+                                      {"results": results.drop(columns=["Trades"]), "trades": trades},
+                                      elapsed=elapsed, tickers=len(tickers), failures=failures)
+            print(f"[{universe} {interval}] backtest {len(results)} rows in {elapsed:.1f}s -> {version}")
+
+
+def next_run(now, every: timedelta = None, after_close: timedelta = timedelta(minutes=10)):
+    """
+    Next scheduled run after `now`: every `every` during the session, and once
+    `after_close` after the close.
+    """
+    if every and bist_calendar.is_session_open(now):
+        return now + every
+    close_run = bist_calendar.last_session_close(now) + after_close
+    if now < close_run:
+        return close_run
+    if every:
+        return bist_calendar.next_session_open(now) + every
+    # Close of the running or next session
+    session = now if bist_calendar.is_session_open(now) else bist_calendar.next_session_open(now)
+    return bist_calendar.last_session_close(session + timedelta(hours=12)) + after_close
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Scheduled headless scans published as snapshots")
+    parser.add_argument("--universe", nargs="+", default=["BIST 30", "BIST 100"],
+                        help='"BIST 30", "BIST 100" or a ticker list file (one per line)')
+    parser.add_argument("--intervals", nargs="+", default=["1d"], choices=list(timeframes.INTERVALS))
+    parser.add_argument("--ema", type=int, default=9)
+    parser.add_argument("--wma", type=int, default=30)
+    parser.add_argument("--sma", type=int, default=50)
+    parser.add_argument("--backtest", action="store_true", help="Also publish backtest snapshots")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--every", type=float, default=15, help="Minutes between intraday runs (0: after close only)")
+    parser.add_argument("--after-close", type=float, default=10, help="Minutes after the close for the daily run")
+    parser.add_argument("--once", action="store_true", help="Run once and exit")
+    parser.add_argument("--snapshot-dir", default=DEFAULT_SNAPSHOT_DIR)
+    parser.add_argument("--store-dir", default=DEFAULT_STORE_DIR)
+    parser.add_argument("--replay", help="Read bars from this snapshot directory instead of Yahoo (no store is used)")
+    parser.add_argument("--as-of", help="Replay date (YYYY-MM-DD), periods are counted back from it")
+    args = parser.parse_args(argv)
+
+    params = (args.ema, args.wma, args.sma)
+    snapshots = SnapshotStore(args.snapshot_dir)
+    every = timedelta(minutes=args.every) if args.every > 0 else None
+    after_close = timedelta(minutes=args.after_close)
+
+    while True:
+        run_once(args.universe, args.intervals, params, args.backtest, args.workers, snapshots,
+                 replay=args.replay, store_dir=args.store_dir, as_of=args.as_of)
+        if args.once:
+            return 0
+        now = bist_calendar.now_bist()
+        due = next_run(now, every, after_close)
+        print(f"Next run at {due:%Y-%m-%d %H:%M}")
+        time.sleep(max((due - now).total_seconds(), 0))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,134 +1,244 @@
 import pandas as pd
-import yfinance as yf
 from data_manager import DataManager
 from strategy_engine import StrategyEngine
-import time
+from market_regime import MarketRegime
+# Small and used by every scan (profiling, panel cache); compact and screener are imported where used
+from instrumentation import RunProfile
+from result_cache import ResultCache
+import timeframes
+import os
+
+# Index constituent snapshots, one ticker per line
+UNIVERSE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "universes")
+UNIVERSE_FILES = {"BIST 30": "bist30.txt", "BIST 100": "bist100.txt"}
 
 class Scanner:
     def __init__(self):
         self.data_manager = DataManager()
         self.strategy_engine = StrategyEngine()
-        # BIST 30 Tickers (Snapshot)
-        self.bist30_tickers = [
-            "AKBNK", "ALARK", "ARCLK", "ASELS", "ASTOR", "BIMAS", "BRSAN", "DOAS", "EKGYO", "ENKAI",
-            "EREGL", "FROTO", "GARAN", "GUBRF", "HEKTS", "ISCTR", "KCHOL", "KONTR", "KOZAL", "KRDMD",
-            "ODAS", "OYAKC", "PETKM", "PGSUS", "SAHOL", "SASA", "SISE", "TCELL", "THYAO", "TOASO",
-            "TUPRS", "YKBNK"
-        ]
-        # BIST 100 Tickers (Snapshot - Expanded)
-        self.bist100_tickers = list(set(self.bist30_tickers + [
-            "AEFES", "AGHOL", "AHGAZ", "AKCNS", "AKFGY", "AKMSA", "AKSEN", "ALBRK", "ALFAS", "ANSGR",
-            "ASGYO", "BERA", "BFREN", "BIOEN", "BOBET", "BRYAT", "BTCIM", "CANTE", "CCOLA", "CIMSA",
-            "CWENE", "DOHOL", "ECILC", "ECZYT", "EGEEN", "ENERY", "ENJSA", "EUPWR", "EUREN",
-            "GENIL", "GESAN", "GLYHO", "GOZDE", "GWIND", "HALKB", "ISDMR", "ISGYO", "ISMEN", "IZMDC",
-            "KARSN", "KAYSE", "KCAER", "KMPUR", "KORDS", "KOZAA", "KZBGY", "MAVI", "MGROS", "MIATK",
-            "OTKAR", "PENTA", "PSGYO", "QUAGR", "REEDR", "SANTM", "SDTTR", "SKBNK", "SMRTG", "SOKM",
-            "TABGD", "TAVHL", "TKFEN", "TMSN", "TSKB", "TTKOM", "TTRAK", "TURSG", "ULKER", "VAKBN",
-            "VESBE", "YEOTK", "YYLGD", "ZOREN"
-        ]))
+        # Index fetched once per period/interval, shared with the app and backtester
+        self.market_regime = MarketRegime(self.data_manager)
+        # {ticker: error} from the last fundamentals enrichment
+        self.last_failures = {}
+        # Per stage timings of the last scan; set profiler to "cprofile"/"pyinstrument" to profile scans
+        self.last_profile = None
+        self.profiler = None
+        # Computed panels/indicator frames keyed by (ticker, interval, period, strategy params)
+        self.result_cache = ResultCache()
+        # Ticker lists read from UNIVERSE_DIR on first use
+        self._universes = {}
 
     def get_bist_tickers(self, index_name="BIST 30"):
-        if index_name == "BIST 100":
-            return self.bist100_tickers
-        return self.bist30_tickers
+        if index_name not in self._universes:
+            filename = UNIVERSE_FILES.get(index_name, UNIVERSE_FILES["BIST 30"])
+            self._universes[index_name] = self.load_universe(os.path.join(UNIVERSE_DIR, filename))
+        return self._universes[index_name]
+
+    @property
+    def bist30_tickers(self) -> list:
+        return self.get_bist_tickers("BIST 30")
+
+    @property
+    def bist100_tickers(self) -> list:
+        return self.get_bist_tickers("BIST 100")
+
+    @staticmethod
+    def load_universe(path: str) -> list:
+        """
+        Tickers from a text or CSV file, e.g. the full BIST equity list: one per
+        line (first column), '#' comments, a header line, .IS suffixes and
+        duplicates are ignored.
+        """
+        tickers = []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                ticker = line.split("#")[0].replace(";", ",").split(",")[0].strip().upper().removesuffix(".IS")
+                if ticker and ticker not in ("TICKER", "SYMBOL", "HISSE") and ticker not in tickers:
+                    tickers.append(ticker)
+        return tickers
 
-    def scan_market(self, tickers: list = None, interval: str = "1d"):
+    def scan_market(self, tickers: list = None, interval: str = "1d", compact: bool = False):
         """
         Scans the list of tickers and returns a DataFrame of results.
+        compact=True keeps prices as float32 arrays, skips the intermediate
+        indicator columns and returns a compact.ScanResults (use .to_frame()).
+        Stage timings of the run are kept in self.last_profile.
         """
         if tickers is None:
             tickers = self.get_bist_tickers()
 
-        results = []
-        
+        with RunProfile("scan_market", profiler=self.profiler) as profile:
+            self.last_profile = profile
+            results = self._scan_market(tickers, interval, compact, profile)
+        print(profile.summary())
+        return results
+
+    def _scan_market(self, tickers: list, interval: str, compact: bool, profile: RunProfile):
         # 1. Fetch Index Data First (Global Filter)
         print(f"Fetching Index Data ({interval})...")
-        # Re-using fetch_index_data from DataManager which calls fetch_ohlcv("XU100.IS")
-        # Note: fetch_index_data in DataManager might default to 1d. Let's fix that usage if needed or override.
-        # Ideally DataManager should also accept interval. 
-        # For now, let's call data_manager.fetch_ohlcv directly for the index to ensure interval matches.
-        index_df = self.data_manager.fetch_ohlcv("XU100.IS", period="2y" if interval=="1wk" else "6mo", interval=interval)
-        
+        index_period = timeframes.index_period(interval)
+        with profile.stage("index") as record:
+            index_df = self.market_regime.index_data(period=index_period, interval=interval)
+            record["rows"] = len(index_df)
+
         if index_df.empty:
             print("Error: Could not fetch Index data.")
             return pd.DataFrame()
 
-        # 2. Fetch Stock Data (Bulk or Loop)
+        # 2. Fetch Stock Data (store first, bulk download for whatever is stale)
         print(f"Scanning {len(tickers)} tickers ({interval})...")
-        
-        # Prepare tickers with .IS extension
-        yf_tickers = [t if t.endswith(".IS") else f"{t}.IS" for t in tickers]
-        
-        # Bulk Download
-        # period='1y' is safer for weekly wma 30 (need 30 weeks ~ 7 months)
-        period = "2y" if interval == "1wk" else "6mo" 
-        try:
-            # Using threads=False sometimes helps with rate limits or errors, but True is faster
-            bulk_data = yf.download(yf_tickers, period=period, interval=interval, group_by='ticker', progress=True, threads=True)
-        except Exception as e:
-            print(f"Bulk download failed: {e}")
+
+        # Enough bars for WMA 30 / the 50 bar minimum at this interval (weekly: 2y)
+        period = timeframes.scan_period(interval)
+        with profile.stage("fetch") as record:
+            frames = self.data_manager.fetch_ohlcv_bulk(tickers, period=period, interval=interval, profile=profile)
+            record["rows"] = sum(len(df) for df in frames.values())
+
+        if not frames:
             return pd.DataFrame()
 
-        # Iterate
-        for ticker, yf_ticker in zip(tickers, yf_tickers):
-            try:
-                # Extract dataframe for single ticker
-                if len(tickers) > 1:
-                    if yf_ticker in bulk_data:
-                        df = bulk_data[yf_ticker].copy()
-                    elif ticker in bulk_data: # Backup check
-                        df = bulk_data[ticker].copy()
-                    else:
-                        # Sometimes yfinance returns multi-index columns differently
-                        # If columns have levels (Ticker, Price), we might need to access differently if not grouped by ticker correctly
-                        # With group_by='ticker', it should be Dict-like or MultiIndex
-                        # Let's try to slice if it's a huge DF
-                        try:
-                           df = bulk_data.xs(yf_ticker, level=0, axis=1)
-                        except:
-                           continue
-                else:
-                    df = bulk_data.copy() # If single ticker requested
-                
-                if df.empty:
-                    continue
-                
-                # Standardize columns
-                # yfinance recent versions might use "Price" and "Ticker" levels.
-                # If column names are "Open", "High" etc. directly:
-                df = df.rename(columns={"Open": "open", "High": "high", "Low": "low", "Close": "close", "Volume": "volume"})
-                
-                # Drop NaN
-                df = df.dropna()
-
-                if len(df) < 50:
-                    continue
-
-                # Calculate Strategy
-                df_signals = self.strategy_engine.calculate_indicators(df, index_df)
-                latest = self.strategy_engine.get_latest_signal(df_signals)
-
-                if latest:
-                    result_row = {
-                        "Ticker": ticker,
-                        "Price": latest['close'],
-                        "Trend Up": latest['trend_up'],
-                        "Market Pos": latest['market_positive'],
-                        "Buy Signal": latest['buy_signal'],
-                        "Exit Signal": latest['exit_signal'],
-                        "EMA9": latest['ema_9'],
-                        "WMA30": latest['wma_30'],
-                        "RSI": latest['rsi']
-                    }
-                    results.append(result_row)
-                    
-            except Exception as e:
-                # print(f"Error processing {ticker}: {e}") # Reduce spam
-                continue
-
-        results_df = pd.DataFrame(results)
+        if compact:
+            from compact import CompactOHLCV
+            with profile.stage("panel") as record:
+                data = CompactOHLCV.from_frames(frames)
+                del frames
+                record["bytes"] = data.nbytes
+            with profile.stage("signals"):
+                market_positive = self.market_regime.aligned(
+                    data.index, period=index_period, interval=interval, sma_len=self.strategy_engine.index_sma_len
+                )
+                return self.strategy_engine.calculate_panel_compact(data, market_positive=market_positive)['latest']
+
+        # 3. Signals for all tickers in one dates x tickers pass
+        fields, panel, results_df = self._scan_frames(frames, interval, profile)
+        # Detail views slice single tickers out of this instead of refetching (see indicator_frame)
+        self.result_cache.put(("*", interval, period, self.strategy_engine.params), (fields, panel))
         return results_df
 
+    def _scan_frames(self, frames: dict, interval: str, profile: RunProfile):
+        """Panel, signals and latest results for fetched frames. Returns (fields, panel, results)."""
+        with profile.stage("panel") as record:
+            fields = self.data_manager.to_panel(frames)
+            # Same as per-ticker dropna: a bar counts only if every OHLCV field is present
+            valid = fields['close'].notna()
+            for field in fields.values():
+                valid &= field.notna()
+            record["rows"] = len(valid)
+
+        with profile.stage("signals"):
+            market_positive = self.market_regime.aligned(
+                fields['close'].index, period=timeframes.index_period(interval), interval=interval,
+                sma_len=self.strategy_engine.index_sma_len
+            )
+            index_close = self.market_regime.aligned_close(
+                fields['close'].index, period=timeframes.index_period(interval), interval=interval
+            )
+            panel = self.strategy_engine.calculate_panel(fields['close'], valid=valid, market_positive=market_positive,
+                                                         index_close=index_close)
+
+        with profile.stage("latest"):
+            latest = self.strategy_engine.get_latest_panel_signal(panel)
+
+        results_df = pd.DataFrame({
+            "Ticker": latest.index,
+            "Price": latest['close'].to_numpy(),
+            "Trend Up": latest['trend_up'].to_numpy(),
+            "Market Pos": latest['market_positive'].to_numpy(),
+            "Buy Signal": latest['buy_signal'].to_numpy(),
+            "Exit Signal": latest['exit_signal'].to_numpy(),
+            "EMA9": latest['ema_9'].to_numpy(),
+            "WMA30": latest['wma_30'].to_numpy(),
+            "RSI": latest['rsi'].to_numpy()
+        })
+        # Strength vs XU100 (missing when the index has no close for the calendar)
+        for name, column in (("rel_strength", "RS"), ("beta", "Beta"), ("correlation", "Corr")):
+            if name in latest:
+                results_df[column] = latest[name].to_numpy()
+        return fields, panel, results_df
+
+    def scan_market_iter(self, tickers: list = None, interval: str = "1d", chunk_size: int = 50):
+        """
+        Streaming scan for large universes: fetches `chunk_size` tickers at a
+        time (one bulk request per chunk) and yields that chunk's results
+        DataFrame before moving on, so only one chunk's bars and panel are in
+        memory and callers can show partial results early. Results are the same
+        as scan_market's; panels are not cached (indicator_frame reads the store).
+        Stage timings of the whole run are kept in self.last_profile.
+        """
+        if tickers is None:
+            tickers = self.get_bist_tickers()
+
+        profile = RunProfile("scan_market_iter", profiler=self.profiler)
+        self.last_profile = profile
+        try:
+            with profile:
+                print(f"Fetching Index Data ({interval})...")
+                with profile.stage("index") as record:
+                    index_df = self.market_regime.index_data(period=timeframes.index_period(interval),
+                                                             interval=interval)
+                    record["rows"] = len(index_df)
+                if index_df.empty:
+                    print("Error: Could not fetch Index data.")
+                    return
+
+                period = timeframes.scan_period(interval)
+                for start in range(0, len(tickers), chunk_size):
+                    chunk = tickers[start:start + chunk_size]
+                    print(f"Scanning {start + len(chunk)}/{len(tickers)} tickers ({interval})...")
+                    with profile.stage("fetch") as record:
+                        frames = self.data_manager.fetch_ohlcv_bulk(chunk, period=period, interval=interval,
+                                                                    progress=False, profile=profile)
+                        record["rows"] = sum(len(df) for df in frames.values())
+                    if not frames:
+                        continue
+                    results = self._scan_frames(frames, interval, profile)[2]
+                    # Drop the chunk's bars and panel before fetching the next one
+                    del frames
+                    yield results
+        finally:
+            # Also when the caller stops early (close() raises GeneratorExit at the yield)
+            print(profile.summary())
+
+    def indicator_frame(self, ticker: str, interval: str = "1d") -> pd.DataFrame:
+        """
+        calculate_indicators output for one ticker (chart, detail and assistant views).
+        Sliced from the last scan's panel when it has the ticker, otherwise fetched
+        and computed once and cached.
+        """
+        period = timeframes.scan_period(interval)
+        params = self.strategy_engine.params
+        scanned = self.result_cache.get(("*", interval, period, params))
+        if scanned is not None and ticker in scanned[1]['valid'].columns:
+            return self.strategy_engine.panel_frame(*scanned, ticker)
+
+        def compute():
+            df = self.data_manager.fetch_ohlcv(ticker, period=period, interval=interval)
+            if df.empty:
+                return df
+            market_positive = self.market_regime.aligned(
+                df.index, period=timeframes.index_period(interval), interval=interval,
+                sma_len=self.strategy_engine.index_sma_len
+            )
+            return self.strategy_engine.calculate_indicators(df, market_positive=market_positive)
+
+        return self.result_cache.get_or_compute((ticker, interval, period, params), compute)
+
+    def screener(self, interval: str = "1d", tickers: list = None) -> "Screener":
+        """
+        Screener over the last scan's panel for `interval` and the current
+        strategy params. Scans `tickers` first when there is none cached or the
+        cached panel doesn't have all of them.
+        """
+        key = ("*", interval, timeframes.scan_period(interval), self.strategy_engine.params)
+        scanned = self.result_cache.get(key)
+        if scanned is None or (tickers is not None and not set(tickers) <= set(scanned[1]['valid'].columns)):
+            self.scan_market(tickers, interval=interval)
+            scanned = self.result_cache.get(key)
+        if scanned is None:
+            return None
+        from screener import Screener
+        return Screener(*scanned)
+
     def enrich_with_fundamentals(self, df_results):
         """
         Enriches a results DataFrame with fundamental data.
@@ -137,12 +247,10 @@ class Scanner:
         if df_results.empty:
             return df_results
 
-        fundamentals = []
-        for ticker in df_results['Ticker']:
-            funda = self.data_manager.fetch_fundamentals(ticker)
-            fundamentals.append(funda)
-        
-        funda_df = pd.DataFrame(fundamentals)
+        report = self.data_manager.fetch_fundamentals_many(list(df_results['Ticker']))
+        self.last_failures = dict(report.failures)
+
+        funda_df = pd.DataFrame(list(report.results.values()))
         if not funda_df.empty and 'symbol' in funda_df.columns:
             # Merge on Ticker
             funda_df.rename(columns={'symbol': 'Ticker'}, inplace=True)
@@ -0,0 +1,244 @@
+import ast
+import functools
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+import indicators
+
+
+def _rolling(values, length: int, reduce):
+    values = np.asarray(values, dtype=float)
+    out = np.full(values.shape, np.nan)
+    if len(values) >= length:
+        out[length - 1:] = reduce(sliding_window_view(values, length, axis=0), axis=-1)
+    return out
+
+
+def _truth(values) -> np.ndarray:
+    # Flags are packed as floats (NaN past a ticker's last bar); NaN counts as False
+    values = np.asarray(values)
+    return values if values.dtype == bool else np.nan_to_num(values) != 0
+
+
+# name: (function, series arguments, optional/required integer arguments (min, max))
+_FUNCTIONS = {
+    "abs": (np.abs, 1, (0, 0)),
+    "min": (np.minimum, 2, (0, 0)),
+    "max": (np.maximum, 2, (0, 0)),
+    "prev": (lambda x, n=1: indicators.shift(x, n), 1, (0, 1)),
+    "change": (lambda x, n=1: x / indicators.shift(x, n) - 1, 1, (0, 1)),
+    "sma": (indicators.sma, 1, (1, 1)),
+    "ema": (indicators.ema, 1, (1, 1)),
+    "wma": (indicators.wma, 1, (1, 1)),
+    "rsi": (lambda x, n=14: indicators.rsi(x, n), 1, (0, 1)),
+    "highest": (lambda x, n: _rolling(x, n, np.max), 1, (1, 1)),
+    "lowest": (lambda x, n: _rolling(x, n, np.min), 1, (1, 1)),
+}
+_BINARY = {
+    ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.true_divide,
+    ast.Mod: np.mod, ast.Pow: np.power,
+}
+_COMPARE = {
+    ast.Lt: np.less, ast.LtE: np.less_equal, ast.Gt: np.greater, ast.GtE: np.greater_equal,
+    ast.Eq: np.equal, ast.NotEq: np.not_equal,
+}
+
+
+def _compile(node, names: set):
+    """
+    Turns a whitelisted expression node into a function(column lookup) -> array.
+    Anything outside the whitelist (attributes, subscripts, strings, lambdas, ...)
+    is rejected, so expressions can come straight from the UI.
+    """
+    if isinstance(node, ast.Constant) and isinstance(node.value, (bool, int, float)):
+        value = node.value
+        return lambda column: value
+
+    if isinstance(node, ast.Name):
+        name = node.id
+        names.add(name)
+        return lambda column: column(name)
+
+    if isinstance(node, ast.BoolOp):
+        parts = [_compile(value, names) for value in node.values]
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        return lambda column: functools.reduce(combine, (_truth(part(column)) for part in parts))
+
+    if isinstance(node, ast.UnaryOp):
+        operand = _compile(node.operand, names)
+        if isinstance(node.op, (ast.Not, ast.Invert)):
+            return lambda column: ~_truth(operand(column))
+        if isinstance(node.op, ast.USub):
+            return lambda column: -np.asarray(operand(column), dtype=float)
+        if isinstance(node.op, ast.UAdd):
+            return operand
+
+    if isinstance(node, ast.BinOp):
+        left, right = _compile(node.left, names), _compile(node.right, names)
+        if type(node.op) in _BINARY:
+            op = _BINARY[type(node.op)]
+            return lambda column: op(np.asarray(left(column), dtype=float), right(column))
+        if isinstance(node.op, (ast.BitAnd, ast.BitOr)):
+            op = np.logical_and if isinstance(node.op, ast.BitAnd) else np.logical_or
+            return lambda column: op(_truth(left(column)), _truth(right(column)))
+
+    if isinstance(node, ast.Compare) and all(type(op) in _COMPARE for op in node.ops):
+        operands = [_compile(node.left, names)] + [_compile(c, names) for c in node.comparators]
+        ops = [_COMPARE[type(op)] for op in node.ops]
+
+        def compare(column):
+            values = [operand(column) for operand in operands]
+            # Chained: a < b < c is (a < b) and (b < c)
+            return functools.reduce(np.logical_and, (op(values[i], values[i + 1]) for i, op in enumerate(ops)))
+        return compare
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in _FUNCTIONS:
+        name = node.func.id
+        func, n_series, (min_ints, max_ints) = _FUNCTIONS[name]
+        if node.keywords or not n_series + min_ints <= len(node.args) <= n_series + max_ints:
+            raise ValueError(f"{name}() takes {n_series} column argument(s) and {min_ints}-{max_ints} window length(s)")
+        series = [_compile(arg, names) for arg in node.args[:n_series]]
+        ints = []
+        for arg in node.args[n_series:]:
+            if not (isinstance(arg, ast.Constant) and type(arg.value) is int and arg.value > 0):
+                raise ValueError(f"{name}() window lengths must be positive integer constants")
+            ints.append(arg.value)
+        return lambda column: func(*(s(column) for s in series), *ints)
+
+    raise ValueError(f"{ast.unparse(node)!r} is not allowed in screening expressions")
+
+
+@functools.lru_cache(maxsize=256)
+def compile_expression(expression: str):
+    """
+    Compiles a filter/rank expression once. Returns (function, column names used).
+    Raises ValueError for syntax errors and anything outside the whitelist.
+    """
+    try:
+        tree = ast.parse(expression.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression {expression!r}: {e.msg}") from None
+    names = set()
+    return _compile(tree.body, names), frozenset(names)
+
+
+class Screener:
+    """
+    Custom screens over a dates x tickers indicator panel (the one
+    Scanner.scan_market computes), without refetching or recomputing it.
+
+        screener.screen("rsi > 60 and abs(close / wma_30 - 1) < 0.02", rank="rsi")
+        screener.screen("pullback and volume > 2 * sma(volume, 20)", date="2026-03-02")
+
+    Expressions use Python syntax over the OHLCV fields and panel columns
+    (ema_9, wma_30, rsi, trend_up, pullback, buy_signal, rel_strength, beta,
+    correlation, ...) and the functions abs, min, max, prev, change, sma, ema,
+    wma, rsi, highest and lowest. They are evaluated on packed columns, so windowed functions skip halts and late
+    listings exactly like the strategy indicators.
+    """
+
+    def __init__(self, fields: dict, panel: dict, min_bars: int = 50):
+        valid = panel['valid']
+        self.dates = valid.index
+        self.tickers = valid.columns
+        self.valid = valid.to_numpy(dtype=bool)
+        # Same minimum history as the scan results
+        self.min_bars = min_bars
+        self._frames = {**fields, **{name: frame for name, frame in panel.items() if name != 'valid'}}
+        self._packed = {}
+
+        self.order = np.argsort(~self.valid, axis=0, kind="stable")
+        self._padding = np.arange(len(self.dates))[:, None] >= self.valid.sum(axis=0)
+        # Bars each ticker has up to every date (min_bars on historical queries)
+        self._bar_count = np.cumsum(self.valid, axis=0)
+
+    @property
+    def columns(self) -> list:
+        return sorted(self._frames)
+
+    def _column(self, name: str) -> np.ndarray:
+        # Packed like indicators.pack_columns, reusing one ordering for every column
+        if name not in self._packed:
+            packed = np.take_along_axis(self._frames[name].to_numpy(dtype=float), self.order, axis=0)
+            packed[self._padding] = np.nan
+            self._packed[name] = packed
+        return self._packed[name]
+
+    def evaluate(self, expression: str) -> np.ndarray:
+        """
+        Dates x tickers values of an expression (bool for filters, float
+        otherwise); bars a ticker doesn't have are False/NaN.
+        """
+        func, names = compile_expression(expression)
+        unknown = names - set(self._frames)
+        if unknown:
+            raise ValueError(f"Unknown column(s) {', '.join(sorted(unknown))} in {expression!r}")
+        with np.errstate(all="ignore"):
+            packed = np.array(np.broadcast_to(func(self._column), self.valid.shape))
+        if packed.dtype == bool:
+            return indicators.unpack_columns(packed, self.order, self.valid, False)
+        return indicators.unpack_columns(packed.astype(float), self.order, self.valid)
+
+    def mask(self, where: str) -> pd.DataFrame:
+        """Dates x tickers matches of a filter over the whole history."""
+        return pd.DataFrame(_truth(self.evaluate(where)) & self.valid, index=self.dates, columns=self.tickers)
+
+    def _rows(self, date=None):
+        # Row per ticker to report and which tickers qualify
+        n_rows, n_cols = self.valid.shape
+        if date is None:
+            # Each ticker's last bar (a halted ticker reports its last traded bar)
+            rows = n_rows - 1 - np.argmax(self.valid[::-1], axis=0)
+            return rows, self._bar_count[-1] >= max(self.min_bars, 1)
+
+        date = pd.Timestamp(date)
+        if self.dates.tz is not None and date.tz is None:
+            date = date.tz_localize(self.dates.tz)
+        # Calendar bar at or before `date`; tickers without a bar there are left out
+        row = self.dates.searchsorted(date, side="right") - 1
+        if row < 0:
+            return np.zeros(n_cols, dtype=int), np.zeros(n_cols, dtype=bool)
+        return np.full(n_cols, row), self.valid[row] & (self._bar_count[row] >= max(self.min_bars, 1))
+
+    def screen(self, where: str = None, rank: str = None, date=None, ascending: bool = False, limit: int = None,
+               columns: dict = None) -> pd.DataFrame:
+        """
+        Tickers matching `where` on their latest bar (or on the bar at `date`),
+        in the scan results layout, plus {label: expression} `columns`. With
+        `rank`, its value is added as Score and the rows are sorted by it
+        (descending unless `ascending`, NaN last).
+        """
+        rows, keep = self._rows(date)
+        cols = np.arange(len(self.tickers))
+        if where:
+            keep = keep & _truth(self.evaluate(where))[rows, cols]
+        rows, cols = rows[keep], cols[keep]
+
+        def values(name):
+            return self._frames[name].to_numpy()[rows, cols]
+
+        results = pd.DataFrame({
+            "Ticker": self.tickers[cols],
+            "Date": self.dates[rows],
+            "Price": values('close'),
+            "Trend Up": values('trend_up').astype(bool),
+            "Market Pos": values('market_positive').astype(bool),
+            "Buy Signal": values('buy_signal').astype(bool),
+            "Exit Signal": values('exit_signal').astype(bool),
+            "EMA9": values('ema_9'),
+            "WMA30": values('wma_30'),
+            "RSI": values('rsi'),
+        })
+        for name, column in (("rel_strength", "RS"), ("beta", "Beta"), ("correlation", "Corr")):
+            if name in self._frames:
+                results[column] = values(name)
+        for label, expression in (columns or {}).items():
+            results[label] = self.evaluate(expression)[rows, cols]
+        if rank:
+            results["Score"] = self.evaluate(rank)[rows, cols].astype(float)
+            results = results.sort_values("Score", ascending=ascending, na_position="last", kind="stable")
+        if limit:
+            results = results.head(limit)
+        return results.reset_index(drop=True)
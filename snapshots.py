@@ -0,0 +1,114 @@
+import json
+import os
+import re
+import shutil
+from datetime import datetime
+
+import pandas as pd
+
+import bist_calendar
+
+DEFAULT_SNAPSHOT_DIR = os.environ.get(
+    "BIST_SNAPSHOT_DIR", os.path.join(os.path.expanduser("~"), ".cache", "bist-alpha-filter", "snapshots")
+)
+# Bumped when the stored tables change shape; older snapshots are ignored
+SCHEMA_VERSION = 2
+
+
+class SnapshotStore:
+    """
+    Versioned result tables written by the scan daemon and read by the app.
+
+        <root>/<kind>-<interval>-<universe>-<ema>-<wma>-<sma>/<version>/<table>.parquet
+                                                         .../<version>/meta.json
+                                                         .../latest.json
+
+    A version is only published (latest.json swapped in atomically) after all
+    of its files are written, so readers never see a half written snapshot.
+    """
+
+    def __init__(self, root: str = DEFAULT_SNAPSHOT_DIR, keep: int = 20):
+        self.root = root
+        # Versions kept per key, older ones are pruned on write
+        self.keep = keep
+
+    @staticmethod
+    def key(kind: str, interval: str, universe: str, params: tuple) -> str:
+        slug = re.sub(r"[^A-Za-z0-9]+", "", universe)
+        return "-".join([kind, interval, slug] + [str(p) for p in params])
+
+    def write(self, kind: str, interval: str, universe: str, params: tuple, tables: dict, **meta) -> str:
+        """
+        Stores {name: DataFrame} as a new version and publishes it. Returns the version.
+        """
+        key_dir = os.path.join(self.root, self.key(kind, interval, universe, params))
+        version = bist_calendar.now_bist().strftime("%Y%m%dT%H%M%S%f")
+        version_dir = os.path.join(key_dir, version)
+        os.makedirs(version_dir, exist_ok=True)
+
+        for name, df in tables.items():
+            df.to_parquet(os.path.join(version_dir, f"{name}.parquet"))
+        meta = {
+            "schema": SCHEMA_VERSION,
+            "version": version,
+            "kind": kind,
+            "interval": interval,
+            "universe": universe,
+            "params": list(params),
+            "created": bist_calendar.now_bist().isoformat(),
+            "tables": list(tables),
+            **meta,
+        }
+        with open(os.path.join(version_dir, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2, default=str)
+
+        # Publish: write then rename, like the OHLCV store
+        latest = os.path.join(key_dir, "latest.json")
+        tmp_path = f"{latest}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(meta, f, indent=2, default=str)
+        os.replace(tmp_path, latest)
+
+        self._prune(key_dir)
+        return version
+
+    def latest(self, kind: str, interval: str, universe: str, params: tuple) -> dict:
+        """Meta of the newest published version, or None."""
+        path = os.path.join(self.root, self.key(kind, interval, universe, params), "latest.json")
+        try:
+            with open(path) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get("schema") == SCHEMA_VERSION else None
+
+    def load(self, kind: str, interval: str, universe: str, params: tuple, version: str = None) -> dict:
+        """
+        {table name: DataFrame, 'meta': dict} of a version (newest by default), or None.
+        """
+        meta = self.latest(kind, interval, universe, params)
+        if meta is None:
+            return None
+        version = version or meta["version"]
+        version_dir = os.path.join(self.root, self.key(kind, interval, universe, params), version)
+        if version != meta["version"]:
+            with open(os.path.join(version_dir, "meta.json")) as f:
+                meta = json.load(f)
+        tables = {name: pd.read_parquet(os.path.join(version_dir, f"{name}.parquet")) for name in meta["tables"]}
+        return {**tables, "meta": meta}
+
+    def versions(self, kind: str, interval: str, universe: str, params: tuple) -> list:
+        key_dir = os.path.join(self.root, self.key(kind, interval, universe, params))
+        if not os.path.isdir(key_dir):
+            return []
+        return sorted(name for name in os.listdir(key_dir) if os.path.isdir(os.path.join(key_dir, name)))
+
+    def _prune(self, key_dir: str):
+        versions = sorted(name for name in os.listdir(key_dir) if os.path.isdir(os.path.join(key_dir, name)))
+        for name in versions[:-self.keep]:
+            shutil.rmtree(os.path.join(key_dir, name), ignore_errors=True)
+
+
+def age_seconds(meta: dict) -> float:
+    """Seconds since a snapshot was created."""
+    return (bist_calendar.now_bist() - datetime.fromisoformat(meta["created"])).total_seconds()
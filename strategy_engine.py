@@ -1,7 +1,14 @@
 import pandas as pd
-# import pandas_ta as ta - REMOVED
-import ta 
 import numpy as np
+import indicators
+
+# Bars for relative strength (return vs XU100) and rolling beta / correlation of returns
+RS_LEN = 63
+BETA_LEN = 60
+
+# Panel columns of get_latest_panel_signal (the last three only with an index close)
+LATEST_COLUMNS = ["close", "ema_9", "wma_30", "rsi", "trend_up", "market_positive", "rsi_positive",
+                  "buy_signal", "exit_signal", "rel_strength", "beta", "correlation"]
 
 class StrategyEngine:
     def __init__(self, ema_len=9, wma_len=30, index_sma_len=50):
@@ -9,65 +16,224 @@ class StrategyEngine:
         self.wma_len = wma_len
         self.index_sma_len = index_sma_len
 
+    @property
+    def params(self) -> tuple:
+        """Strategy parameters, part of every cache key for computed results."""
+        return (self.ema_len, self.wma_len, self.index_sma_len)
+
     def calculate_wma(self, series: pd.Series, length: int) -> pd.Series:
         """Calculates Weighted Moving Average."""
-        weights = np.arange(1, length + 1)
-        wma = series.rolling(length).apply(lambda x: np.dot(x, weights) / weights.sum(), raw=True)
-        return wma
+        return pd.Series(indicators.wma(series.to_numpy(dtype=float), length), index=series.index)
 
-    def calculate_indicators(self, df: pd.DataFrame, index_df: pd.DataFrame = None) -> pd.DataFrame:
+    def calculate_indicators(self, df: pd.DataFrame, index_df: pd.DataFrame = None, market_positive=None) -> pd.DataFrame:
         """
         Calculates indicators and strategy signals.
+        market_positive: precomputed index filter aligned to df (see MarketRegime.aligned),
+        used instead of deriving it from index_df.
         Returns the dataframe with signal columns.
         """
         if df.empty:
             return df
 
         # --- Indicators ---
-        # EMA 9
-        df['ema_9'] = df['close'].ewm(span=self.ema_len, adjust=False).mean()
-        
-        # WMA 30
-        df['wma_30'] = self.calculate_wma(df['close'], self.wma_len)
-        
-        # RSI 14
-        df['rsi'] = ta.momentum.RSIIndicator(df['close'], window=14).rsi()
-        
+        # EMA 9, WMA 30, RSI 14 in one pass over the close array
+        close = df['close'].to_numpy(dtype=float)
+        ema = indicators.ema(close, self.ema_len)
+        wma = indicators.wma(close, self.wma_len)
+        rsi = indicators.rsi(close, 14)
+        columns = {'ema_9': ema, 'wma_30': wma, 'rsi': rsi}
+
         # Index Logic
-        market_positive = True # Default true if no index provided fallback
-        if index_df is not None and not index_df.empty:
-            # Calculate SMA 50 for Index
-            index_df['sma_50'] = index_df['close'].rolling(window=self.index_sma_len).mean()
-            
+        if market_positive is not None:
+            market = np.asarray(market_positive, dtype=bool)
+        elif index_df is not None and not index_df.empty:
+            # Calculate SMA 50 for Index (without writing into the shared index frame)
+            index_sma = index_df['close'].rolling(window=self.index_sma_len).mean()
+
             # Align Index data to Stock data
-            df = df.join(index_df[['close', 'sma_50']].rename(columns={'close': 'index_close', 'sma_50': 'index_sma_50'}), rsuffix='_index')
-            
-            df['market_positive'] = df['index_close'] > df['index_sma_50']
-            market_positive = df['market_positive'] # Series
+            columns['index_close'] = index_df['close'].reindex(df.index).to_numpy(dtype=float)
+            columns['index_sma_50'] = index_sma.reindex(df.index).to_numpy(dtype=float)
+
+            market = columns['index_close'] > columns['index_sma_50']
         else:
-            df['market_positive'] = True
+            market = np.ones(len(df), dtype=bool)
+        columns['market_positive'] = market
 
         # --- Logic ---
+        columns.update(self.calculate_signals(close, ema, wma, rsi, market))
+
+        # One concat instead of a column insert per indicator/signal (the inserts cost more than the indicators)
+        return pd.concat([df.drop(columns=list(columns), errors='ignore'), pd.DataFrame(columns, index=df.index)], axis=1)
+
+    @staticmethod
+    def calculate_signals(close, ema, wma, rsi, market_positive) -> dict:
+        """
+        Strategy rules on aligned arrays (1-D per ticker or dates x tickers).
+        Returns boolean arrays keyed by column name.
+        """
+        prev_close = indicators.shift(close)
+        prev_ema = indicators.shift(ema)
+        prev_wma = indicators.shift(wma)
+
+        signals = {}
         # 1. Trend Direction (9 EMA > 30 WMA)
-        df['trend_up'] = df['ema_9'] > df['wma_30']
+        signals['trend_up'] = ema > wma
 
         # 2. Trigger Candle (Close < EMA 9 and Close > WMA 30) - For info
-        df['pullback'] = (df['close'] < df['ema_9']) & (df['close'] > df['wma_30'])
+        signals['pullback'] = (close < ema) & (close > wma)
 
         # 3R. RSI Filter (RSI > 50)
-        df['rsi_positive'] = df['rsi'] > 50
+        signals['rsi_positive'] = rsi > 50
 
         # 3. Buy Signal: Market Positive AND Trend Up AND Crossover(Close, EMA 9) AND RSI > 50
         # Crossover: Previous Close < Previous EMA 9 AND Current Close > Current EMA 9
-        df['crossover_ema9'] = (df['close'].shift(1) < df['ema_9'].shift(1)) & (df['close'] > df['ema_9'])
-        
-        df['buy_signal'] = df['market_positive'] & df['trend_up'] & df['crossover_ema9'] & df['rsi_positive']
+        signals['crossover_ema9'] = (prev_close < prev_ema) & (close > ema)
+
+        signals['buy_signal'] = market_positive & signals['trend_up'] & signals['crossover_ema9'] & signals['rsi_positive']
 
         # Exit Signal: Crossunder(Close, WMA 30)
-        df['exit_signal'] = (df['close'].shift(1) > df['wma_30'].shift(1)) & (df['close'] < df['wma_30'])
+        signals['exit_signal'] = (prev_close > prev_wma) & (close < wma)
+
+        return signals
+
+    def calculate_panel(self, close: pd.DataFrame, index_df: pd.DataFrame = None, valid: pd.DataFrame = None,
+                        market_positive=None, index_close=None) -> dict:
+        """
+        Cross-sectional version of calculate_indicators.
+        Takes a dates x tickers close matrix and computes every indicator and
+        signal column-wise in one pass. `valid` marks the bars each ticker
+        actually has (defaults to non-NaN closes); gaps are skipped exactly like
+        the per-ticker dropna path. market_positive is an optional precomputed
+        index filter aligned to close.index. With index_close (XU100 close
+        aligned to close.index) rel_strength, beta and correlation are added.
+        Returns {column name: dates x tickers DataFrame}.
+        """
+        if valid is None:
+            valid = close.notna()
+        valid = valid.reindex(index=close.index, columns=close.columns, fill_value=False).to_numpy(dtype=bool)
+        market_positive = self._market_filter(close.index, index_df, market_positive)
+
+        values, order = self._packed_panel(close.to_numpy(dtype=float), valid, market_positive, index_close=index_close)
 
+        panel = {}
+        for name, packed in values.items():
+            fill = False if packed.dtype == bool else np.nan
+            panel[name] = pd.DataFrame(
+                indicators.unpack_columns(packed, order, valid, fill), index=close.index, columns=close.columns
+            )
+        panel['valid'] = pd.DataFrame(valid, index=close.index, columns=close.columns)
+        return panel
+
+    def calculate_panel_compact(self, data, market_positive=None, keep: tuple = (), min_bars: int = 50) -> dict:
+        """
+        Memory-lean variant of calculate_panel for a compact.CompactOHLCV.
+        Only buy/exit signals (bit-packed) and the columns named in `keep` are
+        materialized; floats are stored as float32 and flags as SignalBits.
+        The latest row per ticker is returned as a compact.ScanResults under 'latest'.
+        """
+        from compact import ScanResults, SignalBits
+        market_positive = self._market_filter(data.index, None, market_positive)
+        values, order = self._packed_panel(data.close, data.valid, market_positive)
+
+        # Latest bar per ticker straight from packed space (row count - 1)
+        counts = data.valid.sum(axis=0)
+        enough = counts >= max(min_bars, 1)
+        cols = np.flatnonzero(enough)
+        last = counts[cols] - 1
+        latest = ScanResults(
+            np.asarray(data.tickers, dtype=object)[cols], data.index[order[last, cols]],
+            *(values[name][last, cols] for name in ("close", "ema_9", "wma_30", "rsi", "trend_up",
+                                                    "market_positive", "buy_signal", "exit_signal"))
+        )
+
+        panel = {'latest': latest}
+        for name in ('buy_signal', 'exit_signal') + tuple(keep):
+            packed = values.pop(name)
+            if packed.dtype == bool:
+                panel[name] = SignalBits(indicators.unpack_columns(packed, order, data.valid, False))
+            else:
+                panel[name] = indicators.unpack_columns(packed, order, data.valid).astype(np.float32)
+        return panel
+
+    def _market_filter(self, dates: pd.Index, index_df: pd.DataFrame = None, market_positive=None) -> np.ndarray:
+        # Index Logic, evaluated on the shared calendar
+        if market_positive is not None:
+            return np.asarray(market_positive, dtype=bool)
+        if index_df is not None and not index_df.empty:
+            index_close = index_df['close'].to_numpy(dtype=float)
+            index_sma = pd.Series(indicators.sma(index_close, self.index_sma_len), index=index_df.index)
+            index_close = index_df['close'].reindex(dates).to_numpy(dtype=float)
+            return index_close > index_sma.reindex(dates).to_numpy()
+        return np.ones(len(dates), dtype=bool)
+
+    def _packed_panel(self, close: np.ndarray, valid: np.ndarray, market_positive: np.ndarray,
+                      index_close: np.ndarray = None):
+        """
+        Indicators and signals on packed columns, so each ticker only sees its own bars.
+        Returns ({column name: packed array}, order) for indicators.unpack_columns.
+        """
+        packed, order = indicators.pack_columns(close, valid)
+        ema = indicators.ema(packed, self.ema_len)
+        wma = indicators.wma(packed, self.wma_len)
+        rsi = indicators.rsi(packed, 14)
+        packed_market = market_positive[order]
+
+        values = {'close': packed, 'ema_9': ema, 'wma_30': wma, 'rsi': rsi, 'market_positive': packed_market}
+        values.update(self.calculate_signals(packed, ema, wma, rsi, packed_market))
+        if index_close is not None:
+            values.update(self.relative_to_index(packed, np.asarray(index_close, dtype=float)[order]))
+        return values, order
+
+    @staticmethod
+    def relative_to_index(close, index_close) -> dict:
+        """
+        Strength vs the index on aligned (packed) arrays: RS_LEN bar return
+        relative to the index's, and rolling beta / correlation of bar returns
+        over BETA_LEN bars. Returns float arrays keyed by column name.
+        """
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = close / indicators.shift(close) - 1
+            index_returns = index_close / indicators.shift(index_close) - 1
+            rel_strength = (close / indicators.shift(close, RS_LEN)) / (index_close / indicators.shift(index_close, RS_LEN)) - 1
+        beta, correlation = indicators.rolling_beta(returns, index_returns, BETA_LEN)
+        return {'rel_strength': rel_strength, 'beta': beta, 'correlation': correlation}
+
+    @staticmethod
+    def panel_frame(fields: dict, panel: dict, ticker: str) -> pd.DataFrame:
+        """
+        One ticker out of a panel, in the calculate_indicators layout (OHLCV +
+        indicator and signal columns, only the bars the ticker has).
+        """
+        rows = panel['valid'][ticker].to_numpy()
+        df = pd.DataFrame({name: fields[name][ticker].to_numpy()[rows] for name in fields},
+                          index=panel['valid'].index[rows])
+        for name in ["ema_9", "wma_30", "rsi", "market_positive", "trend_up", "pullback", "rsi_positive",
+                     "crossover_ema9", "buy_signal", "exit_signal"]:
+            df[name] = panel[name][ticker].to_numpy()[rows]
         return df
 
+    def get_latest_panel_signal(self, panel: dict, min_bars: int = 50) -> pd.DataFrame:
+        """
+        Row slice of a panel: each ticker's last bar, in the get_latest_signal format.
+        Tickers with fewer than `min_bars` bars are left out.
+        """
+        valid = panel['valid'].to_numpy()
+        n_rows = valid.shape[0]
+        columns = [name for name in LATEST_COLUMNS if name in panel]
+        if n_rows == 0:
+            # No bars at all: same columns, no tickers
+            return pd.DataFrame(columns=["date"] + columns, index=panel['valid'].columns[:0])
+
+        # Last valid row per ticker (a halted ticker reports its last traded bar)
+        last = n_rows - 1 - np.argmax(valid[::-1], axis=0)
+        cols = np.arange(valid.shape[1])
+        enough = valid.sum(axis=0) >= min_bars
+
+        latest = pd.DataFrame({"date": panel['valid'].index[last]}, index=panel['valid'].columns)
+        for name in columns:
+            latest[name] = panel[name].to_numpy()[last, cols]
+        return latest[enough]
+
     def get_latest_signal(self, df: pd.DataFrame) -> dict:
         """
         Returns the latest signal status.
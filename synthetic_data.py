@@ -0,0 +1,146 @@
+import zlib
+
+import numpy as np
+import pandas as pd
+
+import bist_calendar
+from data_manager import DataManager, OHLCV_COLUMNS
+from fetch_scheduler import FetchScheduler
+from providers import DataProvider
+
+# Hourly bars per BIST session (10:00 - 18:00)
+SESSION_HOURS = 8
+
+
+def trading_calendar(n_bars: int, interval: str = "1d", end: str = "2026-10-16") -> pd.DatetimeIndex:
+    """
+    Last `n_bars` bar timestamps ending at `end`, skipping weekends and fixed holidays.
+    """
+    end = pd.Timestamp(end)
+    if interval == "1wk":
+        return pd.date_range(end=end, periods=n_bars, freq="W-MON")
+
+    if interval == "1d":
+        bars_per_day, step = 1, None
+    elif interval == "1h":
+        bars_per_day, step = SESSION_HOURS, np.timedelta64(60, "m")
+    elif interval == "15m":
+        bars_per_day, step = SESSION_HOURS * 4, np.timedelta64(15, "m")
+    else:
+        raise ValueError(f"Unsupported interval: {interval}")
+
+    n_days = -(-n_bars // bars_per_day)
+    days = []
+    day = end.normalize()
+    while len(days) < n_days:
+        if bist_calendar.is_trading_day(day.date()):
+            days.append(day)
+        day -= pd.Timedelta(days=1)
+    days = pd.DatetimeIndex(days[::-1])
+
+    if step is None:
+        return days[-n_bars:]
+    open_time = np.timedelta64(bist_calendar.SESSION_OPEN.hour, "h")
+    stamps = (days.values[:, None] + open_time + step * np.arange(bars_per_day)[None, :]).ravel()
+    return pd.DatetimeIndex(stamps[-n_bars:])
+
+
+class SyntheticMarket:
+    """
+    Deterministic BIST-like OHLCV: a market factor (the index) plus per-ticker
+    beta and idiosyncratic noise, with late listings, trading halts and
+    occasional missing bars. Same seed, same data.
+    """
+
+    def __init__(self, n_tickers: int = 100, n_bars: int = 252, interval: str = "1d", seed: int = 42,
+                 halt_prob: float = 0.002, gap_prob: float = 0.001, late_listing_share: float = 0.1):
+        self.interval = interval
+        self.index = trading_calendar(n_bars, interval)
+        self.tickers = [f"SYN{i:03d}" for i in range(n_tickers)]
+        rng = np.random.default_rng(seed)
+
+        scale = {"1wk": 5.0, "1d": 1.0, "1h": 1 / SESSION_HOURS, "15m": 1 / (SESSION_HOURS * 4)}[interval]
+        vol = 0.02 * np.sqrt(scale)
+
+        market = rng.normal(0.0003 * scale, vol * 0.7, n_bars)
+        self.index_close = 10000 * np.exp(np.cumsum(market))
+
+        beta = rng.uniform(0.5, 1.5, n_tickers)
+        idio = rng.normal(0, vol, (n_bars, n_tickers))
+        log_close = np.log(rng.uniform(5, 300, n_tickers)) + np.cumsum(market[:, None] * beta + idio, axis=0)
+        close = np.exp(log_close)
+
+        spread = np.abs(rng.normal(0, vol / 2, (n_bars, n_tickers)))
+        open_ = close * np.exp(rng.normal(0, vol / 2, (n_bars, n_tickers)))
+        high = np.maximum(open_, close) * np.exp(spread)
+        low = np.minimum(open_, close) * np.exp(-spread)
+        volume = np.round(rng.lognormal(13, 1, (n_bars, n_tickers)))
+
+        missing = rng.random((n_bars, n_tickers)) < gap_prob
+        # Halts: a few consecutive bars without trading
+        halt_starts = np.argwhere(rng.random((n_bars, n_tickers)) < halt_prob)
+        for row, col in halt_starts:
+            missing[row:row + rng.integers(2, 10), col] = True
+        # Late listings: no history before the listing bar
+        late = rng.random(n_tickers) < late_listing_share
+        for col in np.flatnonzero(late):
+            missing[:rng.integers(1, n_bars // 2 + 1), col] = True
+
+        self.data = {}
+        for field, values in zip(OHLCV_COLUMNS, (open_, high, low, close, volume)):
+            values = values.copy()
+            values[missing] = np.nan
+            self.data[field] = values
+
+    def frame(self, ticker: str) -> pd.DataFrame:
+        """One ticker's bars (rows without a bar are dropped, like a download)."""
+        col = self.tickers.index(ticker)
+        df = pd.DataFrame({field: self.data[field][:, col] for field in OHLCV_COLUMNS}, index=self.index)
+        return df.dropna(how="all")
+
+    def index_frame(self) -> pd.DataFrame:
+        close = self.index_close
+        return pd.DataFrame({"open": close, "high": close, "low": close, "close": close,
+                             "volume": np.zeros(len(close))}, index=self.index)
+
+
+class SyntheticProvider(DataProvider):
+    """
+    Serves a SyntheticMarket. Period and start arguments are ignored
+    (the whole history is returned).
+    """
+
+    def __init__(self, market: SyntheticMarket):
+        self.market = market
+
+    def download(self, tickers: list, interval: str = "1d", period: str = None, start: str = None,
+                 progress: bool = False) -> dict:
+        frames = {}
+        for ticker in tickers:
+            name = ticker.removesuffix(".IS")
+            if name.startswith("XU100"):
+                frames[ticker] = self.market.index_frame()
+            elif name in self.market.tickers:
+                frames[ticker] = self.market.frame(name)
+        return frames
+
+    def now(self):
+        # The market's last bar, so periods cover the same bars whatever the date
+        return self.market.index[-1].to_pydatetime()
+
+    def fundamentals(self, ticker: str) -> dict:
+        ticker = ticker.removesuffix(".IS")
+        rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+        return {"trailingPE": rng.uniform(3, 40), "priceToBook": rng.uniform(0.5, 8),
+                "marketCap": rng.uniform(1e9, 5e11), "sector": "Synthetic", "industry": "Synthetic"}
+
+
+class SyntheticDataManager(DataManager):
+    """
+    Offline DataManager serving a SyntheticMarket. No store, no network, no rate limit.
+    """
+
+    def __init__(self, market: SyntheticMarket):
+        super().__init__(store_dir=None, scheduler=FetchScheduler(max_workers=4, rate=1e9, burst=10 ** 9),
+                         provider=SyntheticProvider(market))
+        self.market = market
@@ -0,0 +1,25 @@
+import os
+import sys
+
+# Modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+
+from providers import write_snapshot
+from synthetic_data import SyntheticMarket, trading_calendar
+
+# Replay date of the snapshot fixture
+AS_OF = "2024-06-28"
+
+
+@pytest.fixture(scope="session")
+def replay_snapshot(tmp_path_factory):
+    """Two years of synthetic daily bars ending 2024-12-31, index included. Returns (root, tickers)."""
+    market = SyntheticMarket(n_tickers=12, n_bars=500, seed=3)
+    market.index = trading_calendar(500, "1d", end="2024-12-31")
+    root = str(tmp_path_factory.mktemp("replay"))
+    frames = {ticker: market.frame(ticker) for ticker in market.tickers}
+    frames["XU100"] = market.index_frame()
+    write_snapshot(root, frames)
+    return root, market.tickers
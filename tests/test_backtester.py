@@ -0,0 +1,141 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backtester import Backtester, position_events
+from data_manager import DataManager
+from portfolio import PortfolioSimulator
+from strategy_engine import StrategyEngine
+from synthetic_data import SyntheticMarket
+
+
+def signal_frame(close, buy, exit_):
+    index = pd.bdate_range("2024-01-01", periods=len(close))
+    return pd.DataFrame({"close": np.asarray(close, dtype=float), "buy_signal": np.asarray(buy, dtype=bool),
+                         "exit_signal": np.asarray(exit_, dtype=bool)}, index=index)
+
+
+# Trade simulation only, nothing is fetched
+BACKTESTER = Backtester(DataManager(store_dir=None))
+
+
+def assert_same_trades(df):
+    assert BACKTESTER.run_backtest(df) == BACKTESTER.run_backtest_loop(df)
+
+
+@pytest.fixture(scope="module")
+def market():
+    return SyntheticMarket(n_tickers=40, n_bars=500, seed=7)
+
+
+def test_parity_on_synthetic_tickers(market):
+    engine = StrategyEngine()
+    index_df = market.index_frame()
+    n_trades = 0
+    for ticker in market.tickers:
+        # Late listings and halts: dropped bars, NaN warm-up of every indicator
+        df = engine.calculate_indicators(market.frame(ticker).dropna(), index_df)
+        assert_same_trades(df)
+        n_trades += len(BACKTESTER.run_backtest(df))
+    assert n_trades > 0
+
+
+def test_no_trades():
+    df = signal_frame(np.linspace(10, 20, 30), np.zeros(30), np.ones(30))
+    assert_same_trades(df)
+    assert BACKTESTER.run_backtest(df) == []
+
+
+def test_empty_frame():
+    assert BACKTESTER.run_backtest(signal_frame([], [], [])) == []
+
+
+def test_position_open_at_end():
+    buy = [0, 1, 0, 0, 0, 0, 1, 0, 0]
+    exit_ = [0, 0, 0, 1, 0, 0, 0, 0, 0]
+    df = signal_frame(np.arange(10, 19), buy, exit_)
+    assert_same_trades(df)
+    trades = BACKTESTER.run_backtest(df)
+    assert len(trades) == 2
+    assert trades[-1]["status"] == "open" and trades[-1]["exit_date"] == df.index[-1]
+
+
+def test_exit_and_buy_on_same_bar_re_enters():
+    buy = [1, 0, 1, 0, 0]
+    exit_ = [0, 0, 1, 0, 1]
+    assert_same_trades(signal_frame([10, 11, 12, 13, 14], buy, exit_))
+
+
+def test_nan_warm_up():
+    close = 100 + np.cumsum(np.random.default_rng(1).normal(0, 2, 120))
+    df = StrategyEngine(ema_len=5, wma_len=20).calculate_indicators(
+        pd.DataFrame({"close": close}, index=pd.bdate_range("2024-01-01", periods=len(close))))
+    # Warm-up bars have NaN indicators and never signal
+    assert df["wma_30"].iloc[:19].isna().all()
+    assert not df["buy_signal"].iloc[:19].any()
+    assert_same_trades(df)
+
+
+def test_random_signals_match_loop():
+    rng = np.random.default_rng(3)
+    for _ in range(50):
+        n = int(rng.integers(1, 60))
+        assert_same_trades(signal_frame(rng.uniform(1, 100, n), rng.random(n) < 0.2, rng.random(n) < 0.2))
+
+
+def test_position_events_per_column_matches_single_ticker():
+    rng = np.random.default_rng(5)
+    buy, exit_ = rng.random((80, 6)) < 0.15, rng.random((80, 6)) < 0.15
+    opens, closes = position_events(buy, exit_)
+    for col in range(buy.shape[1]):
+        col_opens, col_closes = position_events(buy[:, col], exit_[:, col])
+        np.testing.assert_array_equal(opens[:, col], col_opens)
+        np.testing.assert_array_equal(closes[:, col], col_closes)
+
+
+def test_portfolio_hand_computed():
+    dates = pd.bdate_range("2024-01-01", periods=4)
+    close = pd.DataFrame({"A": [10.0, 10.0, 12.0, 11.0], "B": [20.0, 20.0, np.nan, 25.0],
+                          "C": [50.0, 50.0, 50.0, 50.0]}, index=dates)
+    buy = pd.DataFrame({"A": [True, True, False, False], "B": [True, False, False, False],
+                        "C": [True, True, False, False]}, index=dates)
+    exit_ = pd.DataFrame({"A": [False, True, False, False], "B": False, "C": False}, index=dates)
+    rank = pd.DataFrame({"A": 2.0, "B": 3.0, "C": 1.0}, index=dates)
+    simulator = PortfolioSimulator(initial_capital=1000.0, max_positions=2, position_size=0.25,
+                                   commission=0.01, slippage=0.0)
+    result = simulator.run(close, buy, exit_, rank=rank)
+
+    # Bar 0: B and A outrank C for the two slots, 250 each + 1% fees
+    # Bar 1: A exits at 10 (cash 495 + 247.5) and re-enters ahead of C with 25% of 992.5
+    # Bar 2: B is halted and stays marked at 20
+    curve = result["curve"]
+    np.testing.assert_allclose(curve["cash"], [495.0, 491.89375, 491.89375, 491.89375])
+    np.testing.assert_allclose(curve["equity"], [995.0, 990.01875, 1039.64375, 1077.33125])
+    assert list(curve["positions"]) == [2, 2, 2, 2]
+
+    trades = result["trades"]
+    assert list(trades["Ticker"]) == ["A", "A", "B"]
+    assert list(trades["status"]) == ["closed", "open", "open"]
+    assert list(trades["entry_date"]) == [dates[0], dates[1], dates[0]]
+    assert list(trades["exit_date"]) == [dates[1], dates[3], dates[3]]
+    np.testing.assert_allclose(trades["shares"], [25.0, 24.8125, 12.5])
+    np.testing.assert_allclose(trades["return"], [0.0, 0.1, 0.25])
+
+    metrics = result["metrics"]
+    assert metrics["Final Equity"] == pytest.approx(1077.33125)
+    assert metrics["Fees"] == pytest.approx(9.98125)
+    assert metrics["Trades"] == 3
+
+
+def test_portfolio_scales_entries_to_cash():
+    dates = pd.bdate_range("2024-01-01", periods=2)
+    close = pd.DataFrame({"A": [10.0, 10.0], "B": [20.0, 20.0]}, index=dates)
+    buy = pd.DataFrame({"A": [True, False], "B": [True, False]}, index=dates)
+    simulator = PortfolioSimulator(initial_capital=1000.0, max_positions=2, position_size=1.0,
+                                   commission=0.0, slippage=0.01)
+    result = simulator.run(close, buy, buy & False)
+
+    # Full-equity targets don't fit twice: both get half the cash, filled 1% above the close
+    np.testing.assert_allclose(result["trades"]["shares"], [500 / 10.1, 500 / 20.2])
+    assert result["curve"]["cash"].iloc[-1] == pytest.approx(0.0)
+    np.testing.assert_allclose(result["curve"]["equity"], [1000 / 1.01] * 2)
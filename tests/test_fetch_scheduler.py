@@ -0,0 +1,116 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data_manager import DataManager
+from fetch_scheduler import FetchScheduler, RateLimiter
+from instrumentation import RunProfile
+from providers import DataProvider
+
+
+class FakeClock:
+    """Time only moves when somebody sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        with self.lock:
+            self.sleeps.append(seconds)
+            self.now += seconds
+
+
+class FlakyProvider(DataProvider):
+    """
+    Fails the first `failures[ticker]` requests of a ticker (raising or
+    returning nothing), then serves bars. Records the clock of every request.
+    """
+
+    def __init__(self, failures: dict, clock: FakeClock = None, empty: bool = False):
+        self.failures = dict(failures)
+        self.clock = clock
+        self.empty = empty
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def download(self, tickers, interval="1d", period=None, start=None, progress=False):
+        (ticker,) = tickers
+        with self.lock:
+            self.calls.append((ticker, self.clock() if self.clock else None))
+            failing = self.failures.get(ticker, 0)
+            self.failures[ticker] = failing - 1
+        if failing > 0:
+            if self.empty:
+                return {}
+            raise ConnectionError("HTTP 429")
+        index = pd.date_range(end=pd.Timestamp.now().normalize(), periods=5, freq="D")
+        close = np.arange(1.0, 6.0)
+        return {ticker: pd.DataFrame({"open": close, "high": close, "low": close, "close": close,
+                                      "volume": close}, index=index)}
+
+
+def manager(provider, clock: FakeClock, **kwargs) -> DataManager:
+    scheduler = FetchScheduler(clock=clock, sleep=clock.sleep, **kwargs)
+    return DataManager(store_dir=None, scheduler=scheduler, provider=provider)
+
+
+def test_retry_with_backoff_then_success():
+    clock = FakeClock()
+    provider = FlakyProvider({"AKBNK.IS": 2})
+    report = manager(provider, clock, max_workers=1, rate=1e9, burst=10, retries=2, backoff=1.0) \
+        .fetch_many(["AKBNK"], period="1mo")
+
+    assert list(report.results) == ["AKBNK"] and not report.failures
+    assert report.attempts["AKBNK"] == 3
+    # Exponential backoff between attempts
+    assert clock.sleeps == [1.0, 2.0]
+
+
+def test_empty_response_is_retried():
+    clock = FakeClock()
+    provider = FlakyProvider({"AKBNK.IS": 1}, empty=True)
+    report = manager(provider, clock, max_workers=1, rate=1e9, burst=10).fetch_many(["AKBNK"], period="1mo")
+    assert report.attempts["AKBNK"] == 2 and "AKBNK" in report.results
+
+
+def test_failures_are_reported():
+    clock = FakeClock()
+    provider = FlakyProvider({"BAD.IS": 99})
+    profile = RunProfile("test")
+    report = manager(provider, clock, max_workers=2, rate=1e9, burst=10, retries=2) \
+        .fetch_many(["AKBNK", "BAD"], period="1mo", profile=profile)
+
+    assert list(report.results) == ["AKBNK"]
+    assert report.failures == {"BAD": "ConnectionError: HTTP 429"}
+    assert report.attempts == {"AKBNK": 1, "BAD": 3}
+    assert "BAD" in str(profile.failures)
+    assert report.summary().startswith("1 ok, 1 failed")
+
+
+def test_requests_are_paced_by_the_token_bucket():
+    clock = FakeClock()
+    provider = FlakyProvider({}, clock=clock)
+    tickers = [f"T{i}" for i in range(6)]
+    report = manager(provider, clock, max_workers=1, rate=2.0, burst=2, retries=0).fetch_many(tickers, period="1mo")
+
+    assert len(report.results) == 6
+    times = sorted(t for _, t in provider.calls)
+    # Burst of 2 right away, then one request every 1 / rate seconds
+    assert times[:2] == [0.0, 0.0]
+    np.testing.assert_allclose(np.diff(times[1:]), 0.5)
+
+
+def test_rate_limiter_never_exceeds_rate():
+    clock = FakeClock()
+    limiter = RateLimiter(rate=4.0, burst=1, clock=clock, sleep=clock.sleep)
+    stamps = []
+    for _ in range(20):
+        limiter.acquire()
+        stamps.append(clock())
+    assert stamps[-1] >= 19 / 4.0 - 1e-9
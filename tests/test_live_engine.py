@@ -0,0 +1,82 @@
+import math
+
+import pytest
+
+from live_engine import LiveSignalEngine, RollingWindow
+from strategy_engine import StrategyEngine
+from synthetic_data import SyntheticMarket
+
+SEED_BARS = 120
+
+
+@pytest.fixture(scope="module")
+def market():
+    return SyntheticMarket(n_tickers=8, n_bars=300, seed=5)
+
+
+def assert_signal_equal(live, expected):
+    if expected is None:
+        assert live is None
+        return
+    assert live is not None
+    assert live.keys() == expected.keys()
+    for key, value in expected.items():
+        if isinstance(value, float):
+            assert live[key] == pytest.approx(value, rel=1e-9, nan_ok=True), key
+        else:
+            assert live[key] == value, key
+
+
+def test_rolling_window():
+    window = RollingWindow(3)
+    values = [1.0, 4.0, 2.0, 8.0, 5.0, 7.0, 3.0]
+    for i, value in enumerate(values):
+        last = values[max(0, i - 2):i + 1]
+        if len(last) == 3:
+            assert window.peek_mean(value) == pytest.approx(sum(last) / 3)
+            assert window.peek_weighted_mean(value) == pytest.approx((last[0] + 2 * last[1] + 3 * last[2]) / 6)
+        else:
+            assert math.isnan(window.peek_mean(value))
+        window.push(value)
+
+
+def test_updates_match_calculate_indicators(market):
+    engine = StrategyEngine()
+    live = LiveSignalEngine.from_strategy(engine)
+    index_df = market.index_frame()
+    split = index_df.index[SEED_BARS]
+    live.seed_index(index_df[index_df.index < split])
+
+    frames = {ticker: market.frame(ticker).dropna() for ticker in market.tickers}
+    expected = {ticker: engine.calculate_indicators(df, index_df) for ticker, df in frames.items()}
+    for ticker, df in frames.items():
+        seeded = live.seed(ticker, df[df.index < split], index_df[index_df.index < split])
+        assert_signal_equal(seeded, engine.get_latest_signal(expected[ticker][expected[ticker].index < split]))
+
+    for date in index_df.index[SEED_BARS:]:
+        # Intraday polls: a forming bar first, replaced by the final one
+        index_close = index_df.at[date, 'close']
+        live.update_index(date, index_close * 1.05)
+        live.update_index(date, index_close)
+        for ticker, df in frames.items():
+            if date not in df.index:
+                continue
+            close = df.at[date, 'close']
+            live.update(ticker, date, close * 0.9)
+            signal = live.update(ticker, date, close)
+            history = expected[ticker].loc[:date]
+            assert_signal_equal(signal, engine.get_latest_signal(history))
+
+    latest = live.latest_signals()
+    for ticker, df in expected.items():
+        if df.index[-1] == index_df.index[-1]:
+            assert_signal_equal(latest[ticker], engine.get_latest_signal(df))
+
+
+def test_index_filter_matches_rolling_sma(market):
+    live = LiveSignalEngine()
+    index_df = market.index_frame()
+    sma = index_df['close'].rolling(50).mean()
+    for date, close in index_df['close'].items():
+        live.update_index(date, close * 0.95)
+        assert live.update_index(date, close) == bool(close > sma[date])
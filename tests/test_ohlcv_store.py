@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_manager import DataManager
+from providers import DataProvider
+
+
+class SplitProvider(DataProvider):
+    """One ticker's daily bars; split() halves every close before the last few bars (auto-adjusted)."""
+
+    def __init__(self, n_bars: int = 120):
+        index = pd.bdate_range("2024-01-01", periods=n_bars)
+        close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, n_bars))
+        self.bars = pd.DataFrame({"open": close, "high": close + 1, "low": close - 1, "close": close,
+                                  "volume": np.full(n_bars, 1e6)}, index=index)
+        self.visible = n_bars - 5
+        self.requests = []
+
+    def split(self, at: int):
+        self.bars.iloc[:at, :4] /= 2
+
+    def download(self, tickers, interval="1d", period=None, start=None, progress=False):
+        self.requests.append({"period": period, "start": start})
+        df = self.bars.iloc[:self.visible]
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start)]
+        return {ticker: df for ticker in tickers}
+
+
+def make_stale(data_manager):
+    # Written long before the last session close
+    os.utime(data_manager.store.path("AKBNK.IS", "1d"), (0, 0))
+
+
+def test_top_up_appends_new_bars(tmp_path):
+    provider = SplitProvider()
+    dm = DataManager(store_dir=str(tmp_path), provider=provider)
+    assert len(dm.fetch_ohlcv("AKBNK", period="max")) == provider.visible
+
+    provider.visible += 5
+    make_stale(dm)
+    df = dm.fetch_ohlcv("AKBNK", period="max")
+    pd.testing.assert_frame_equal(df, provider.bars, check_freq=False)
+    # Only the overlap was downloaded again
+    assert provider.requests[-1]["start"] == provider.bars.index[-7].strftime("%Y-%m-%d")
+
+
+def test_top_up_after_split_refetches_history(tmp_path):
+    provider = SplitProvider()
+    dm = DataManager(store_dir=str(tmp_path), provider=provider)
+    dm.fetch_ohlcv("AKBNK", period="max")
+
+    provider.visible += 5
+    provider.split(at=len(provider.bars) - 3)
+    make_stale(dm)
+    df = dm.fetch_ohlcv("AKBNK", period="max")
+    # No bar on the old price basis is left, in the result or the store
+    pd.testing.assert_frame_equal(df, provider.bars, check_freq=False)
+    pd.testing.assert_frame_equal(dm.store.load("AKBNK.IS", "1d"), provider.bars, check_freq=False)
+
+
+def test_bulk_top_up_after_split_refetches_history(tmp_path):
+    provider = SplitProvider()
+    dm = DataManager(store_dir=str(tmp_path), provider=provider)
+    dm.fetch_ohlcv_bulk(["AKBNK"], period="max", progress=False)
+
+    provider.visible += 5
+    provider.split(at=len(provider.bars) - 3)
+    make_stale(dm)
+    frames = dm.fetch_ohlcv_bulk(["AKBNK"], period="max", progress=False)
+    pd.testing.assert_frame_equal(frames["AKBNK"], provider.bars, check_freq=False)
+    assert provider.requests[-1]["start"] == provider.bars.index[0].strftime("%Y-%m-%d")
@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+
+from data_manager import DataManager
+from market_regime import MarketRegime
+from ohlcv_store import DEFAULT_STORE_DIR
+from providers import ReplayProvider, YFinanceProvider
+from scanner import Scanner
+
+from conftest import AS_OF
+
+
+def replay_scanner(root, store_dir=None) -> Scanner:
+    scanner = Scanner()
+    scanner.data_manager = DataManager(store_dir=store_dir, provider=ReplayProvider(root, as_of=AS_OF))
+    scanner.market_regime = MarketRegime(scanner.data_manager)
+    return scanner
+
+
+@pytest.mark.parametrize("with_store", [False, True])
+def test_fetch_paths_use_the_replay_date(replay_snapshot, tmp_path, with_store):
+    root, tickers = replay_snapshot
+    dm = DataManager(store_dir=str(tmp_path) if with_store else None, provider=ReplayProvider(root, as_of=AS_OF))
+
+    single = dm.fetch_ohlcv(tickers[0], period="6mo")
+    assert not single.empty
+    assert single.index[-1] <= pd.Timestamp(AS_OF)
+    assert single.index[0] >= pd.Timestamp("2023-12-28")
+
+    bulk = dm.fetch_ohlcv_bulk(tickers, period="6mo", progress=False)
+    many = dm.fetch_many(tickers, period="6mo").results
+    assert set(bulk) == set(many) and bulk
+    for ticker, df in bulk.items():
+        pd.testing.assert_frame_equal(df, many[ticker])
+    pd.testing.assert_frame_equal(bulk[tickers[0]], single)
+
+
+def test_replayed_scan_is_deterministic(replay_snapshot, tmp_path):
+    root, tickers = replay_snapshot
+    first = replay_scanner(root).scan_market(tickers)
+    # Again through a store: first run fills it, second reads it back as fresh
+    stored = replay_scanner(root, str(tmp_path)).scan_market(tickers)
+    again = replay_scanner(root, str(tmp_path)).scan_market(tickers)
+
+    assert not first.empty
+    pd.testing.assert_frame_equal(first, stored)
+    pd.testing.assert_frame_equal(first, again)
+
+
+def test_bars_after_the_replay_date_are_hidden(replay_snapshot, tmp_path):
+    root, tickers = replay_snapshot
+    # A store that already holds later bars (e.g. filled by a live run)
+    DataManager(store_dir=str(tmp_path), provider=ReplayProvider(root)).fetch_ohlcv(tickers[0], period="2y")
+    df = DataManager(store_dir=str(tmp_path), provider=ReplayProvider(root, as_of=AS_OF)) \
+        .fetch_ohlcv(tickers[0], period="6mo")
+    assert not df.empty and df.index[-1] <= pd.Timestamp(AS_OF)
+
+
+def test_replay_has_no_store_by_default(replay_snapshot, tmp_path):
+    root, tickers = replay_snapshot
+    dm = DataManager(provider=ReplayProvider(root, as_of=AS_OF))
+    assert dm.store is None
+    assert not dm.fetch_ohlcv(tickers[0], period="6mo").empty
+    # An explicit store_dir is still used
+    assert DataManager(store_dir=str(tmp_path), provider=ReplayProvider(root, as_of=AS_OF)).store.root == str(tmp_path)
+    assert DataManager(provider=YFinanceProvider()).store.root == DEFAULT_STORE_DIR
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from parallel import MIN_CHUNK
+from robustness import RobustnessAnalyzer, trade_arrays
+
+N_RESAMPLES = 999
+
+
+def trade_list(dates, spans, returns):
+    return [{"entry_date": dates[i], "exit_date": dates[j], "return": r} for (i, j), r in zip(spans, returns)]
+
+
+def random_book(n_tickers: int, n_bars: int = 250, seed: int = 0):
+    # backtest_tickers-like results plus the closes the trades were run on
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2024-01-01", periods=n_bars)
+    rows, closes = [], {}
+    for k in range(n_tickers):
+        ticker = f"T{k:03d}"
+        close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars))), index=dates)
+        entries = np.sort(rng.choice(n_bars - 20, size=8, replace=False))
+        spans = [(i, i + int(rng.integers(1, 20))) for i in entries]
+        returns = [close.iloc[j] / close.iloc[i] - 1 for i, j in spans]
+        rows.append({"Ticker": ticker, "Trades": trade_list(dates, spans, returns)})
+        closes[ticker] = close
+    return pd.DataFrame(rows), closes
+
+
+def test_chunked_run_matches_serial():
+    results, closes = random_book(3 * MIN_CHUNK)
+    serial = RobustnessAnalyzer(n_resamples=N_RESAMPLES, max_workers=1).run(results, closes)
+    chunked = RobustnessAnalyzer(n_resamples=N_RESAMPLES, max_workers=3).run(results, closes)
+
+    pd.testing.assert_frame_equal(chunked["tickers"], serial["tickers"])
+    assert list(serial["tickers"]["Ticker"]) == list(results["Ticker"])
+    # Aggregate paths are summed per chunk, only the float summation order differs
+    assert chunked["aggregate"].keys() == serial["aggregate"].keys()
+    for key, value in serial["aggregate"].items():
+        assert chunked["aggregate"][key] == pytest.approx(value), key
+
+
+@pytest.mark.parametrize("trade_return, p_value", [(0.05, 1 / (N_RESAMPLES + 1)), (-0.05, 1.0)])
+def test_p_value_against_a_flat_close(trade_return, p_value):
+    # Random entries on a flat close make exactly 0, so winners always beat them and losers never do
+    dates = pd.bdate_range("2024-01-01", periods=100)
+    trades = trade_list(dates, [(10, 15), (30, 40), (60, 62), (80, 90)], [trade_return] * 4)
+    results = pd.DataFrame({"Ticker": ["FLAT"], "Trades": [trades]})
+    out = RobustnessAnalyzer(n_resamples=N_RESAMPLES).run(results, {"FLAT": pd.Series(100.0, index=dates)})
+
+    row = out["tickers"].iloc[0]
+    assert row["Total Trades"] == 4
+    assert row["Total Return"] == pytest.approx(4 * trade_return)
+    assert row["p-value"] == pytest.approx(p_value)
+    assert out["aggregate"]["p-value"] == pytest.approx(p_value)
+    # Every resample of identical trades has the same total and win rate
+    assert row["Return CI Low"] == pytest.approx(4 * trade_return)
+    assert row["Return CI High"] == pytest.approx(4 * trade_return)
+    assert row["Win Rate CI Low"] == row["Win Rate CI High"] == float(trade_return > 0)
+    assert row["P(Loss)"] == float(trade_return < 0)
+
+
+def test_confidence_bounds_on_a_known_trade_list():
+    dates = pd.bdate_range("2024-01-01", periods=100)
+    returns = [0.10, -0.04, 0.06, 0.02, -0.01, 0.08]
+    trades = trade_list(dates, [(i * 10, i * 10 + 5) for i in range(len(returns))], returns)
+    results = pd.DataFrame({"Ticker": ["KNOWN"], "Trades": [trades]})
+    close = pd.Series(np.linspace(100, 120, len(dates)), index=dates)
+    row = RobustnessAnalyzer(n_resamples=N_RESAMPLES).run(results, {"KNOWN": close})["tickers"].iloc[0]
+
+    total = sum(returns)
+    assert row["Total Return"] == pytest.approx(total)
+    assert row["Win Rate"] == pytest.approx(4 / 6)
+    # Resampled totals lie between all-worst and all-best, around the observed total
+    assert 6 * min(returns) <= row["Return CI Low"] < total < row["Return CI High"] <= 6 * max(returns)
+    assert 0 <= row["Win Rate CI Low"] < 4 / 6 < row["Win Rate CI High"] <= 1
+    assert 0 <= row["P(Loss)"] < 0.5
+    assert 1 / (N_RESAMPLES + 1) <= row["p-value"] <= 1
+
+
+def test_trade_arrays_drops_unknown_dates():
+    dates = pd.bdate_range("2024-01-01", periods=10)
+    trades = trade_list(dates, [(1, 3), (4, 8)], [0.1, 0.2])
+    trades.append({"entry_date": pd.Timestamp("2023-01-02"), "exit_date": dates[2], "return": 0.3})
+    returns, holding = trade_arrays(trades, pd.Series(1.0, index=dates))
+    np.testing.assert_allclose(returns, [0.1, 0.2])
+    assert list(holding) == [2, 4]
+
+
+def test_no_trades():
+    results = pd.DataFrame({"Ticker": ["NONE"], "Trades": [[]]})
+    out = RobustnessAnalyzer(n_resamples=N_RESAMPLES).run(results, {"NONE": pd.Series(dtype=float)})
+    assert out["tickers"].empty and out["aggregate"] == {}
@@ -0,0 +1,24 @@
+import os
+
+import scan_daemon
+from snapshots import SnapshotStore
+
+from conftest import AS_OF
+
+
+def test_replay_run_publishes_snapshot_without_touching_the_store(replay_snapshot, tmp_path):
+    root, tickers = replay_snapshot
+    universe = tmp_path / "universe.txt"
+    universe.write_text("\n".join(tickers))
+    store_dir = tmp_path / "store"
+
+    argv = ["--once", "--replay", root, "--as-of", AS_OF, "--universe", str(universe), "--workers", "1",
+            "--snapshot-dir", str(tmp_path / "snapshots"), "--store-dir", str(store_dir), "--backtest"]
+    assert scan_daemon.main(argv) == 0
+
+    # Replayed bars must never end up in the (live) store
+    assert not os.path.exists(store_dir)
+    snapshots = SnapshotStore(str(tmp_path / "snapshots"))
+    scan = snapshots.load("scan", "1d", str(universe), (9, 30, 50))
+    assert scan is not None and not scan["results"].empty
+    assert snapshots.load("backtest", "1d", str(universe), (9, 30, 50)) is not None
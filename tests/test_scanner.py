@@ -0,0 +1,63 @@
+import pandas as pd
+import pytest
+
+from instrumentation import RunProfile
+from market_regime import MarketRegime
+from scanner import Scanner
+from synthetic_data import SyntheticDataManager, SyntheticMarket
+
+RESULT_COLUMNS = ["Ticker", "Price", "Trend Up", "Market Pos", "Buy Signal", "Exit Signal", "EMA9", "WMA30", "RSI"]
+
+
+@pytest.fixture(scope="module")
+def market():
+    return SyntheticMarket(n_tickers=30, n_bars=300, seed=11)
+
+
+@pytest.fixture
+def scanner(market):
+    scanner = Scanner()
+    scanner.data_manager = SyntheticDataManager(market)
+    scanner.market_regime = MarketRegime(scanner.data_manager)
+    return scanner
+
+
+def test_scan_market(scanner, market):
+    results = scanner.scan_market(market.tickers)
+    assert set(RESULT_COLUMNS) <= set(results.columns)
+    assert 0 < len(results) <= len(market.tickers)
+
+
+def test_streaming_scan_matches_full_scan(scanner, market):
+    full = scanner.scan_market(market.tickers)
+    streamed = pd.concat(list(scanner.scan_market_iter(market.tickers, chunk_size=7)), ignore_index=True)
+    pd.testing.assert_frame_equal(streamed, full)
+
+
+def test_all_frames_empty(scanner, market):
+    frames = {ticker: market.frame(ticker).iloc[:0] for ticker in market.tickers}
+    results = scanner._scan_frames(frames, "1d", RunProfile("test"))[2]
+    assert results.empty
+    assert set(RESULT_COLUMNS) <= set(results.columns)
+
+
+def test_unknown_tickers(scanner):
+    assert scanner.scan_market(["NOPE1", "NOPE2"]).empty
+    assert all(part.empty for part in scanner.scan_market_iter(["NOPE1", "NOPE2"]))
+
+
+def test_screener_rescans_for_other_tickers(scanner, market):
+    scanner.scan_market(market.tickers[:10])
+    screener = scanner.screener("1d", market.tickers[10:20])
+    assert set(market.tickers[10:20]) <= set(screener.tickers)
+    # A subset of the cached panel is served without rescanning
+    assert scanner.screener("1d", market.tickers[12:15]).tickers.equals(screener.tickers)
+
+
+def test_streaming_summary_on_early_stop(scanner, market, capsys):
+    parts = scanner.scan_market_iter(market.tickers, chunk_size=7)
+    next(parts)
+    capsys.readouterr()
+    parts.close()
+    assert capsys.readouterr().out.startswith("scan_market_iter")
+    assert scanner.last_profile.elapsed > 0
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import timeframes
+from market_regime import MarketRegime
+from scanner import Scanner
+from screener import Screener, compile_expression
+from synthetic_data import SyntheticDataManager, SyntheticMarket
+
+
+@pytest.fixture(scope="module")
+def scanner():
+    # Seed with a few buy signals on the last bar
+    market = SyntheticMarket(n_tickers=60, n_bars=300, seed=3)
+    scanner = Scanner()
+    scanner.data_manager = SyntheticDataManager(market)
+    scanner.market_regime = MarketRegime(scanner.data_manager)
+    scanner.scan_market(market.tickers)
+    return scanner
+
+
+@pytest.fixture(scope="module")
+def scanned(scanner):
+    return scanner.result_cache.get(("*", "1d", timeframes.scan_period("1d"), scanner.strategy_engine.params))
+
+
+@pytest.mark.parametrize("expression", [
+    "close.real > 0",
+    "close[0] > 0",
+    "close > 'a'",
+    "sma(close, length=5) > close",
+    "sma(close, rsi) > close",
+    "sma(close, 0) > close",
+    "sma(close, 2.5) > close",
+    "__import__('os')",
+    "lambda: 1",
+    "rsi >",
+])
+def test_rejected_expressions(expression):
+    with pytest.raises(ValueError):
+        compile_expression(expression)
+
+
+def test_unknown_column(scanner):
+    with pytest.raises(ValueError, match="nope"):
+        scanner.screener("1d").screen("nope > 1")
+
+
+def test_chained_comparison(scanner):
+    screener = scanner.screener("1d")
+    chained = screener.mask("30 < rsi < 70")
+    assert chained.equals(screener.mask("rsi > 30 and rsi < 70"))
+    assert chained.to_numpy().any()
+
+
+def test_nan_flags_are_false():
+    dates = pd.date_range("2024-01-01", periods=3)
+    valid = pd.DataFrame({"A": [True, True, True], "B": [True, True, False]}, index=dates)
+    flag = pd.DataFrame({"A": [1.0, np.nan, 0.0], "B": [np.nan, 1.0, np.nan]}, index=dates)
+    screener = Screener({"close": valid.astype(float)}, {"valid": valid, "flag": flag}, min_bars=1)
+    expected = pd.DataFrame({"A": [True, False, False], "B": [False, True, False]}, index=dates)
+    assert screener.mask("flag").equals(expected)
+    # Negation of a NaN flag is True on a traded bar, never on a missing one
+    assert screener.mask("not flag").equals(valid & ~expected)
+
+
+def test_historical_date(scanner, scanned):
+    fields, panel = scanned
+    screener = scanner.screener("1d")
+    date = screener.dates[-40]
+    results = screener.screen("trend_up", date=date.date())
+
+    bars = panel['valid'].loc[:date].sum()
+    expected = panel['valid'].loc[date] & (bars >= screener.min_bars) & panel['trend_up'].loc[date].astype(bool)
+    assert set(results['Ticker']) == set(expected.index[expected])
+    assert (results['Date'] == date).all()
+    np.testing.assert_allclose(results['Price'], fields['close'].loc[date, results['Ticker']])
+    assert screener.screen(date=screener.dates[0] - pd.Timedelta(days=1)).empty
+
+
+def test_buy_signal_matches_scan(scanner):
+    scan = scanner.scan_market(scanner.data_manager.market.tickers)
+    screener = scanner.screener("1d")
+    expected = scan[scan['Buy Signal']]
+    assert len(expected) > 0
+    results = screener.screen("buy_signal")
+    assert sorted(results['Ticker']) == sorted(expected['Ticker'])
+
+    everything = screener.screen().drop(columns="Date").sort_values("Ticker", ignore_index=True)
+    pd.testing.assert_frame_equal(everything, scan.sort_values("Ticker", ignore_index=True))
+
+
+def test_rank(scanner):
+    results = scanner.screener("1d").screen(rank="rsi", limit=5)
+    assert len(results) == 5
+    assert results['Score'].is_monotonic_decreasing
+    np.testing.assert_allclose(results['Score'], results['RSI'])
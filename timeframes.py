@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+import bist_calendar
+
+# Supported bar intervals, finest first
+INTERVALS = ("15m", "1h", "1d", "1wk")
+
+# Default history per interval. Enough bars for WMA 30 / SMA 50 warm-up and the
+# 50 bar minimum, within Yahoo's intraday limits (15m: 60 days, 1h: 730 days).
+SCAN_PERIODS = {"15m": "1mo", "1h": "3mo", "1d": "6mo", "1wk": "2y"}
+BACKTEST_PERIODS = {"15m": "60d", "1h": "1y", "1d": "1y", "1wk": "1y"}
+# Index history for the market filter, covers the longest of the above plus SMA warm-up
+INDEX_PERIODS = {"15m": "60d", "1h": "1y", "1d": "1y", "1wk": "2y"}
+
+# For annualising (Sharpe, CAGR). A BIST session is 10:00 - 18:10
+BARS_PER_YEAR = {"15m": 252 * 33, "1h": 252 * 9, "1d": 252, "1wk": 52}
+
+# Intervals DataManager builds locally from a finer stored interval instead of downloading.
+# Intraday is downloaded natively: 15m history is too short to derive a year of hourly bars.
+DERIVED_INTERVALS = {"1wk": "1d"}
+
+_STEPS = {"15m": pd.Timedelta(minutes=15), "30m": pd.Timedelta(minutes=30),
+          "1h": pd.Timedelta(hours=1), "2h": pd.Timedelta(hours=2), "4h": pd.Timedelta(hours=4)}
+_AGGREGATION = {"open": "first", "high": "max", "low": "min", "close": "last"}
+
+
+def scan_period(interval: str) -> str:
+    return SCAN_PERIODS[interval]
+
+
+def backtest_period(interval: str) -> str:
+    return BACKTEST_PERIODS[interval]
+
+
+def index_period(interval: str) -> str:
+    return INDEX_PERIODS[interval]
+
+
+def finest(intervals) -> str:
+    """Finest interval of the list (the one to download when deriving the rest)."""
+    order = list(INTERVALS) + [i for i in _STEPS if i not in INTERVALS]
+    return min(intervals, key=lambda interval: order.index(interval) if interval in order else len(order))
+
+
+def resample_ohlcv(df: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """
+    Aggregates OHLCV bars into coarser `interval` bars (open first, high max,
+    low min, close last, volume sum), along BIST session boundaries:
+
+    - intraday buckets are anchored at the session open (10:00, 11:00, ...), so
+      the closing auction stays in the day's last bar and never spills over
+    - daily bars are labeled with the Istanbul trading date
+    - weekly bars are labeled with the Monday of the week (like yfinance)
+
+    Bars without any data are dropped. The last bucket may still be forming.
+    """
+    if df.empty:
+        return df
+
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_convert(bist_calendar.BIST_TZ)
+    day = index.normalize()
+
+    if interval == "1d":
+        keys = day.tz_localize(None) if day.tz is not None else day
+    elif interval == "1wk":
+        keys = day - pd.to_timedelta(day.weekday, unit="D")
+        keys = keys.tz_localize(None) if keys.tz is not None else keys
+    elif interval in _STEPS:
+        step = _STEPS[interval]
+        session_open = day + pd.Timedelta(hours=bist_calendar.SESSION_OPEN.hour, minutes=bist_calendar.SESSION_OPEN.minute)
+        # Pre-open prints fall into the first bucket
+        offset = np.maximum((index - session_open) // step, 0)
+        keys = session_open + offset * step
+    else:
+        raise ValueError(f"Unsupported interval: {interval}")
+
+    grouped = df.groupby(keys, sort=True)
+    out = grouped.agg(_AGGREGATION)
+    out["volume"] = grouped["volume"].sum(min_count=1)
+    out.index.name = df.index.name
+    return out[df.columns.intersection(list(_AGGREGATION) + ["volume"])].dropna(how="all")
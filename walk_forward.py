@@ -0,0 +1,150 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from data_manager import DataManager
+from market_regime import MarketRegime
+from optimizer import ParameterOptimizer, combo_events, combo_signals, trade_stats
+from parallel import run_chunked
+
+
+def walk_windows(n_bars: int, train_bars: int, test_bars: int) -> list:
+    """
+    (train_start, test_start, test_end) calendar rows, end exclusive. Test
+    windows are back to back; the last one may be shorter.
+    """
+    windows = []
+    start = 0
+    while start + train_bars < n_bars:
+        windows.append((start, start + train_bars, min(start + train_bars + test_bars, n_bars)))
+        start += test_bars
+    return windows
+
+
+def window_stats(pre: dict, windows: list, combos: list) -> dict:
+    """
+    Trade statistics of every combination on every train and test window for
+    the tickers in `pre` (see ParameterOptimizer.precompute). Signals are
+    computed once per combination over the full history and only masked per window.
+
+    Returns partial sums that can be added up across ticker chunks:
+    train/test: (windows, combos, 4) = [sum of win rates, sum of returns, tickers traded, trades]
+    held_sum/held_count: (windows, combos, dates) returns of positions carried into each test bar.
+    """
+    close, order = pre['close'], pre['order']
+    n_rows = close.shape[0]
+    has_bar = ~np.isnan(close)
+    bar_return = np.zeros_like(close)
+    bar_return[1:] = np.nan_to_num(close[1:] / close[:-1] - 1)
+
+    def mask(first, last):
+        return has_bar & (order >= first) & (order < last)
+
+    def last_row(window):
+        return np.where(window.any(axis=0), n_rows - 1 - np.argmax(window[::-1], axis=0), 0)
+
+    masks = [(mask(a, b), mask(b, c)) for a, b, c in windows]
+    last_rows = [(last_row(train), last_row(test)) for train, test in masks]
+
+    shape = (len(windows), len(combos))
+    out = {
+        "train": np.zeros(shape + (4,)),
+        "test": np.zeros(shape + (4,)),
+        "held_sum": np.zeros(shape + (n_rows,)),
+        "held_count": np.zeros(shape + (n_rows,)),
+    }
+    for c, combo in enumerate(combos):
+        buy, exit_ = combo_signals(pre, *combo)
+        for w, (train, test) in enumerate(masks):
+            for name, window, last in (("train", train, last_rows[w][0]), ("test", test, last_rows[w][1])):
+                opens, closes = combo_events(pre, buy, exit_, window)
+                n_entries, wins, total_return = trade_stats(close, opens, closes, last)
+                traded = n_entries > 0
+                out[name][w, c] = [(wins[traded] / n_entries[traded]).sum(), total_return[traded].sum(),
+                                   traded.sum(), n_entries.sum()]
+
+            # Out-of-sample bar returns: a position is carried into a bar if it was open after the previous one
+            opens, closes = combo_events(pre, buy, exit_, test)
+            in_position = (np.cumsum(opens, axis=0) - np.cumsum(closes, axis=0)) > 0
+            carried = np.zeros_like(in_position)
+            carried[1:] = in_position[:-1]
+            carried &= test
+            out["held_sum"][w, c] = np.bincount(order[carried], weights=bar_return[carried], minlength=n_rows)
+            out["held_count"][w, c] = np.bincount(order[carried], minlength=n_rows)
+    return out
+
+
+def _walk_chunk(args) -> dict:
+    close, valid, market_positive, ema_lens, wma_lens, windows, combos = args
+    pre = ParameterOptimizer.precompute(close, valid, market_positive, ema_lens, wma_lens)
+    return window_stats(pre, windows, combos)
+
+
+class WalkForward:
+    """
+    Walk-forward evaluation: on each train window pick the parameter
+    combination with the best Total Return (same metric as the optimizer),
+    then trade it on the following test window. Indicators are computed once
+    over the whole history per ticker chunk; chunks run in parallel.
+    """
+
+    def __init__(self, data_manager: DataManager = None, market_regime: MarketRegime = None):
+        self.optimizer = ParameterOptimizer(data_manager, market_regime)
+
+    def run(self, tickers: list, ema_lens: list, wma_lens: list, index_sma_lens: list, period: str = "5y",
+            interval: str = "1d", train_bars: int = 252, test_bars: int = 63, max_workers: int = None) -> dict:
+        """
+        Returns {'windows': per window table, 'returns': stitched out-of-sample
+        bar returns, 'equity': their compounded equity curve}. Out-of-sample
+        returns are equal weighted over the open positions, 0 when flat.
+        """
+        close, valid = self.optimizer.load_data(tickers, period=period, interval=interval)
+        windows = walk_windows(len(close), train_bars, test_bars)
+        if close.empty or not windows:
+            return {"windows": pd.DataFrame(), "returns": pd.Series(dtype=float), "equity": pd.Series(dtype=float)}
+
+        market_positive = {
+            length: self.optimizer.market_regime.aligned(close.index, period=period, interval=interval, sma_len=length)
+            for length in set(index_sma_lens)
+        }
+        combos = list(itertools.product(sorted(set(ema_lens)), sorted(set(wma_lens)), sorted(set(index_sma_lens))))
+
+        # Ticker chunks of the close/valid frames, the rest is the same for every chunk
+        parts = run_chunked(_walk_chunk, close.columns, max_workers, job=lambda cols: (
+            close[cols], valid[cols], market_positive, ema_lens, wma_lens, windows, combos))
+        stats = {name: sum(part[name] for part in parts) for name in parts[0]}
+
+        rows, returns = [], []
+        for w, (train_start, test_start, test_end) in enumerate(windows):
+            train = stats["train"][w]
+            traded = np.maximum(train[:, 2], 1)
+            train_return, train_win_rate = train[:, 1] / traded, train[:, 0] / traded
+            # Best Total Return, then Win Rate; ties go to the first (smallest) combination
+            best = max(range(len(combos)), key=lambda c: (train_return[c], train_win_rate[c]))
+            test = stats["test"][w, best]
+            test_traded = max(test[2], 1)
+
+            held_sum = stats["held_sum"][w, best, test_start:test_end]
+            held_count = stats["held_count"][w, best, test_start:test_end]
+            returns.append(pd.Series(np.divide(held_sum, held_count, out=np.zeros_like(held_sum), where=held_count > 0),
+                                     index=close.index[test_start:test_end]))
+
+            rows.append({
+                "Window": w,
+                "Train Start": close.index[train_start],
+                "Test Start": close.index[test_start],
+                "Test End": close.index[test_end - 1],
+                "ema_len": combos[best][0],
+                "wma_len": combos[best][1],
+                "index_sma_len": combos[best][2],
+                "Train Return": float(train_return[best]),
+                "Train Win Rate": float(train_win_rate[best]),
+                "Tickers": int(test[2]),
+                "Total Trades": int(test[3]),
+                "Win Rate": float(test[0] / test_traded),
+                "Total Return": float(test[1] / test_traded),
+            })
+
+        returns = pd.concat(returns)
+        return {"windows": pd.DataFrame(rows), "returns": returns, "equity": (1 + returns).cumprod()}